@@ -1,8 +1,14 @@
 from django.contrib import admin
-from .models import AuthUser
+from .models import AuthUser, RefreshToken
 
 
 @admin.register(AuthUser)
 class AuthUserAdmin(admin.ModelAdmin):
-    list_display = ('user_id', 'updated_at', 'refresh_token')
+    list_display = ('user_id', 'updated_at', 'last_login')
     search_fields = ('user_id',)
+
+
+@admin.register(RefreshToken)
+class RefreshTokenAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user_id', 'family_id', 'created_at', 'expires_at', 'revoked_at')
+    search_fields = ('user__user_id', 'family_id')
@@ -0,0 +1,110 @@
+"""
+Аутентификация DRF по нашим access токенам (Authorization: Bearer <jwt>).
+
+Подпись проверяется связкой ключей (services/keyring.py) один раз:
+проверенные claims лежат в LRU процесса по digest токена до его exp.
+Пользователь собирается из claims, без запроса в БД. Отзыв по jti
+(services/revocation.py) проверяется на каждом запросе, в том числе
+из кеша: промах Bloom фильтра ничего не стоит.
+
+Аутентификация - не авторизация: view с user_id в пути сверяет его
+с токеном (api/core/permissions.IsTokenOwner), служебные и debug views
+токенам пользователей закрыты.
+"""
+import hashlib
+import time
+
+import jwt
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+from auth_app.api.core.helpers import TOKEN_TYPE_FIELD, ACCESS_TOKEN_TYPE
+from auth_app.config import pydantic_settings
+from auth_app.services.revocation import revocation_list
+from auth_app.services.security import decode_jwt
+from utils.ttl_cache import TTLCache
+
+KEYWORD = b"bearer"
+
+claims_cache = TTLCache(maxsize=pydantic_settings.auth_jwt.claims_cache_maxsize, ttl=0)
+
+
+class TokenUser:
+    """
+    Пользователь из claims access токена. Не модель: save/delete нет.
+    Никогда не staff: IsAdminUser (debug views) такого пользователя не пускает
+    """
+    is_authenticated = True
+    is_anonymous = False
+    is_active = True  # неактивным access токен не выдается
+    is_staff = False
+    is_superuser = False
+
+    def __init__(self, claims: dict):
+        self.claims = claims
+        self.user_id = claims.get("user_id", claims["sub"])
+        self.email = claims.get("email")
+
+    @property
+    def pk(self):
+        return self.user_id
+
+    id = pk
+
+    def __str__(self) -> str:
+        return f"TokenUser {self.user_id}"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, TokenUser) and other.user_id == self.user_id
+
+    def __hash__(self) -> int:
+        return hash(self.user_id)
+
+
+class JWTBearerAuthentication(BaseAuthentication):
+    www_authenticate_realm = "api"
+
+    @staticmethod
+    def _verify(token: str) -> dict:
+        try:
+            claims = decode_jwt(token)
+        except jwt.InvalidTokenError:
+            raise AuthenticationFailed("Invalid or expired token")
+        if claims.get(TOKEN_TYPE_FIELD) != ACCESS_TOKEN_TYPE or not claims.get("sub"):
+            raise AuthenticationFailed("Invalid token type")
+        return claims
+
+    def _claims(self, token: str) -> dict:
+        digest = hashlib.sha256(token.encode()).digest()
+        claims = claims_cache.get(digest)
+        if claims is None:
+            claims = self._verify(token)
+            ttl = claims["exp"] - time.time()
+            if ttl > 0:
+                claims_cache.set(digest, claims, ttl=ttl)
+        # Кеш живет по monotonic, exp сверяем по часам
+        elif claims["exp"] <= time.time():
+            claims_cache.pop(digest)
+            raise AuthenticationFailed("Invalid or expired token")
+        return claims
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != KEYWORD:
+            return None  # не наш заголовок: пусть пробуют остальные
+        if len(auth) != 2:
+            raise AuthenticationFailed("Invalid Authorization header")
+        try:
+            token = auth[1].decode("ascii")
+        except UnicodeDecodeError:
+            raise AuthenticationFailed("Invalid Authorization header")
+
+        claims = self._claims(token)
+        jti = claims.get("jti")
+        if jti and revocation_list.is_revoked(jti, claims["exp"]):
+            raise AuthenticationFailed("Token has been revoked")
+        return TokenUser(claims), token
+
+    def authenticate_header(self, request):
+        # Без него DRF отвечает 403 вместо 401
+        return f'Bearer realm="{self.www_authenticate_realm}"'
@@ -1,3 +1,4 @@
+import uuid
 from datetime import timedelta
 
 from auth_app.services import security
@@ -15,7 +16,11 @@ def create_jwt(
         expires_in: int = pydantic_settings.auth_jwt.access_token_expires_in,
         expire_timedelta: timedelta | None = None,
 ) -> str:
-    jwt_payload = {TOKEN_TYPE_FIELD: token_type}
+    # jti - идентификатор для отзыва (services/revocation.py);
+    # заодно два токена, выданных в одну секунду, не совпадут
+    jwt_payload = {TOKEN_TYPE_FIELD: token_type, "jti": uuid.uuid4().hex}
+    if pydantic_settings.auth_jwt.issuer:
+        jwt_payload["iss"] = pydantic_settings.auth_jwt.issuer
     jwt_payload.update(token_data)
     return security.encode_jwt(
         payload=jwt_payload,
@@ -0,0 +1,116 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from auth_app.config import pydantic_settings
+from auth_app.services.metrics import REQUEST_SECONDS, REQUESTS, dependency_calls
+from auth_app.services.profiling import profile_store, request_profiler
+
+
+def _route(request) -> str:
+    # Шаблон маршрута, а не путь: /<int:user_id>/ дает одну серию, а не по серии на пользователя
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return "/" + match.route if match.route else match.view_name or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Время и статус каждого запроса по шаблону маршрута.
+    Работает и под WSGI, и под ASGI без переключения контекста
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _observe(self, request, response, started: float) -> None:
+        route = _route(request)
+        REQUEST_SECONDS.observe(time.perf_counter() - started, request.method, route)
+        REQUESTS.inc(request.method, route, str(response.status_code))
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self._observe(request, response, started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self._observe(request, response, started)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    cProfile выбранных запросов (services/profiling.py).
+    Без выборки и заголовка стоит одного random() на запрос
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _record(request, response, reason: str, started: float, calls: dict) -> dict:
+        return {
+            "time": time.time(),
+            "method": request.method,
+            "path": request.path,
+            "route": _route(request),
+            "status": response.status_code,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            "reason": reason,
+            "dependency_calls": {
+                name: {"count": count, "seconds": round(seconds, 6)}
+                for name, (count, seconds) in calls.items()
+            },
+        }
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        reason = request_profiler.reason(request)
+        profile = request_profiler.start() if reason else None
+        if profile is None:
+            return self.get_response(request)
+
+        calls = {}
+        token = dependency_calls.set(calls)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            request_profiler.stop(profile)
+            dependency_calls.reset(token)
+        record = self._record(request, response, reason, started, calls)
+        profile_store.save(record, profile, pydantic_settings.profiling.top_functions)
+        return response
+
+    async def __acall__(self, request):
+        reason = request_profiler.reason(request)
+        profile = request_profiler.start() if reason else None
+        if profile is None:
+            return await self.get_response(request)
+
+        calls = {}
+        token = dependency_calls.set(calls)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_profiler.stop(profile)
+            dependency_calls.reset(token)
+        record = self._record(request, response, reason, started, calls)
+        await sync_to_async(profile_store.save)(record, profile, pydantic_settings.profiling.top_functions)
+        return response
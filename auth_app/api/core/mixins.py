@@ -1,19 +1,48 @@
+import inspect
+from asgiref.sync import sync_to_async
 from rest_framework.views import APIView
 
 
 class AsyncAPIView(APIView):
-    async_capable = True
+    """
+    APIView с async обработчиками (async def get/post/...). \n
+    Django сам помечает такую view как корутину (view_is_async),
+    поэтому под ASGI она выполняется прямо в event loop, без sync_to_async.
+    """
 
-    async def __call__(self, request, *args, **kwargs):
-        return await self.dispatch(request, *args, **kwargs)
+    async def initial_async(self, request, *args, **kwargs):
+        # Аутентификаторы и троттлинг DRF синхронные и могут ходить в БД,
+        # поэтому уводим их в поток. Без них initial дешевый
+        if self.authentication_classes or self.throttle_classes:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+        else:
+            self.initial(request, *args, **kwargs)
 
     async def dispatch(self, request, *args, **kwargs):
         # Аналог обычного dispatch, только async
-        handler = self.get_handler(request)
-        if handler is None:
-            raise Exception(f"Метод {request.method} не допустим")
-        return await handler(request, *args, **kwargs)
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.initial_async(request, *args, **kwargs)
+
+            handler = self.get_handler(request)
+            response = handler(request, *args, **kwargs)
+            # options и http_method_not_allowed у APIView синхронные
+            if inspect.isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
 
     def get_handler(self, request):
         method = request.method.lower()
-        return getattr(self, method, None)
+        if method not in self.http_method_names:
+            return self.http_method_not_allowed
+        return getattr(self, method, self.http_method_not_allowed)
@@ -0,0 +1,54 @@
+import hmac
+
+from rest_framework.permissions import BasePermission
+
+from auth_app.config import pydantic_settings
+
+
+class SharedSecretPermission(BasePermission):
+    """
+    Вызов от другого сервиса: общий секрет в заголовке.
+    Секрет не настроен - доступа нет ни у кого
+    """
+    header: str
+
+    def get_secret(self) -> str | None:
+        raise NotImplementedError
+
+    def has_permission(self, request, view):
+        secret = self.get_secret()
+        if not secret:
+            return False
+        provided = request.headers.get(self.header, "")
+        return hmac.compare_digest(provided.encode(), secret.encode())
+
+
+class HasIntrospectionSecret(SharedSecretPermission):
+    """
+    Gateway передает introspection.client_secret в X-Introspection-Secret.
+    Без настроенного секрета endpoint закрыт (RFC 7662 2.1)
+    """
+    header = "X-Introspection-Secret"
+
+    def get_secret(self) -> str | None:
+        return pydantic_settings.introspection.client_secret
+
+
+class HasServiceSecret(SharedSecretPermission):
+    """
+    Callbacks от user_service: user_service.callback_secret в X-Service-Secret
+    """
+    header = "X-Service-Secret"
+
+    def get_secret(self) -> str | None:
+        return pydantic_settings.user_service.callback_secret
+
+
+class IsTokenOwner(BasePermission):
+    """
+    Запрос от пользователя из пути: user_id токена совпадает с user_id в URL
+    """
+
+    def has_permission(self, request, view):
+        user_id = getattr(request.user, "user_id", None)
+        return user_id is not None and str(user_id) == str(view.kwargs.get("user_id"))
@@ -15,22 +15,21 @@ from rest_framework_simplejwt.tokens import RefreshToken
 
 from auth_app.models import AuthUser
 from auth_app.config import pydantic_settings
-from auth_app.redis_client import redis_client
-# from auth_app.api.core.mixins import AsyncAPIView
+from auth_app.api.core.mixins import AsyncAPIView
 from auth_app.crud import user_crud, tokens_crud, session_crud
 from .serializers import RegisterUserSerializer, AuthUserSerializer
-from auth_app.api.core.helpers import create_access_token, create_refresh_token
+from auth_app.api.core.helpers import create_access_token
+from auth_app.services.hashing import HashingOverloaded
+from auth_app.services.login_bookkeeping import login_bookkeeping
+from auth_app.services.login_throttle import login_throttle, get_client_ip
 from auth_app.services.security import (
-    verify_password, hash_password,
+    averify_password, hash_password,
     generate_static_auth_token
 )
 
 # Настраиваем logger
 logger = logging.getLogger(__name__)
 
-MAX_ATTEMPTS = settings.AUTH_MAX_ATTEMPTS
-BLOCK_TIME = settings.AUTH_BLOCK_TIME_SECONDS
-
 
 @extend_schema(tags=["Basic Authentication"])
 class BasicAuthCredentialsAPIView(APIView):
@@ -78,6 +77,7 @@ class RegisterUserAPIView(APIView):
             user_id = response.get("user_id")
             if not user_id:
                 raise ValueError("Missing user ID in response")
+            user_crud.invalidate_user_service_user(user_id=user_id, username=username)
 
         except (httpx.HTTPError, ValueError) as exc:
             logger.error(f"User service error: {str(exc)}")
@@ -89,12 +89,12 @@ class RegisterUserAPIView(APIView):
         # 2 Хешируем пароль и создаем запись в auth_service
         try:
             hashed_pw = hash_password(user_data["password"])
-            refresh = create_refresh_token(user_id, email)
             AuthUser.objects.create(
                 user_id=user_id,
                 password=hashed_pw,
-                refresh_token=refresh,
             )
+        except HashingOverloaded:
+            raise
         except Exception as exc:
             logger.error(f"Auth user creation failed: {str(exc)}")
             return Response(
@@ -103,7 +103,7 @@ class RegisterUserAPIView(APIView):
             )
 
         token = generate_static_auth_token()
-        tokens_crud.store_static_token(token, user_id)
+        tokens_crud.store_static_token(token, user_id, username, email)
         access = create_access_token(user_id, email)
 
         return Response(
@@ -117,8 +117,14 @@ class RegisterUserAPIView(APIView):
         )
 
 
+class UserServiceUnavailable(exceptions.APIException):
+    status_code = status.HTTP_502_BAD_GATEWAY
+    default_detail = "Failed to get user profile in user_service"
+    default_code = "user_service_unavailable"
+
+
 # Вспомогательная асинхронная функция для аутентификации по username/password
-def get_auth_user_username(request):
+async def get_auth_user_username(request):
     # Парсим basic заголовок
     auth_header = request.headers.get("Authorization", "")
     if not auth_header.lower().startswith("basic "):
@@ -135,72 +141,60 @@ def get_auth_user_username(request):
         "Invalid username or password",
     )
 
-    # Проверка попыток входа через redis
-    key = f"failed_attempts:{username}"
-    attempts: int = redis_client.get(key)
-    attempts = int(attempts) if attempts else 0
-
-    if attempts >= MAX_ATTEMPTS:
-        raise exceptions.PermissionDenied(
-            "Too many failed attempts, try again later"
-        )
+    # Проверка и запись попытки входа - один запрос в redis
+    attempt = await login_throttle.ahit(username, get_client_ip(request))
 
     # Запрос пользователя из user_service
     try:
-        response = user_crud.get_user_service_user_by_username(username)
-    except httpx.HTTPStatusError:
-        # Сбрасываем счётчик на ошибки сети
-        redis_client.incr(key)
-        redis_client.expire(key, BLOCK_TIME)
-        raise unauthed_exc
+        response = await user_crud.aget_user_service_user_by_username(username)
+    except httpx.HTTPStatusError as exc:
+        if exc.response.status_code == status.HTTP_404_NOT_FOUND:
+            raise unauthed_exc
+        await login_throttle.arelease(attempt)
+        raise UserServiceUnavailable()
+    except httpx.HTTPError:
+        # Сбой user_service не считается неудачной попыткой входа
+        await login_throttle.arelease(attempt)
+        raise UserServiceUnavailable()
 
     user_id = response.get("user_id")
     is_active = response.get("is_active")
 
     if not user_id or not is_active:
-        redis_client.incr(key)
-        redis_client.expire(key, BLOCK_TIME)
         raise unauthed_exc
 
     try:
-        auth_user = AuthUser.objects.get(user_id=user_id)
+        auth_user = await AuthUser.objects.aget(user_id=user_id)
     except ObjectDoesNotExist:
-        redis_client.incr(key)
-        redis_client.expire(key, BLOCK_TIME)
         raise unauthed_exc
 
     # secrets
-    if not verify_password(password, auth_user.password):
-        redis_client.incr(key)
-        redis_client.expire(key, BLOCK_TIME)
+    if not await averify_password(password, auth_user.password):
         raise unauthed_exc
 
-    redis_client.delete(key)
-    return username, user_id
+    # Успешная попытка не считается
+    await login_throttle.asuccess(attempt)
+    await user_crud.arehash_password_if_needed(auth_user, password)
+    return username, user_id, response.get("email")
 
 
 @extend_schema(tags=["Basic Authentication"])
-class BasicAuthUsernameAPIView(APIView):
+class BasicAuthUsernameAPIView(AsyncAPIView):
     """
     Login через username и password
     """
     authentication_classes = []
     permission_classes = [AllowAny]
 
-    def post(self, request):
-        username, user_id = get_auth_user_username(request)
+    async def post(self, request):
+        username, user_id, email = await get_auth_user_username(request)
 
         # x-auth-token
-        session_token = session_crud.create_session(user_id)
+        session_token = await session_crud.acreate_session(user_id, username, email)
 
-        # access and refresh tokens
-        user_data = user_crud.get_user_service_user_by_username(username=username)
-        email = user_data.get("email")
+        # access token (refresh выдает только jwt/login)
         access_token = create_access_token(user_id, email)
-        refresh_token = create_refresh_token(user_id, email)
-        auth_user = AuthUser.objects.get(user_id=user_id)
-        auth_user.refresh_token = refresh_token
-        auth_user.save()
+        await login_bookkeeping.arecord_login(user_id)
 
         response = JsonResponse({
             "user_id": user_id,
@@ -219,11 +213,13 @@ class BasicAuthUsernameAPIView(APIView):
 
 
 @extend_schema(tags=["Basic Authentication"])
-class CheckTokenAuthAPIView(APIView):
+class CheckTokenAuthAPIView(AsyncAPIView):
+    # Аутентификация по x-auth-token внутри view
+    authentication_classes = []
     permission_classes = [AllowAny]
 
-    def get(self, request):
-        username = tokens_crud.get_username_by_static_auth_token(request)
+    async def get(self, request):
+        username = await tokens_crud.aget_username_by_static_auth_token(request)
         return Response({
             "message": f"Hi!, {username}!",
             "username": username,
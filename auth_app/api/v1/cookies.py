@@ -7,7 +7,11 @@ from drf_spectacular.utils import extend_schema
 
 from auth_app.crud.tokens_crud import get_username_by_static_auth_token
 from auth_app.config import pydantic_settings
-from auth_app.crud.session_crud import create_session, get_session, delete_session
+from auth_app.crud.refresh_token_crud import revoke_user_refresh_tokens
+from auth_app.crud.session_crud import (
+    create_session, get_session,
+    delete_session, revoke_user_sessions,
+)
 
 
 @extend_schema(tags=["Cookies"])
@@ -48,3 +52,31 @@ class LogoutCookieAPIView(APIView):
 
         return response
 
+
+@extend_schema(tags=["Cookies"])
+class LogoutAllCookieAPIView(APIView):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def post(self, request, *args, **kwargs):
+        """
+        Завершить все сессии пользователя
+        """
+        session_id = request.COOKIES.get(pydantic_settings.cookie_session_id_key)
+        if not session_id:
+            raise exceptions.AuthenticationFailed("Session not found")
+
+        session = get_session(session_id)
+        if session is None:
+            raise exceptions.AuthenticationFailed("Session expired or invalid")
+        user_id = session["user_id"]
+
+        revoked = revoke_user_sessions(user_id)
+        revoked_refresh = revoke_user_refresh_tokens(user_id)
+        response = Response({
+            "message": "Logged out from all sessions",
+            "revoked_sessions": revoked,
+            "revoked_refresh_tokens": revoked_refresh,
+        })
+        response.delete_cookie(pydantic_settings.cookie_session_id_key)
+        return response
@@ -1,32 +1,88 @@
+import json
 from rest_framework import status
+from django.http import StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from drf_spectacular.utils import extend_schema
+from django.core.serializers.json import DjangoJSONEncoder
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 from django.core.exceptions import ObjectDoesNotExist
 from rest_framework.permissions import AllowAny, IsAuthenticated
 
+from auth_app.api.core.permissions import HasServiceSecret, IsTokenOwner
 from auth_app.crud import user_crud
-from .serializers import AuthUserSerializer
+from .serializers import AuthUserSerializer, ProfileChangedSerializer
 
 
-@extend_schema(tags=["CRUD"])
+USERS_PAGE_DEFAULT = 100
+USERS_PAGE_MAX = 1000
+
+
+async def _andjson(pages):
+    # Страница - один кусок ответа, а не строка: меньше переходов в event loop
+    async for page in pages:
+        yield "".join(json.dumps(row, cls=DjangoJSONEncoder) + "\n" for row in page)
+
+
+@extend_schema(
+    tags=["CRUD"],
+    parameters=[
+        OpenApiParameter("cursor", int, description="next_cursor с прошлой страницы"),
+        OpenApiParameter("limit", int, description=f"Размер страницы, до {USERS_PAGE_MAX}"),
+        OpenApiParameter("fields", str, description="Колонки через запятую"),
+        OpenApiParameter("stream", bool, description="Вся таблица в NDJSON"),
+    ],
+)
 class GetUsersAPIView(APIView):
+    """
+    Список пользователей с keyset пагинацией по user_id, \n
+    ?stream=1 отдает всю таблицу в NDJSON при постоянной памяти
+    """
     # permission_classes = [IsAuthenticated]
     permission_classes = [AllowAny]
     serializer = AuthUserSerializer
     authentication_classes = []
 
     def get(self, request):
+        params = request.query_params
         try:
-            users = user_crud.get_all_users()
-            if not users:
+            fields = [f for f in params.get("fields", "").split(",") if f] or list(user_crud.USER_LIST_FIELDS)
+            unknown = set(fields) - set(user_crud.USER_LIST_FIELDS)
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+            if "user_id" not in fields:
+                fields.insert(0, "user_id")
+
+            cursor = int(params["cursor"]) if params.get("cursor") else None
+            limit = min(int(params.get("limit", USERS_PAGE_DEFAULT)), USERS_PAGE_MAX)
+            if limit < 1:
+                raise ValueError("limit must be positive")
+        except ValueError as exc:
+            return Response(
+                {"detail": str(exc)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if params.get("stream") in ("1", "true"):
+            return StreamingHttpResponse(
+                _andjson(user_crud.aiter_users(fields)),
+                content_type="application/x-ndjson",
+            )
+
+        try:
+            # Берем на одну строку больше, чтобы понять, есть ли следующая страница
+            users = user_crud.get_users_page(fields, after=cursor, limit=limit + 1)
+            if not users and cursor is None:
                 return Response(
                     {"detail": "Users not found"},
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-            serializer = AuthUserSerializer(users, many=True)
-            return Response(serializer.data)
+            next_cursor = None
+            if len(users) > limit:
+                users = users[:limit]
+                next_cursor = users[-1]["user_id"]
+
+            return Response({"results": users, "next_cursor": next_cursor})
 
         except Exception as exc:
             print(f"Error while fetching users: {str(exc)}")
@@ -60,8 +116,11 @@ class GetUserAPIView(APIView):
 class DeleteAuthUserAPIView(APIView):
     """
     Вызывается через user_service, \n
-    Через эту сторону синхронизация не происходит
+    Через эту сторону синхронизация не происходит. \n
+    user_service (X-Service-Secret) или сам пользователь своим access токеном
     """
+    permission_classes = [HasServiceSecret | IsTokenOwner]
+
     def delete(self, request, user_id: int):
         try:
             user_crud.delete_auth_user(user_id)
@@ -71,3 +130,21 @@ class DeleteAuthUserAPIView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         return Response({"message": "Auth user deleted"})
+
+
+@extend_schema(tags=["CRUD"], request=ProfileChangedSerializer)
+class ProfileChangedAPIView(APIView):
+    """
+    Вызывается через user_service после смены username/email, \n
+    Обновляет записи x-auth-token и cookie-сессий пользователя. \n
+    Только для user_service: X-Service-Secret
+    """
+    authentication_classes = []
+    permission_classes = [HasServiceSecret]
+
+    def post(self, request, user_id: int):
+        serializer = ProfileChangedSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        updated = user_crud.apply_profile_change(user_id, **serializer.validated_data)
+        return Response({"message": "Profile updated", "updated": updated})
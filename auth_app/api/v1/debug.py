@@ -1,30 +1,117 @@
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
-from rest_framework.permissions import IsAuthenticated
-from django.contrib.sessions.backends.cache import SessionStore
+from django.core import signing
+from django.http import JsonResponse, FileResponse, Http404
+from rest_framework.permissions import IsAdminUser
 from rest_framework.decorators import api_view, permission_classes
 
-from auth_app.redis_client import redis_client
+from auth_app.services.hashing import get_hashing_pool
+from auth_app.services.login_bookkeeping import login_bookkeeping
+from auth_app.services.profile_cache import profile_cache
+from auth_app.services.profiling import profile_store
+from auth_app.services.revocation import revocation_list
+from auth_app.services.session_inspector import session_inspector, KINDS, SESSION
+
+# Все debug views - только для staff (Django пользователи): access токены
+# пользователей (TokenUser) не staff и получают 403
+
+# Больше - дольше один шаг SCAN держит Redis
+MAX_SCAN_COUNT = 1000
 
 
-@csrf_exempt
 @api_view(["GET"])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAdminUser])
 def debug_redis_sessions(request):
     """
-    Распечатать базу redis
+    Сессии (kind=session) или x-auth-token (kind=static_token) постранично через SCAN.
+
+    ?count= - размер шага SCAN, ?cursor= - из прошлого ответа,
+    ?user_id= - только токены пользователя (по индексу, без SCAN),
+    ?by=user - сессии на пользователя. stats накапливаются по страницам
+    """
+    kind = request.GET.get("kind", SESSION)
+    if kind not in KINDS:
+        return JsonResponse({"error": f"kind must be one of {sorted(KINDS)}"}, status=400)
+    try:
+        count = max(1, min(int(request.GET.get("count", 100)), MAX_SCAN_COUNT))
+        user_id = request.GET.get("user_id")
+        user_id = int(user_id) if user_id else None
+    except ValueError:
+        return JsonResponse({"error": "count and user_id must be integers"}, status=400)
+    cursor = request.GET.get("cursor") or None
+
+    try:
+        if user_id is not None:
+            page = session_inspector.user_records(user_id, kind, cursor, count)
+        elif request.GET.get("by") == "user":
+            page = session_inspector.users(kind, cursor, count)
+        else:
+            page = session_inspector.records(kind, cursor, count)
+    except signing.BadSignature:
+        return JsonResponse({"error": "invalid cursor"}, status=400)
+    return JsonResponse(page, json_dumps_params={"indent": 2})
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def debug_hashing_stats(request):
+    """
+    Очередь и время ожидания пула bcrypt
+    """
+    return JsonResponse(get_hashing_pool().stats())
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def debug_profile_cache_stats(request):
+    """
+    Попадания и промахи кеша профилей user_service
+    """
+    return JsonResponse(profile_cache.stats())
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def debug_revocation_stats(request):
+    """
+    Фильтр отозванных jti: синхронизация и ложные срабатывания
+    """
+    return JsonResponse(revocation_list.stats())
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def debug_login_bookkeeping_stats(request):
+    """
+    Очередь last_login, еще не записанная в БД
     """
-    session_keys = redis_client.keys(":1:session:*")
-    sessions = {}
+    return JsonResponse(login_bookkeeping.stats())
 
-    for raw_key in session_keys:
-        try:
-            session_key = raw_key.split(":")[-1]
-            store = SessionStore(session_key=session_key)
-            data = store.load()
-            sessions[session_key] = data
-        except Exception as e:
-            sessions[raw_key] = f"[ERROR: {str(e)}]"
 
-    return JsonResponse({"sessions": sessions}, json_dumps_params={"indent": 2})
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def debug_profiles(request):
+    """
+    Последние профили запросов, новые первыми
+    """
+    try:
+        limit = min(int(request.GET.get("limit", 50)), profile_store.ring_size)
+    except ValueError:
+        return JsonResponse({"error": "limit must be an integer"}, status=400)
+    return JsonResponse({"profiles": profile_store.list(limit)})
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def debug_profile(request, profile_id: str):
+    """
+    Сводка профиля; ?download=1 - файл pstats для snakeviz
+    """
+    if request.GET.get("download"):
+        path = profile_store.raw_path(profile_id)
+        if path is None:
+            raise Http404
+        return FileResponse(path.open("rb"), as_attachment=True, filename=path.name)
 
+    record = profile_store.get(profile_id)
+    if record is None:
+        raise Http404
+    return JsonResponse(record, json_dumps_params={"indent": 2})
@@ -0,0 +1,30 @@
+from rest_framework import status
+from rest_framework.response import Response
+from drf_spectacular.utils import extend_schema
+
+from auth_app.api.core.mixins import AsyncAPIView
+from auth_app.api.core.permissions import HasIntrospectionSecret
+from auth_app.api.v1.serializers import IntrospectionRequestSerializer
+from auth_app.services.introspection import token_introspector
+
+
+@extend_schema(tags=["Introspection"], request=IntrospectionRequestSerializer)
+class IntrospectAPIView(AsyncAPIView):
+    """
+    Пакетная проверка токенов (RFC 7662) \n
+    Принимает {"tokens": [{"token": ..., "token_type_hint": ...}]},
+    результаты возвращаются в том же порядке
+    """
+    authentication_classes = []
+    permission_classes = [HasIntrospectionSecret]
+
+    async def post(self, request):
+        serializer = IntrospectionRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        items = [
+            (item["token"], item.get("token_type_hint"))
+            for item in serializer.validated_data["tokens"]
+        ]
+        results = await token_introspector.aintrospect(items)
+        return Response({"results": results}, status=status.HTTP_200_OK)
@@ -0,0 +1,65 @@
+from django.urls import reverse
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import patch_cache_control
+from rest_framework.views import APIView
+from rest_framework.permissions import AllowAny
+from drf_spectacular.utils import extend_schema
+
+from auth_app.config import pydantic_settings
+from auth_app.services.keyring import get_key_ring
+
+
+def _cache_headers(response: HttpResponse, etag: str | None = None) -> HttpResponse:
+    max_age = pydantic_settings.auth_jwt.jwks_max_age
+    patch_cache_control(
+        response,
+        public=True,
+        max_age=max_age,
+        stale_while_revalidate=max_age,
+    )
+    if etag:
+        response["ETag"] = etag
+    return response
+
+
+@extend_schema(tags=["JWKS"])
+class JWKSAPIView(APIView):
+    """
+    Публичные ключи для локальной проверки access токенов \n
+    Отдается с ETag, повторный запрос с If-None-Match получает 304
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        body, etag = get_key_ring().jwks()
+
+        if_none_match = request.headers.get("If-None-Match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return _cache_headers(HttpResponse(status=304), etag)
+
+        response = HttpResponse(body, content_type="application/json")
+        return _cache_headers(response, etag)
+
+
+@extend_schema(tags=["JWKS"])
+class OpenIDConfigurationAPIView(APIView):
+    """
+    OpenID-style discovery: где брать ключи и какие алгоритмы ожидать
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        config = pydantic_settings.auth_jwt
+        algorithms = sorted({key.algorithm for key in get_key_ring().verification_keys()})
+        response = JsonResponse({
+            "issuer": config.issuer or request.build_absolute_uri("/").rstrip("/"),
+            "jwks_uri": request.build_absolute_uri(reverse("jwks")),
+            "token_endpoint": request.build_absolute_uri(reverse("jwt-login")),
+            "grant_types_supported": ["password", "refresh_token"],
+            "subject_types_supported": ["public"],
+            "id_token_signing_alg_values_supported": algorithms,
+            "token_endpoint_auth_methods_supported": ["none"],
+        })
+        return _cache_headers(response)
@@ -1,6 +1,5 @@
 import httpx
 from rest_framework import status
-from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from drf_spectacular.utils import extend_schema
@@ -8,37 +7,58 @@ from django.core.exceptions import ObjectDoesNotExist
 from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
 
 from auth_app.services.security import (
-    verify_password,
+    averify_password,
     decode_jwt,
 )
 from auth_app.api.core.helpers import (
     create_access_token,
-    create_refresh_token,
+    TOKEN_TYPE_FIELD,
+    ACCESS_TOKEN_TYPE,
+    REFRESH_TOKEN_TYPE,
 )
-from auth_app.crud import user_crud
+from auth_app.crud import user_crud, refresh_token_crud
 from auth_app.models import AuthUser
 from auth_app.api.v1.serializers import TokenSerializer
+from auth_app.api.core.mixins import AsyncAPIView
+from auth_app.services.login_throttle import login_throttle, get_client_ip
+from auth_app.services.login_bookkeeping import login_bookkeeping
+from auth_app.services.revocation import revocation_list
+from auth_app.services.introspection import token_introspector, token_digest
 
 
 @extend_schema(tags=["JWT"])
-class LoginApiView(APIView):
+class LoginApiView(AsyncAPIView):
     authentication_classes = []
     permission_classes = [AllowAny]
 
-    def post(self, request):
+    async def post(self, request):
         username = request.data.get("username")
         password = request.data.get("password")
         if not username or not password:
             raise AuthenticationFailed("Username and password is required")
 
+        attempt = await login_throttle.ahit(username, get_client_ip(request))
+
         try:
-            response = user_crud.get_user_service_user_by_username(username)
+            response = await user_crud.aget_user_service_user_by_username(username)
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code == status.HTTP_404_NOT_FOUND:
+                # Неизвестный username - обычная неудачная попытка
+                raise AuthenticationFailed("Invalid username or password")
+            await login_throttle.arelease(attempt)
+            return Response(
+                {"detail": "Failed to get user profile in user_service"},
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
         except httpx.HTTPError:
+            # Сбой user_service не считается неудачной попыткой входа
+            await login_throttle.arelease(attempt)
             return Response(
                 {"detail": "Failed to get user profile in user_service"},
                 status=status.HTTP_502_BAD_GATEWAY,
             )
         except Exception:
+            await login_throttle.arelease(attempt)
             return Response(
                 {"detail": "Internal Server Error"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -51,15 +71,20 @@ class LoginApiView(APIView):
             raise PermissionDenied("User is inactive")
 
         try:
-            auth_user = AuthUser.objects.get(user_id=user_id)
+            auth_user = await AuthUser.objects.aget(user_id=user_id)
         except ObjectDoesNotExist:
             raise AuthenticationFailed("Invalid username or password")
 
-        if not verify_password(password, auth_user.password):
+        if not await averify_password(password, auth_user.password):
             raise AuthenticationFailed("Invalid username or password")
 
+        await login_throttle.asuccess(attempt)
+        await user_crud.arehash_password_if_needed(auth_user, password)
+        await login_bookkeeping.arecord_login(user_id)
+
         access = create_access_token(user_id, email)
-        refresh = create_refresh_token(user_id, email)
+        # Новая цепочка ротации: другие устройства не разлогиниваются
+        refresh = await refresh_token_crud.aissue_refresh_token(user_id, email)
 
         data = {"access_token": access, "refresh_token": refresh, "token_type": "Bearer"}
         serializer = TokenSerializer(data=data)
@@ -68,11 +93,11 @@ class LoginApiView(APIView):
 
 
 @extend_schema(tags=["JWT"])
-class RefreshApiView(APIView):
+class RefreshApiView(AsyncAPIView):
     authentication_classes = []
     permission_classes = [AllowAny]
 
-    def post(self, request):
+    async def post(self, request):
         token = request.data.get("refresh_token")
         if not token:
             raise AuthenticationFailed("Invalid refresh token")
@@ -85,24 +110,49 @@ class RefreshApiView(APIView):
         user_id = payload.get("sub")
         email = payload.get("email")
 
-        # Сверяем refresh_token
-        auth_user = AuthUser.objects.filter(user_id=user_id, refresh_token=token).first()
-
-        if not user_id:
+        if not user_id or payload.get(TOKEN_TYPE_FIELD) != REFRESH_TOKEN_TYPE:
             raise AuthenticationFailed("Invalid token payload")
 
-        if not auth_user:
-            raise AuthenticationFailed("Refresh token revoked or invalid")
-
-        # Создаем новые токены
+        # Сверяем refresh_token по digest и выдаем следующий в той же цепочке
+        new_refresh = await refresh_token_crud.arotate_refresh_token(token, user_id, email)
         new_access = create_access_token(user_id=user_id, email=email)
-        new_refresh = create_refresh_token(user_id=user_id, email=email)
-
-        # Присваиваем новый refresh_token
-        auth_user.refresh_token = new_refresh
-        auth_user.save(update_fields=["refresh_token"])
 
-        data = {"access_token": new_access, "refresh_token": None, "token_type": "Bearer"}
-        serializer = TokenSerializer(data=data, context={"partial": True})
+        data = {"access_token": new_access, "refresh_token": new_refresh, "token_type": "Bearer"}
+        serializer = TokenSerializer(data=data)
         serializer.is_valid(raise_exception=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+@extend_schema(tags=["JWT"])
+class RevokeApiView(AsyncAPIView):
+    """
+    Отзыв токена (RFC 7009) \n
+    access token - по jti до его exp, refresh token - вся цепочка ротации
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    async def post(self, request):
+        token = request.data.get("token")
+        if not token:
+            raise AuthenticationFailed("Token is required")
+
+        try:
+            payload = decode_jwt(token)
+        except Exception as e:
+            raise AuthenticationFailed(str(e))
+
+        token_type = payload.get(TOKEN_TYPE_FIELD)
+        if token_type == ACCESS_TOKEN_TYPE:
+            jti = payload.get("jti")
+            if not jti:
+                raise AuthenticationFailed("Token has no jti and cannot be revoked")
+            revoked = await revocation_list.arevoke(jti, payload["exp"])
+        elif token_type == REFRESH_TOKEN_TYPE:
+            revoked = bool(await refresh_token_crud.arevoke_token(token))
+        else:
+            raise AuthenticationFailed("Invalid token payload")
+
+        # Локальный кеш introspection не должен отвечать active до своего ttl
+        token_introspector.cache.pop(token_digest(token))
+        return Response({"revoked": revoked}, status=status.HTTP_200_OK)
@@ -0,0 +1,20 @@
+import hmac
+
+from django.http import HttpResponse, HttpResponseForbidden
+
+from auth_app.config import pydantic_settings
+from auth_app.services.metrics import registry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def metrics_view(request):
+    """
+    Prometheus text format. Если задан metrics.token, нужен Authorization: Bearer <token>
+    """
+    token = pydantic_settings.metrics.token
+    if token:
+        provided = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(provided.encode(), token.encode()):
+            return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
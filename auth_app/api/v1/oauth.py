@@ -1,5 +1,6 @@
+import threading
+
 import httpx
-import requests
 from django.urls import reverse
 from rest_framework import status
 from django.shortcuts import redirect
@@ -7,24 +8,38 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema
 from rest_framework.permissions import AllowAny
-from authlib.integrations.django_client import OAuth
 
 from auth_app.models import AuthUser
 from auth_app.crud import user_crud
 from auth_app.config import pydantic_settings
-from auth_app.api.core.helpers import create_access_token, create_refresh_token
-
-oauth = OAuth()
-
-oauth.register(
-    name='google',
-    client_id=pydantic_settings.google_client_id,
-    client_secret=pydantic_settings.google_client_secret,
-    server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
-    client_kwargs={
-        'scope': 'openid email profile',
-    }
-)
+from auth_app.api.core.helpers import create_access_token
+
+_oauth = None
+_oauth_lock = threading.Lock()
+
+
+def get_oauth():
+    """
+    Клиент Google создается при первом входе через Google, а не при загрузке URLconf
+    """
+    global _oauth
+    if _oauth is None:
+        with _oauth_lock:
+            if _oauth is None:
+                from authlib.integrations.django_client import OAuth
+
+                oauth = OAuth()
+                oauth.register(
+                    name='google',
+                    client_id=pydantic_settings.google_client_id,
+                    client_secret=pydantic_settings.google_client_secret,
+                    server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
+                    client_kwargs={
+                        'scope': 'openid email profile',
+                    }
+                )
+                _oauth = oauth
+    return _oauth
 
 
 @extend_schema(tags=["Google"])
@@ -38,7 +53,7 @@ class GoogleLoginView(APIView):
         redirect_uri = request.build_absolute_uri(
             reverse('google-callback')
         )
-        return oauth.google.authorize_redirect(request, redirect_uri)
+        return get_oauth().google.authorize_redirect(request, redirect_uri)
 
 
 @extend_schema(tags=["Google"])
@@ -50,9 +65,9 @@ class GoogleCallbackView(APIView):
         Google редиректит сюда
         """
         # получаем токен
-        token = oauth.google.authorize_access_token(request)
+        token = get_oauth().google.authorize_access_token(request)
         # достаём userinfo
-        resp = requests.get(
+        resp = httpx.get(
             'https://www.googleapis.com/oauth2/v1/userinfo',
             headers={'Authorization': f"Bearer {token['access_token']}"}
         )
@@ -68,6 +83,7 @@ class GoogleCallbackView(APIView):
             user_id = response.get("user_id")
             if not user_id:
                 raise ValueError("Missing user ID in response")
+            user_crud.invalidate_user_service_user(user_id=user_id, username=username)
 
         except (httpx.HTTPError, ValueError) as exc:
             print(f"User service error: {str(exc)}")
@@ -78,12 +94,8 @@ class GoogleCallbackView(APIView):
 
         # Создаем пользователя тут
         new_access = create_access_token(user_id=user_id, email=email)
-        new_refresh = create_refresh_token(user_id=user_id, email=email)
 
-        AuthUser.objects.update_or_create(
-            user_id=user_id,
-            defaults={'refresh_token': new_refresh},
-        )
+        AuthUser.objects.get_or_create(user_id=user_id)
 
         return Response({
             'access_token': new_access,
@@ -1,10 +1,12 @@
 from rest_framework import serializers
 
+from auth_app.config import pydantic_settings
+from auth_app.services.introspection import TOKEN_TYPE_HINTS
+
 
 class AuthUserSerializer(serializers.Serializer):
     user_id = serializers.IntegerField()
     password = serializers.CharField()  # При необходимости преобразовать в Base64
-    refresh_token = serializers.CharField(allow_null=True, required=False)
     updated_at = serializers.DateTimeField(allow_null=True, required=False)
 
 
@@ -27,3 +29,24 @@ class TokenSerializer(serializers.Serializer):
 
 class RefreshSerializer(serializers.Serializer):
     refresh_token = serializers.CharField()
+
+
+class ProfileChangedSerializer(serializers.Serializer):
+    username = serializers.CharField(required=False)
+    email = serializers.EmailField(required=False)
+    previous_username = serializers.CharField(required=False)
+
+
+class IntrospectionTokenSerializer(serializers.Serializer):
+    token = serializers.CharField()
+    token_type_hint = serializers.ChoiceField(
+        choices=TOKEN_TYPE_HINTS, required=False, allow_null=True,
+    )
+
+
+class IntrospectionRequestSerializer(serializers.Serializer):
+    tokens = serializers.ListField(
+        child=IntrospectionTokenSerializer(),
+        allow_empty=False,
+        max_length=pydantic_settings.introspection.max_batch,
+    )
@@ -7,19 +7,30 @@ from .basic_auth import (
 )
 from .cookies import (
     CookieSessionAPIView,
+    LogoutCookieAPIView,
+    LogoutAllCookieAPIView,
 )
 from .jwt_auth import (
     LoginApiView,
     RefreshApiView,
+    RevokeApiView,
 )
 from .debug import (
-    debug_redis_sessions
+    debug_redis_sessions,
+    debug_hashing_stats,
+    debug_profile_cache_stats,
+    debug_revocation_stats,
+    debug_login_bookkeeping_stats,
+    debug_profiles,
+    debug_profile,
 )
 from .crud import (
     GetUsersAPIView,
     GetUserAPIView,
     DeleteAuthUserAPIView,
+    ProfileChangedAPIView,
 )
+from .introspection import IntrospectAPIView
 from .oauth import (
     GoogleLoginView,
     GoogleCallbackView,
@@ -33,10 +44,21 @@ urlpatterns = [
     path('basic-auth-username/', BasicAuthUsernameAPIView.as_view(), name='basic-auth-username'),
     path('check-token-auth/', CheckTokenAuthAPIView.as_view(), name='check-token-auth'),
     path('<int:user_id>/', DeleteAuthUserAPIView.as_view(), name='delete-auth-user'),
+    path('<int:user_id>/profile-changed/', ProfileChangedAPIView.as_view(), name='profile-changed'),
     path('cookie-session/', CookieSessionAPIView.as_view(), name='cookie-session'),
+    path('logout/', LogoutCookieAPIView.as_view(), name='logout'),
+    path('logout-all/', LogoutAllCookieAPIView.as_view(), name='logout-all'),
     path('jwt/login/', LoginApiView.as_view(), name="jwt-login"),
     path('jwt/refresh/', RefreshApiView.as_view(), name="jwt-refresh"),
+    path('jwt/revoke/', RevokeApiView.as_view(), name="jwt-revoke"),
+    path('introspect/', IntrospectAPIView.as_view(), name='introspect'),
     path('redis-sessions/', debug_redis_sessions),
+    path('hashing-stats/', debug_hashing_stats),
+    path('profile-cache-stats/', debug_profile_cache_stats),
+    path('revocation-stats/', debug_revocation_stats),
+    path('login-bookkeeping-stats/', debug_login_bookkeeping_stats),
+    path('profiles/', debug_profiles),
+    path('profiles/<str:profile_id>/', debug_profile),
     path('login/google/', GoogleLoginView.as_view(), name="google-login"),
     path('callback/google/', GoogleCallbackView.as_view(), name="google-callback"),
 ]
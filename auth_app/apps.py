@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class AuthAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'auth_app'
+
+    def ready(self):
+        from auth_app.services.metrics import install_db_instrumentation
+        # SIGHUP для перечитывания ключей ставят asgi.py/wsgi.py: у manage.py
+        # команд (migrate, import_users) hangup должен завершать процесс
+        install_db_instrumentation()
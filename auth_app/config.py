@@ -1,4 +1,7 @@
+import os
+import tempfile
 from pathlib import Path
+from typing import Literal
 # from pprint import pprint
 from dotenv import load_dotenv
 from pydantic import BaseModel, PostgresDsn
@@ -32,18 +35,165 @@ class ApiPrefix(BaseModel):
 class AuthJWT(BaseModel):
     private_key_path: Path = CERTS_DIR / "jwt-private.pem"
     public_key_path: Path = CERTS_DIR / "jwt-public.pem"
-    algorithm: str = "RS256"
+    certs_dir: Path = CERTS_DIR  # все пары <name>-private.pem / <name>-public.pem
+    signing_kid: str | None = None  # kid или <name>; по умолчанию самый свежий ключ
+    keys_reload_interval: int = 30  # seconds
+    algorithm: str = "RS256"  # подпись: RS256/PS256 (RSA), ES256 (P-256), EdDSA (Ed25519)
+    accepted_algorithms: list[str] = []  # проверка на время перехода, пусто - любой ключ из certs_dir
+    issuer: str | None = None  # claim iss и issuer в discovery
+    jwks_max_age: int = 300  # seconds, Cache-Control для /.well-known/jwks.json
     access_token_expires_in: int = 15  # minutes
+    claims_cache_maxsize: int = 100_000  # проверенные access токены в памяти процесса, до exp
     refresh_token_expires_days: int = 30
 
 
+class UserServiceConfig(BaseModel):
+    """
+    Пул соединений httpx к user_service
+    """
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0  # seconds
+    http2: bool = False  # требует экстру http2 (httpx[http2])
+
+    connect_timeout: float = 2.0
+    pool_timeout: float = 2.0
+    # таймауты чтения по операциям
+    read_timeout: float = 5.0
+    create_timeout: float = 10.0
+
+    # X-Service-Secret в callbacks от user_service (profile-changed); не задан - callbacks закрыты
+    callback_secret: str | None = None
+
+
+class HashingConfig(BaseModel):
+    """
+    Хеширование паролей и пул потоков для него (bcrypt и argon2 отпускают GIL).
+    Параметры под железо: manage.py calibrate_password_hash
+    """
+    workers: int = min(4, os.cpu_count() or 1)
+    max_queue: int = 32  # сверх workers, дальше 503
+    retry_after: int = 1  # seconds
+
+    # для новых хешей, старые проверяются по префиксу; argon2id - экстра argon2 (argon2-cffi)
+    algorithm: Literal["bcrypt", "argon2id"] = "bcrypt"
+    bcrypt_rounds: int = 12
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536  # KiB
+    argon2_parallelism: int = 1
+    rehash_on_login: bool = True  # перехешировать устаревшие хеши при успешном входе
+
+
+class ProfileCacheConfig(BaseModel):
+    """
+    Кеш профилей user_service: LRU в процессе + Redis
+    """
+    local_maxsize: int = 10_000
+    local_ttl: float = 5.0  # seconds
+    redis_ttl: int = 60  # seconds
+
+
+class IntrospectionConfig(BaseModel):
+    """
+    Пакетная проверка токенов для gateway
+    """
+    client_secret: str | None = None  # заголовок X-Introspection-Secret; не задан - endpoint закрыт
+    max_batch: int = 100
+    cache_maxsize: int = 100_000
+    negative_cache_ttl: float = 5.0  # seconds
+    revocable_cache_ttl: float = 5.0  # x-auth, cookie и refresh могут отозвать раньше exp
+
+
+class RevocationConfig(BaseModel):
+    """
+    Отзыв access токенов по jti: Bloom фильтр в каждом воркере,
+    синхронизация через Redis pub/sub
+    """
+    channel: str = "token_revocations"
+    slice_seconds: int = 900  # фильтр на каждый интервал exp, выбрасывается целиком
+    slice_capacity: int = 100_000  # отзывов на интервал
+    error_rate: float = 0.001  # доля ложных срабатываний (лишний запрос в Redis)
+    resync_backoff: float = 1.0  # seconds, пауза перед переподпиской
+
+
+class LoginBookkeepingConfig(BaseModel):
+    """
+    last_login копится в Redis и пишется в БД пачками (services/login_bookkeeping.py)
+    """
+    flush_interval: float = 5.0  # seconds
+    flush_size: int = 1000  # сбросить раньше, если накопилось столько пользователей
+    batch_size: int = 500  # пользователей на один UPDATE
+    lock_ttl: int = 60  # seconds, сбрасывает один воркер за раз
+
+
+class MetricsConfig(BaseModel):
+    """
+    /metrics для Prometheus
+    """
+    token: str | None = None  # если задан, нужен Authorization: Bearer <token>
+
+
+class ProfilingConfig(BaseModel):
+    """
+    Профилирование запросов по выборке или по подписанному заголовку X-Debug-Profile
+    """
+    sample_rate: float = 0.0  # доля профилируемых запросов, 0 - только по заголовку
+    header_secret: str | None = None  # ключ подписи заголовка, без него заголовок игнорируется
+    header_max_age: int = 300  # seconds, срок жизни подписи
+    directory: Path = Path(tempfile.gettempdir()) / "auth_service_profiles"
+    ring_size: int = 200  # сколько последних профилей хранить
+    top_functions: int = 40
+
+
+class RedisConfig(BaseModel):
+    """
+    standalone - один сервер, sentinel - failover через Sentinel,
+    cluster - Redis Cluster (db всегда 0)
+    """
+    mode: Literal["standalone", "sentinel", "cluster"] = "standalone"
+    host: str = "localhost"
+    port: int = 6379
+    db: int = 1
+    username: str | None = None
+    password: str | None = None
+    ssl: bool = False
+    decode_responses: bool = True
+
+    # пул соединений
+    max_connections: int = 100
+    pool_timeout: float = 2.0  # ожидание свободного соединения, seconds
+    socket_timeout: float = 2.0
+    socket_connect_timeout: float = 2.0
+    health_check_interval: int = 30
+
+    # повтор при ConnectionError / TimeoutError
+    retry_attempts: int = 3
+    retry_backoff_base: float = 0.05  # seconds
+    retry_backoff_cap: float = 1.0
+
+    # sentinel: ["host:port", ...]
+    sentinels: list[str] = []
+    sentinel_master: str = "mymaster"
+    sentinel_password: str | None = None
+
+    # cluster: стартовые ноды ["host:port", ...], по умолчанию host:port
+    cluster_nodes: list[str] = []
+
+
 class DataBaseConfig(BaseModel):
     url: PostgresDsn
+    # read-only реплики; читают с них только явно разрешенные запросы (auth_app/db_router.py)
+    replica_urls: list[PostgresDsn] = []
     echo: bool = False
     echo_pool: bool = False
-    pool_pre_ping: bool = True
+    pool_pre_ping: bool = True  # проверка соединения перед использованием
+    # pool=True - пул psycopg 3 на процесс: pool_size постоянных + max_overflow.
+    # Иначе постоянные соединения на поток с временем жизни conn_max_age
+    pool: bool = False  # asgi.py по умолчанию ставит True
     max_overflow: int = 10
     pool_size: int = 50
+    pool_timeout: float = 5.0  # seconds, ожидание свободного соединения
+    conn_max_age: int = 60  # seconds; asgi.py по умолчанию ставит 0
 
     naming_conventions: dict[str, str] = {
         "ix": "ix_%(column_0_label)s",
@@ -73,6 +223,15 @@ class Settings(BaseSettings):
     api: ApiPrefix = ApiPrefix()
     db: DataBaseConfig
     auth_jwt: AuthJWT = AuthJWT()
+    user_service: UserServiceConfig = UserServiceConfig()
+    hashing: HashingConfig = HashingConfig()
+    profile_cache: ProfileCacheConfig = ProfileCacheConfig()
+    redis: RedisConfig = RedisConfig()
+    introspection: IntrospectionConfig = IntrospectionConfig()
+    revocation: RevocationConfig = RevocationConfig()
+    login_bookkeeping: LoginBookkeepingConfig = LoginBookkeepingConfig()
+    metrics: MetricsConfig = MetricsConfig()
+    profiling: ProfilingConfig = ProfilingConfig()
 
 
 pydantic_settings = Settings()
@@ -0,0 +1,63 @@
+"""
+Запись о пользователе при x-auth-token и cookie-сессии.
+
+Redis hash {uid, username, email, iat} пишется один раз при выдаче токена,
+поэтому проверка токена - один HGETALL и ни одного запроса в user_service.
+У каждого вида токенов есть индекс пользователя (sorted set token -> время
+истечения): по нему записи обновляются при смене профиля и удаляются разом.
+"""
+import math
+import time
+
+
+def build_record(user_id: int, username: str | None, email: str | None) -> dict:
+    return {
+        "uid": user_id,
+        "username": username or "",
+        "email": email or "",
+        "iat": int(time.time()),
+    }
+
+
+def parse_record(raw: dict | None) -> dict | None:
+    if not raw or "uid" not in raw:
+        return None
+    return {
+        "user_id": int(raw["uid"]),
+        "username": raw.get("username") or None,
+        "email": raw.get("email") or None,
+        "iat": int(raw.get("iat", 0)),
+    }
+
+
+def queue_store(pipe, key: str, index_key: str, token: str, record: dict, ttl: int) -> None:
+    now = time.time()
+    pipe.hset(key, mapping=record)
+    pipe.expire(key, ttl)
+    pipe.zadd(index_key, {token: now + ttl})
+    # Заодно выкидываем из индекса протухшие токены
+    pipe.zremrangebyscore(index_key, "-inf", now)
+    pipe.expire(index_key, ttl)
+
+
+def queue_profile_update(
+        pipe,
+        entries: list[tuple[str, float]],
+        prefix: str,
+        username: str | None,
+        email: str | None,
+) -> None:
+    """
+    entries - (token, expires_at) из индекса. EXPIREAT сразу после HSET:
+    если запись успела истечь, HSET создал бы ее заново без TTL
+    """
+    fields = {}
+    if username is not None:
+        fields["username"] = username
+    if email is not None:
+        fields["email"] = email
+    if not fields:
+        return
+    for token, expires_at in entries:
+        pipe.hset(prefix + token, mapping=fields)
+        pipe.expireat(prefix + token, math.ceil(expires_at))
@@ -0,0 +1,137 @@
+"""
+Refresh токены: много устройств на пользователя, ротация с обнаружением повторного использования.
+
+Токен ищется по HMAC digest (уникальный индекс), сам JWT не хранится.
+При обновлении старый токен помечается отозванным, новый выдается в том же
+family_id. Если предъявлен уже отозванный токен той же цепочки - его
+украли (или использовали дважды), и отзывается вся цепочка.
+"""
+import uuid
+from datetime import datetime, timedelta
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+from rest_framework.exceptions import AuthenticationFailed
+
+from auth_app.api.core.helpers import create_refresh_token
+from auth_app.config import pydantic_settings
+from auth_app.models import RefreshToken
+
+DIGEST_SALT = "auth_app.refresh_token"
+
+
+def refresh_token_digest(token: str) -> str:
+    # HMAC на SECRET_KEY: по утекшей таблице токен не подобрать и не проверить
+    return salted_hmac(DIGEST_SALT, token, algorithm="sha256").hexdigest()
+
+
+def _expires_at() -> datetime:
+    return timezone.now() + timedelta(days=pydantic_settings.auth_jwt.refresh_token_expires_days)
+
+
+def _build(user_id: int, email: str | None, family_id: uuid.UUID | None) -> tuple[str, RefreshToken]:
+    token = create_refresh_token(user_id, email)
+    row = RefreshToken(
+        user_id=user_id,
+        token_digest=refresh_token_digest(token),
+        family_id=family_id or uuid.uuid4(),
+        expires_at=_expires_at(),
+    )
+    return token, row
+
+
+def issue_refresh_token(user_id: int, email: str | None, family_id: uuid.UUID | None = None) -> str:
+    """
+    Новый refresh token; без family_id - новая цепочка (новое устройство)
+    """
+    token, row = _build(user_id, email, family_id)
+    row.save(force_insert=True)
+    return token
+
+
+async def aissue_refresh_token(user_id: int, email: str | None, family_id: uuid.UUID | None = None) -> str:
+    token, row = _build(user_id, email, family_id)
+    await row.asave(force_insert=True)
+    return token
+
+
+def rotate_refresh_token(token: str, user_id: int, email: str | None) -> str:
+    """
+    Гасит предъявленный токен и выдает следующий в той же цепочке
+    """
+    now = timezone.now()
+    row = RefreshToken.objects.filter(
+        token_digest=refresh_token_digest(token),
+    ).only("id", "user_id", "family_id", "expires_at", "revoked_at").first()
+
+    if row is None or str(row.user_id) != str(user_id) or row.expires_at <= now:
+        raise AuthenticationFailed("Refresh token revoked or invalid")
+
+    # Подписываем до транзакции: строка не заблокирована на время подписи
+    new_token, new_row = _build(row.user_id, email, row.family_id)
+    # Погашение и выдача - одна транзакция: если вставка упадет, старый
+    # токен остается действующим, и повтор клиента не примут за кражу
+    with transaction.atomic():
+        # Условный UPDATE: из двух параллельных обновлений выиграет только одно
+        claimed = RefreshToken.objects.filter(
+            id=row.id, revoked_at__isnull=True,
+        ).update(revoked_at=now)
+        if claimed:
+            new_row.save(force_insert=True)
+            return new_token
+
+    revoke_family(row.family_id)
+    raise AuthenticationFailed("Refresh token reuse detected")
+
+
+async def arotate_refresh_token(token: str, user_id: int, email: str | None) -> str:
+    return await sync_to_async(rotate_refresh_token)(token, user_id, email)
+
+
+def revoke_family(family_id: uuid.UUID) -> int:
+    return RefreshToken.objects.filter(
+        family_id=family_id, revoked_at__isnull=True,
+    ).update(revoked_at=timezone.now())
+
+
+async def arevoke_family(family_id: uuid.UUID) -> int:
+    return await RefreshToken.objects.filter(
+        family_id=family_id, revoked_at__isnull=True,
+    ).aupdate(revoked_at=timezone.now())
+
+
+async def arevoke_token(token: str) -> int:
+    """
+    Отзывает цепочку, к которой принадлежит токен
+    """
+    family_id = await RefreshToken.objects.filter(
+        token_digest=refresh_token_digest(token),
+    ).values_list("family_id", flat=True).afirst()
+    if family_id is None:
+        return 0
+    return await arevoke_family(family_id)
+
+
+def revoke_user_refresh_tokens(user_id: int) -> int:
+    """
+    Выход на всех устройствах
+    """
+    return RefreshToken.objects.filter(
+        user_id=user_id, revoked_at__isnull=True,
+    ).update(revoked_at=timezone.now())
+
+
+async def arevoke_user_refresh_tokens(user_id: int) -> int:
+    return await RefreshToken.objects.filter(
+        user_id=user_id, revoked_at__isnull=True,
+    ).aupdate(revoked_at=timezone.now())
+
+
+def purge_expired_refresh_tokens() -> int:
+    """
+    Истекшие строки больше не нужны даже для обнаружения повторов
+    """
+    deleted, _ = RefreshToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
@@ -1,29 +1,114 @@
+import time
 import uuid
+
+import redis
 from django.conf import settings
 
-from auth_app.redis_client import redis_client
+from auth_app.redis_client import redis_client, get_async_redis_client, pipeline
+from auth_app.crud.identity_records import (
+    build_record, parse_record,
+    queue_store, queue_profile_update,
+)
 
 SESSION_PREFIX = "session:"
 SESSION_TTL = getattr(settings, "COOKIE_SESSION_TTL", 60 * 15)
 
+# Индекс сессий пользователя: sorted set token -> время истечения.
+# Позволяет найти все сессии пользователя без обхода всего keyspace
+USER_SESSIONS_PREFIX = "user_sessions:"
+
+
+def _index_key(user_id: int | str) -> str:
+    return f"{USER_SESSIONS_PREFIX}{user_id}"
+
+
+def _queue_create(pipe, token: str, record: dict) -> None:
+    queue_store(pipe, SESSION_PREFIX + token, _index_key(record["uid"]), token, record, SESSION_TTL)
+
+
+def _queue_touch(pipe, token: str, user_id: int | str) -> None:
+    index = _index_key(user_id)
+    pipe.expire(SESSION_PREFIX + token, SESSION_TTL)
+    pipe.zadd(index, {token: time.time() + SESSION_TTL}, xx=True)
+    pipe.expire(index, SESSION_TTL)
+
+
+def _queue_delete(pipe, token: str, user_id: int | str) -> None:
+    pipe.delete(SESSION_PREFIX + token)
+    pipe.zrem(_index_key(user_id), token)
+
 
-def create_session(user_id: int) -> str:
+def create_session(user_id: int, username: str | None = None, email: str | None = None) -> str:
     token = uuid.uuid4().hex
-    key = SESSION_PREFIX + token
-    redis_client.set(key, user_id, ex=SESSION_TTL)
+    pipe = pipeline(redis_client)
+    _queue_create(pipe, token, build_record(user_id, username, email))
+    pipe.execute()
     return token
 
 
-def get_session(token: str) -> int | None:
-    key = SESSION_PREFIX + token
-    user_id: int = redis_client.get(key)
-    if user_id is not None:
+async def acreate_session(user_id: int, username: str | None = None, email: str | None = None) -> str:
+    token = uuid.uuid4().hex
+    pipe = pipeline(get_async_redis_client())
+    _queue_create(pipe, token, build_record(user_id, username, email))
+    await pipe.execute()
+    return token
+
+
+def get_session(token: str) -> dict | None:
+    """
+    {user_id, username, email, iat} или None
+    """
+    try:
+        session = parse_record(redis_client.hgetall(SESSION_PREFIX + token))
+    except redis.ResponseError:  # WRONGTYPE: сессия старого формата (только user_id)
+        return None
+    if session is not None:
         # продлеваем жизнь сессии (можете убрать)
-        redis_client.expire(key, SESSION_TTL)
-        return user_id
-    return None
+        pipe = pipeline(redis_client)
+        _queue_touch(pipe, token, session["user_id"])
+        pipe.execute()
+    return session
 
 
 def delete_session(token: str) -> None:
     key = SESSION_PREFIX + token
-    redis_client.delete(key)
+    try:
+        user_id = redis_client.hget(key, "uid")
+    except redis.ResponseError:
+        redis_client.delete(key)
+        return
+    if user_id is None:
+        return
+    pipe = pipeline(redis_client)
+    _queue_delete(pipe, token, user_id)
+    pipe.execute()
+
+
+def update_user_sessions(user_id: int, username: str | None, email: str | None) -> int:
+    """
+    Новые username/email во все живые сессии пользователя
+    """
+    entries = redis_client.zrangebyscore(_index_key(user_id), time.time(), "+inf", withscores=True)
+    if not entries:
+        return 0
+    pipe = pipeline(redis_client, transaction=False)
+    queue_profile_update(pipe, entries, SESSION_PREFIX, username, email)
+    pipe.execute()
+    return len(entries)
+
+
+def revoke_user_sessions(user_id: int) -> int:
+    """
+    Удаляет все сессии пользователя: O(сессий пользователя)
+    """
+    index = _index_key(user_id)
+    tokens = redis_client.zrange(index, 0, -1)
+    if not tokens:
+        return 0
+    pipe = pipeline(redis_client)
+    for token in tokens:
+        pipe.delete(SESSION_PREFIX + token)
+    # Не удаляем индекс целиком: сессия, созданная прямо сейчас, останется в нем
+    pipe.zrem(index, *tokens)
+    pipe.execute()
+    return len(tokens)
@@ -1,24 +1,73 @@
+import time
+
 import redis
-import httpx
-from django.conf import settings
 from rest_framework import exceptions
 
-from auth_app.config import pydantic_settings
-from auth_app.redis_client import redis_client
+from auth_app.redis_client import redis_client, get_async_redis_client, pipeline
+from auth_app.crud.identity_records import (
+    build_record, parse_record,
+    queue_store, queue_profile_update,
+)
+
+STATIC_TOKEN_PREFIX = "static_auth_token:"
+
+# Индекс x-auth-token пользователя: sorted set token -> время истечения
+USER_STATIC_TOKENS_PREFIX = "user_static_tokens:"
+
+
+def _index_key(user_id: int | str) -> str:
+    return f"{USER_STATIC_TOKENS_PREFIX}{user_id}"
 
 
 # ---- tokens ----
 def store_static_token(
         token: str,
         user_id: int,
+        username: str | None = None,
+        email: str | None = None,
         ttl: int = 3600
 ) -> None:
-    redis_client.set(f"static_auth_token:{token}", user_id, ex=ttl)
+    pipe = pipeline(redis_client)
+    queue_store(
+        pipe, STATIC_TOKEN_PREFIX + token, _index_key(user_id),
+        token, build_record(user_id, username, email), ttl,
+    )
+    pipe.execute()
+
+
+def get_static_token(token: str) -> dict | None:
+    """
+    {user_id, username, email, iat} или None
+    """
+    try:
+        return parse_record(redis_client.hgetall(STATIC_TOKEN_PREFIX + token))
+    except redis.ResponseError:  # WRONGTYPE: токен старого формата (только user_id)
+        return None
+
+
+async def aget_static_token(token: str) -> dict | None:
+    try:
+        return parse_record(await get_async_redis_client().hgetall(STATIC_TOKEN_PREFIX + token))
+    except redis.ResponseError:
+        return None
 
 
 def get_user_id_by_static_auth_token(token: str) -> int | None:
-    user_id: str = redis_client.get(f"static_auth_token:{token}")
-    return int(user_id) if user_id else None
+    record = get_static_token(token)
+    return record["user_id"] if record else None
+
+
+async def aget_user_id_by_static_auth_token(token: str) -> int | None:
+    record = await aget_static_token(token)
+    return record["user_id"] if record else None
+
+
+def _username(record: dict | None) -> str:
+    if record is None:
+        raise exceptions.AuthenticationFailed("Invalid token")
+    if not record["username"]:
+        raise exceptions.AuthenticationFailed("User not found")
+    return record["username"]
 
 
 def get_username_by_static_auth_token(request):
@@ -26,18 +75,39 @@ def get_username_by_static_auth_token(request):
     if not token:
         raise exceptions.AuthenticationFailed("Missing token")
 
-    user_id = get_user_id_by_static_auth_token(token)
-    if not user_id:
-        raise exceptions.AuthenticationFailed("Invalid token")
+    # username лежит в записи токена, user_service не нужен
+    return _username(get_static_token(token))
 
-    # Запрос к user_service
-    with httpx.Client(timeout=5.0) as client:
-        response = client.get(
-            f"{pydantic_settings.user_service_url}/api/v1/users/{user_id}/"
-        )
 
-    if response.status_code != 200:
-        raise exceptions.AuthenticationFailed("User not found")
+async def aget_username_by_static_auth_token(request):
+    token = request.headers.get("x-auth-token")
+    if not token:
+        raise exceptions.AuthenticationFailed("Missing token")
+
+    return _username(await aget_static_token(token))
+
+
+def update_user_static_tokens(user_id: int, username: str | None, email: str | None) -> int:
+    """
+    Новые username/email во все живые x-auth-token пользователя
+    """
+    entries = redis_client.zrangebyscore(_index_key(user_id), time.time(), "+inf", withscores=True)
+    if not entries:
+        return 0
+    pipe = pipeline(redis_client, transaction=False)
+    queue_profile_update(pipe, entries, STATIC_TOKEN_PREFIX, username, email)
+    pipe.execute()
+    return len(entries)
+
 
-    user_data = response.json()
-    return user_data["username"]
\ No newline at end of file
+def revoke_user_static_tokens(user_id: int) -> int:
+    index = _index_key(user_id)
+    tokens = redis_client.zrange(index, 0, -1)
+    if not tokens:
+        return 0
+    pipe = pipeline(redis_client)
+    for token in tokens:
+        pipe.delete(STATIC_TOKEN_PREFIX + token)
+    pipe.zrem(index, *tokens)
+    pipe.execute()
+    return len(tokens)
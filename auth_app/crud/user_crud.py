@@ -4,63 +4,194 @@ read
 update
 delete
 """
-import json
-import httpx
-from typing import Sequence, Optional
+from typing import AsyncIterator, Sequence, Optional
+from asgiref.sync import sync_to_async
 from django.core.exceptions import ObjectDoesNotExist
 
-from auth_app.config import pydantic_settings
 from auth_app.models import AuthUser
-from auth_app.redis_client import redis_client
+from auth_app.config import pydantic_settings
+from auth_app.db_router import prefer_replica
+from auth_app.crud import session_crud, tokens_crud
+from auth_app.services.hashing import HashingOverloaded
+from auth_app.services.security import ahash_password, password_needs_rehash
+from auth_app.services.http_client import (
+    get_user_service_client, get_async_user_service_client,
+    get_timeout, LOOKUP, CREATE,
+)
+from auth_app.services.profile_cache import profile_cache
+from auth_app.services.metrics import time_dependency, USER_SERVICE
+from auth_app.services.login_throttle import login_throttle
 
 
 # ---- users ----
 def get_all_users() -> Sequence[AuthUser]:
-    return list(AuthUser.objects.order_by("user_id"))
+    with prefer_replica():
+        return list(AuthUser.objects.order_by("user_id"))
+
+
+# Колонки, которые можно отдавать списком (без password)
+USER_LIST_FIELDS = ("user_id", "updated_at", "last_login")
+
+
+def get_users_page(
+        fields: Sequence[str],
+        after: int | None = None,
+        limit: int = 100,
+) -> list[dict]:
+    """
+    Keyset пагинация по user_id: WHERE user_id > after ORDER BY user_id LIMIT
+    """
+    queryset = AuthUser.objects.order_by("user_id")
+    if after is not None:
+        queryset = queryset.filter(user_id__gt=after)
+    with prefer_replica():
+        return list(queryset.values(*fields)[:limit])
+
+
+async def aiter_users(
+        fields: Sequence[str],
+        chunk_size: int = 2000,
+) -> AsyncIterator[list[dict]]:
+    """
+    Вся таблица keyset страницами по chunk_size строк (fields должны содержать user_id).
+    Async: под ASGI синхронный итератор StreamingHttpResponse собрал бы в память целиком.
+    Между страницами соединение с БД не держится, медленный клиент его не занимает
+    """
+    after = None
+    while True:
+        page = await sync_to_async(get_users_page)(fields, after=after, limit=chunk_size)
+        if page:
+            yield page
+        if len(page) < chunk_size:
+            return
+        after = page[-1]["user_id"]
 
 
 def get_auth_user(
         user_id: int,
 ) -> Optional[AuthUser]:
     try:
-        user = AuthUser.objects.get(user_id=user_id)
+        with prefer_replica():
+            user = AuthUser.objects.get(user_id=user_id)
         return user
     except ObjectDoesNotExist:
         raise
 
 
+async def arehash_password_if_needed(auth_user: AuthUser, password: str) -> bool:
+    """
+    После успешного входа: перехешировать пароль, если хеш устарел
+    (другой алгоритм или параметры). Условный UPDATE по старому хешу -
+    параллельная смена пароля не перезаписывается
+    """
+    if not pydantic_settings.hashing.rehash_on_login or not password_needs_rehash(auth_user.password):
+        return False
+    old_hash = auth_user.password
+    if isinstance(old_hash, memoryview):
+        old_hash = old_hash.tobytes()
+    try:
+        new_hash = await ahash_password(password)
+    except HashingOverloaded:
+        return False  # вход не ломаем, перехешируем в следующий раз
+    updated = await AuthUser.objects.filter(
+        user_id=auth_user.user_id, password=old_hash,
+    ).aupdate(password=new_hash)
+    if updated:
+        auth_user.password = new_hash
+    return bool(updated)
+
+
 # --- with request to user_service ---
 
-def get_user_service_user_by_id(user_id: int):
-    with httpx.Client(timeout=10.0) as client:
+def _fetch_user_service_user_by_id(user_id: int):
+    client = get_user_service_client()
+    with time_dependency(USER_SERVICE, "get_by_id"):
         response = client.get(
-            f"{pydantic_settings.user_service_url}/api/v1/users/{user_id}/"
+            f"/api/v1/users/{user_id}/",
+            timeout=get_timeout(LOOKUP),
         )
-        response.raise_for_status()
+    response.raise_for_status()
 
     return response.json()
 
 
-def get_user_service_user_by_username(username: str):
-    with httpx.Client(timeout=10.0) as client:
+def _fetch_user_service_user_by_username(username: str):
+    client = get_user_service_client()
+    with time_dependency(USER_SERVICE, "get_by_username"):
         response = client.get(
-            f"{pydantic_settings.user_service_url}/api/v1/users/username/{username}/"
+            f"/api/v1/users/username/{username}/",
+            timeout=get_timeout(LOOKUP),
+        )
+    response.raise_for_status()
+
+    return response.json()
+
+
+async def _afetch_user_service_user_by_id(user_id: int):
+    client = get_async_user_service_client()
+    with time_dependency(USER_SERVICE, "get_by_id"):
+        response = await client.get(
+            f"/api/v1/users/{user_id}/",
+            timeout=get_timeout(LOOKUP),
         )
-        response.raise_for_status()
+    response.raise_for_status()
 
     return response.json()
 
 
+async def _afetch_user_service_user_by_username(username: str):
+    client = get_async_user_service_client()
+    with time_dependency(USER_SERVICE, "get_by_username"):
+        response = await client.get(
+            f"/api/v1/users/username/{username}/",
+            timeout=get_timeout(LOOKUP),
+        )
+    response.raise_for_status()
+
+    return response.json()
+
+
+# Чтение профиля идет через кеш, см. services/profile_cache.py
+def get_user_service_user_by_id(user_id: int):
+    return profile_cache.get_by_id(
+        user_id, lambda: _fetch_user_service_user_by_id(user_id)
+    )
+
+
+def get_user_service_user_by_username(username: str):
+    return profile_cache.get_by_username(
+        username, lambda: _fetch_user_service_user_by_username(username)
+    )
+
+
+async def aget_user_service_user_by_id(user_id: int):
+    return await profile_cache.aget_by_id(
+        user_id, lambda: _afetch_user_service_user_by_id(user_id)
+    )
+
+
+async def aget_user_service_user_by_username(username: str):
+    return await profile_cache.aget_by_username(
+        username, lambda: _afetch_user_service_user_by_username(username)
+    )
+
+
+def invalidate_user_service_user(user_id: int | None = None, username: str | None = None) -> None:
+    profile_cache.invalidate(user_id=user_id, username=username)
+
+
 def create_user_service_user(username, email):
-    with httpx.Client(timeout=10.0) as client:
+    client = get_user_service_client()
+    with time_dependency(USER_SERVICE, "create"):
         response = client.post(
-            f"{pydantic_settings.user_service_url}/api/v1/users/create_user/",
+            "/api/v1/users/create_user/",
             json={
                 "username": username,
                 "email": email,
-            }
+            },
+            timeout=get_timeout(CREATE),
         )
-        response.raise_for_status()
+    response.raise_for_status()
 
     return response.json()
 
@@ -72,28 +203,40 @@ def delete_auth_user_redis_data(user) -> None:
     user_data = get_user_service_user_by_id(user_id)
     username = user_data.get("username")
 
+    invalidate_user_service_user(user_id=user_id, username=username)
+
     # Удаляем счетчик неудачных попыток
-    redis_client.delete(f"failed_attempts:{username}")
+    login_throttle.reset(username)
 
-    # Удаляем все сессии, связанные с user_id
-    for key in redis_client.scan_iter("session:*"):
-        try:
-            session_data = redis_client.get(key)
-            if not session_data:
-                continue
+    # Удаляем все сессии и x-auth-token, связанные с user_id (по индексам пользователя)
+    session_crud.revoke_user_sessions(user_id)
+    tokens_crud.revoke_user_static_tokens(user_id)
 
-            parsed = json.loads(session_data)
-            if parsed.get("user_id") == user_id:
-                redis_client.delete(key)
 
-        except (json.JSONDecodeError, TypeError) as e:
-            continue
+def apply_profile_change(
+        user_id: int,
+        username: str | None = None,
+        email: str | None = None,
+        previous_username: str | None = None,
+) -> dict:
+    """
+    Профиль изменился в user_service: сбрасываем кеш профилей
+    и переписываем username/email в записях живых токенов
+    """
+    invalidate_user_service_user(user_id=user_id, username=username)
+    if previous_username:
+        invalidate_user_service_user(username=previous_username)
+    return {
+        "static_tokens": tokens_crud.update_user_static_tokens(user_id, username, email),
+        "sessions": session_crud.update_user_sessions(user_id, username, email),
+    }
 
 
 def delete_auth_user(
         user_id: int,
 ) -> None:
-    user = get_auth_user(user_id)
+    # Только с primary: только что созданный пользователь может еще не доехать до реплики
+    user = AuthUser.objects.get(user_id=user_id)
     if user:
         delete_auth_user_redis_data(user)  # чистим redis
         user.delete()
@@ -0,0 +1,66 @@
+"""
+Чтение с реплик только там, где отставание допустимо.
+
+По умолчанию все идет в default (primary). Код, которому подойдут
+данные с небольшим отставанием, оборачивает чтение в
+
+    with prefer_replica():
+        ...
+
+и запросы внутри уходят на одну из реплик (DataBaseConfig.replica_urls).
+Для ленивых querysets, которые читаются уже после выхода из блока
+(генераторы, streaming), - явное .using(replica_alias()).
+Внутри транзакции на primary чтение остается на primary: иначе
+не видно только что записанного. Без реплик ничего не меняется.
+
+Не для проверок, от которых зависит безопасность: хеш пароля при входе,
+ротация refresh token - только primary.
+"""
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_prefer_replica: ContextVar[bool] = ContextVar("prefer_replica", default=False)
+_replicas = None
+
+
+def replica_alias() -> str:
+    """
+    Следующая реплика по кругу; default, если реплик нет или идет транзакция
+    """
+    global _replicas
+    if _replicas is None:
+        aliases = [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+        _replicas = itertools.cycle(aliases) if aliases else iter(())
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return DEFAULT_DB_ALIAS
+    return next(_replicas, DEFAULT_DB_ALIAS)
+
+
+@contextmanager
+def prefer_replica():
+    token = _prefer_replica.set(True)
+    try:
+        yield
+    finally:
+        _prefer_replica.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _prefer_replica.get():
+            return DEFAULT_DB_ALIAS
+        return replica_alias()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики - копии default, объекты с них можно связывать
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
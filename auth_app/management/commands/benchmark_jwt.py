@@ -0,0 +1,92 @@
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+
+import jwt
+from django.core.management.base import BaseCommand, CommandError
+
+from auth_app.config import pydantic_settings
+from auth_app.management.commands.generate_jwt_key import ALGORITHMS, generate_private_key
+from auth_app.services.keyring import RSA_ALGORITHMS
+
+DEFAULT_ALGORITHMS = ["RS256", "ES256", "EdDSA"]
+
+
+class Command(BaseCommand):
+    help = "Сравнить стоимость подписи и проверки JWT по алгоритмам на этом железе"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, default=DEFAULT_ALGORITHMS)
+        parser.add_argument("--iterations", type=int, default=1000, help="операций на алгоритм")
+        parser.add_argument("--rsa-bits", type=int, default=2048)
+
+    @staticmethod
+    def _payload() -> dict:
+        # Как у access токена из jwt/login
+        now = datetime.now(timezone.utc)
+        return {
+            "type": "access",
+            "jti": uuid.uuid4().hex,
+            "sub": 12345,
+            "user_id": 12345,
+            "email": "benchmark@example.com",
+            "exp": now + timedelta(minutes=pydantic_settings.auth_jwt.access_token_expires_in),
+            "iat": now,
+        }
+
+    @staticmethod
+    def _median_us(operation, iterations: int) -> float:
+        operation()  # прогрев
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            operation()
+            timings.append((time.perf_counter() - started) * 1_000_000)
+        return statistics.median(timings)
+
+    def _measure(self, algorithm: str, iterations: int, rsa_bits: int) -> dict:
+        # Как в KeyRing: ключи распарсены заранее, kid в заголовке
+        private_key = generate_private_key(algorithm, rsa_bits)
+        public_key = private_key.public_key()
+        payload = self._payload()
+        headers = {"kid": "benchmark"}
+        token = jwt.encode(payload, private_key, algorithm=algorithm, headers=headers)
+
+        sign_us = self._median_us(
+            lambda: jwt.encode(payload, private_key, algorithm=algorithm, headers=headers), iterations,
+        )
+        verify_us = self._median_us(
+            lambda: jwt.decode(token, public_key, algorithms=[algorithm]), iterations,
+        )
+        return {"sign": sign_us, "verify": verify_us, "size": len(token)}
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be positive")
+
+        self.stdout.write(f"median of {options['iterations']} operations, single thread")
+        self.stdout.write(
+            f"  {'algorithm':<14} {'sign us':>9} {'verify us':>10} {'sign/s':>8} "
+            f"{'verify/s':>9} {'login us':>9} {'token B':>8}"
+        )
+        results = {}
+        for algorithm in options["algorithms"]:
+            label = f"{algorithm}/{options['rsa_bits']}" if algorithm in RSA_ALGORITHMS else algorithm
+            result = self._measure(algorithm, options["iterations"], options["rsa_bits"])
+            results[algorithm] = result
+            # login и refresh выпускают два токена: access и refresh
+            self.stdout.write(
+                f"  {label:<14} {result['sign']:9.1f} {result['verify']:10.1f} "
+                f"{1_000_000 / result['sign']:8.0f} {1_000_000 / result['verify']:9.0f} "
+                f"{2 * result['sign']:9.1f} {result['size']:8}"
+            )
+
+        current = pydantic_settings.auth_jwt.algorithm
+        if current in results and len(results) > 1:
+            fastest = min(results, key=lambda name: results[name]["sign"])
+            if fastest != current:
+                self.stdout.write(self.style.SUCCESS(
+                    f"{fastest} signs {results[current]['sign'] / results[fastest]['sign']:.1f}x faster "
+                    f"than the configured {current}, see generate_jwt_key"
+                ))
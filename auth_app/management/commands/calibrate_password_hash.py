@@ -0,0 +1,98 @@
+import statistics
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from auth_app.config import pydantic_settings
+from auth_app.services.password_hashers import BCRYPT, ARGON2ID, BcryptHasher, Argon2idHasher
+
+ENV_PREFIX = "AUTH_SERVICE__HASHING__"
+# OWASP: не меньше 19 MiB для argon2id
+ARGON2_MIN_MEMORY_KIB = 19 * 1024
+
+
+class Command(BaseCommand):
+    help = "Подобрать стоимость хеширования паролей под целевое время проверки на этом железе"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--algorithm", choices=[BCRYPT, ARGON2ID], default=pydantic_settings.hashing.algorithm)
+        parser.add_argument("--target-ms", type=float, default=250.0, help="целевое время одной проверки")
+        parser.add_argument("--samples", type=int, default=5, help="проверок на каждый вариант")
+        parser.add_argument("--min-rounds", type=int, default=10)
+        parser.add_argument("--max-rounds", type=int, default=16)
+        parser.add_argument("--memory-kib", type=int, default=pydantic_settings.hashing.argon2_memory_cost)
+        parser.add_argument("--parallelism", type=int, default=pydantic_settings.hashing.argon2_parallelism)
+        parser.add_argument("--max-time-cost", type=int, default=10)
+
+    @staticmethod
+    def _verify_ms(hasher, samples: int) -> float:
+        password = "calibration-password"
+        hashed = hasher.hash(password)
+        timings = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            hasher.verify(password, hashed)
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+
+    def _report(self, label: str, ms: float, target: float) -> None:
+        marker = "" if ms <= target else "  > target"
+        self.stdout.write(f"  {label:<40} {ms:8.1f} ms{marker}")
+
+    def _calibrate_bcrypt(self, options) -> tuple[dict, float] | None:
+        best = None
+        for rounds in range(options["min_rounds"], options["max_rounds"] + 1):
+            ms = self._verify_ms(BcryptHasher(rounds), options["samples"])
+            self._report(f"rounds={rounds}", ms, options["target_ms"])
+            if ms > options["target_ms"]:
+                break  # каждая следующая ступень вдвое дороже
+            best = ({"BCRYPT_ROUNDS": rounds}, ms)
+        return best
+
+    def _calibrate_argon2(self, options) -> tuple[dict, float] | None:
+        memory = options["memory_kib"]
+        parallelism = options["parallelism"]
+        # Сначала память: если даже time_cost=1 не укладывается - уменьшаем ее
+        while True:
+            ms = self._verify_ms(Argon2idHasher(1, memory, parallelism), options["samples"])
+            self._report(f"time_cost=1 memory={memory}KiB p={parallelism}", ms, options["target_ms"])
+            if ms <= options["target_ms"] or memory // 2 < ARGON2_MIN_MEMORY_KIB:
+                break
+            memory //= 2
+        if ms > options["target_ms"]:
+            return None
+
+        best = ({"ARGON2_TIME_COST": 1, "ARGON2_MEMORY_COST": memory, "ARGON2_PARALLELISM": parallelism}, ms)
+        for time_cost in range(2, options["max_time_cost"] + 1):
+            ms = self._verify_ms(Argon2idHasher(time_cost, memory, parallelism), options["samples"])
+            self._report(f"time_cost={time_cost} memory={memory}KiB p={parallelism}", ms, options["target_ms"])
+            if ms > options["target_ms"]:
+                break
+            best = ({**best[0], "ARGON2_TIME_COST": time_cost}, ms)
+        return best
+
+    def handle(self, *args, **options):
+        algorithm = options["algorithm"]
+        self.stdout.write(f"{algorithm}, target {options['target_ms']:.0f} ms per verify (median of {options['samples']})")
+        try:
+            if algorithm == BCRYPT:
+                best = self._calibrate_bcrypt(options)
+            else:
+                best = self._calibrate_argon2(options)
+        except ImproperlyConfigured as exc:
+            raise CommandError(str(exc)) from exc
+
+        if best is None:
+            raise CommandError("Even the cheapest parameters exceed the target, raise --target-ms")
+
+        params, ms = best
+        workers = pydantic_settings.hashing.workers
+        self.stdout.write("")
+        self.stdout.write(self.style.SUCCESS(f"{ENV_PREFIX}ALGORITHM={algorithm}"))
+        for name, value in params.items():
+            self.stdout.write(self.style.SUCCESS(f"{ENV_PREFIX}{name}={value}"))
+        self.stdout.write(
+            f"~{ms:.0f} ms per login, up to ~{1000 / ms * workers:.0f} logins/s with {workers} hashing workers. "
+            "Existing hashes are upgraded on next login."
+        )
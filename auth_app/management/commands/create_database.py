@@ -0,0 +1,18 @@
+import psycopg2
+from django.core.management.base import BaseCommand, CommandError
+
+from auth_app.services.db_helper import create_db_if_not_exists
+
+
+class Command(BaseCommand):
+    help = "Создать базу данных из AUTH_SERVICE__DB__URL, если ее нет (перед migrate)"
+
+    def handle(self, *args, **options):
+        try:
+            created = create_db_if_not_exists()
+        except psycopg2.Error as exc:
+            raise CommandError(f"Не удалось подключиться к postgres: {exc}") from exc
+        if created:
+            self.stdout.write(self.style.SUCCESS("База данных создана"))
+        else:
+            self.stdout.write("База данных уже существует")
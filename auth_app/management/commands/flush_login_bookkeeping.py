@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from auth_app.services.login_bookkeeping import login_bookkeeping
+
+
+class Command(BaseCommand):
+    help = "Записать накопленные в Redis last_login в БД (например, перед остановкой всех воркеров)"
+
+    def handle(self, *args, **options):
+        flushed = login_bookkeeping.flush()
+        self.stdout.write(f"{flushed} users flushed, {login_bookkeeping.stats()['pending']} pending")
@@ -0,0 +1,92 @@
+"""
+Новая пара ключей для подписи JWT в CERTS_DIR.
+
+    python manage_auth_app.py generate_jwt_key --algorithm EdDSA
+
+Ключ сразу попадает в JWKS и проверку (после перечитывания связки),
+а подписывать им начинаем, когда AUTH_SERVICE__AUTH_JWT__ALGORITHM
+переключен на его алгоритм (см. services/keyring.py).
+"""
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from django.core.management.base import BaseCommand, CommandError
+
+from auth_app.config import pydantic_settings
+from auth_app.services.keyring import (
+    PRIVATE_SUFFIX, PUBLIC_SUFFIX, RSA_ALGORITHMS, EDDSA, jwk_thumbprint,
+)
+
+ALGORITHMS = (*RSA_ALGORITHMS, "ES256", "ES384", "ES512", EDDSA)
+CURVES = {"ES256": ec.SECP256R1, "ES384": ec.SECP384R1, "ES512": ec.SECP521R1}
+
+
+def generate_private_key(algorithm: str, rsa_bits: int = 2048):
+    if algorithm in RSA_ALGORITHMS:
+        return rsa.generate_private_key(public_exponent=65537, key_size=rsa_bits)
+    if algorithm in CURVES:
+        return ec.generate_private_key(CURVES[algorithm]())
+    return ed25519.Ed25519PrivateKey.generate()
+
+
+def _write(path: Path, data: bytes, mode: int) -> None:
+    # O_EXCL: не затираем существующий ключ, права выставлены до записи
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+    with os.fdopen(fd, "wb") as file:
+        file.write(data)
+
+
+class Command(BaseCommand):
+    help = "Сгенерировать пару ключей JWT (RSA, ES256 или EdDSA) в certs_dir"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--algorithm", choices=ALGORITHMS, default=EDDSA)
+        parser.add_argument("--name", default=None, help="по умолчанию jwt-<алгоритм>-<дата>")
+        parser.add_argument("--rsa-bits", type=int, default=2048)
+        parser.add_argument("--certs-dir", default=None, help="по умолчанию AUTH_JWT__CERTS_DIR")
+
+    def handle(self, *args, **options):
+        config = pydantic_settings.auth_jwt
+        algorithm = options["algorithm"]
+        certs_dir = Path(options["certs_dir"] or config.certs_dir)
+        name = options["name"] or (
+            f"jwt-{algorithm.lower()}-{datetime.now(timezone.utc):%Y%m%d%H%M%S}"
+        )
+        private_path = certs_dir / f"{name}{PRIVATE_SUFFIX}"
+        public_path = certs_dir / f"{name}{PUBLIC_SUFFIX}"
+        if private_path.exists() or public_path.exists():
+            raise CommandError(f"Key {name} already exists in {certs_dir}")
+        if algorithm in RSA_ALGORITHMS and options["rsa_bits"] < 2048:
+            raise CommandError("--rsa-bits must be at least 2048")
+
+        private_key = generate_private_key(algorithm, options["rsa_bits"])
+        public_key = private_key.public_key()
+        certs_dir.mkdir(parents=True, exist_ok=True)
+        # Сначала приватная часть: связка грузит пару, когда видит публичную
+        _write(private_path, private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ), 0o600)
+        _write(public_path, public_key.public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        ), 0o644)
+
+        self.stdout.write(self.style.SUCCESS(f"{name}: {algorithm}, kid {jwk_thumbprint(public_key, algorithm)}"))
+        self.stdout.write(f"  {private_path}")
+        self.stdout.write(f"  {public_path}")
+        if algorithm != config.algorithm:
+            self.stdout.write(
+                f"Published for verification on the next key reload (or SIGHUP). "
+                f"Switch signing after {config.jwks_max_age}s of JWKS caching: "
+                f"AUTH_SERVICE__AUTH_JWT__ALGORITHM={algorithm}"
+            )
+            if config.accepted_algorithms and algorithm not in config.accepted_algorithms:
+                self.stderr.write(
+                    f"{algorithm} is not in AUTH_SERVICE__AUTH_JWT__ACCEPTED_ALGORITHMS, "
+                    "tokens signed with it will be rejected"
+                )
@@ -0,0 +1,250 @@
+"""
+Массовый импорт AuthUser из старой системы.
+
+    python manage_auth_app.py import_users users.ndjson --batch-size 1000 --workers 8
+
+Вход - CSV с заголовком или NDJSON, поля: user_id и password (открытый)
+или password_hash (готовый bcrypt/argon2id, см. services/password_hashers.py).
+Профили в user_service должны быть перенесены отдельно: импорт не
+ходит ни в user_service, ни в Redis.
+
+Открытые пароли хешируются в пуле процессов пачками, пока предыдущая
+пачка пишется в БД. Каждая пачка - bulk_create в своей транзакции,
+после коммита номер последней записи пишется в checkpoint; --resume
+продолжает с него. Уже существующие user_id пропускаются.
+"""
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from auth_app.models import AuthUser
+from auth_app.services.password_hashers import get_password_hashers
+
+MAX_REPORTED_ERRORS = 20
+
+
+def _hash_row(hashers, row: dict) -> bytes | None:
+    if row.get("password_hash"):
+        hashed = row["password_hash"].encode("ascii")
+        # Только префикс пропустил бы "$2b$12$garbage", а вход с ним падает
+        return hashed if hashers.is_valid(hashed) else None
+    if row.get("password"):
+        return hashers.hash(row["password"])
+    return None
+
+
+def hash_batch(rows: list[dict]) -> list[tuple[int, bytes | None]]:
+    """
+    В процессе пула: (user_id, хеш) или (user_id, None) для невалидной строки
+    """
+    hashers = get_password_hashers()
+    result = []
+    for row in rows:
+        try:
+            hashed = _hash_row(hashers, row)
+        except (ValueError, TypeError):  # не-ASCII хеш, пароль не по вкусу bcrypt
+            # Одна плохая строка не должна ронять future.result() и весь импорт
+            hashed = None
+        result.append((row["user_id"], hashed))
+    return result
+
+
+def read_records(path: str, fmt: str):
+    """
+    (номер записи с 1, dict) потоком, без чтения файла целиком
+    """
+    stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        if fmt == "csv":
+            yield from enumerate(csv.DictReader(stream), start=1)
+        else:
+            number = 0
+            for line in stream:
+                if not line.strip():
+                    continue
+                number += 1
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                yield number, record
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+class Command(BaseCommand):
+    help = "Импорт пользователей из CSV/NDJSON пачками с хешированием в пуле процессов"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV/NDJSON файл или - для stdin")
+        parser.add_argument("--format", choices=["csv", "ndjson"], default=None, help="по умолчанию по расширению")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="процессов для хеширования")
+        parser.add_argument("--checkpoint", default=None, help="по умолчанию <path>.checkpoint")
+        parser.add_argument("--resume", action="store_true", help="продолжить с checkpoint")
+
+    # ---- checkpoint ----
+    @staticmethod
+    def _read_checkpoint(path: Path) -> dict:
+        try:
+            return json.loads(path.read_text())
+        except FileNotFoundError:
+            return {}
+
+    @staticmethod
+    def _write_checkpoint(path: Path, state: dict) -> None:
+        # Атомарно: при обрыве остается прошлый checkpoint, а не половина файла
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, path)
+
+    # ---- вход ----
+    @staticmethod
+    def _parse(number: int, record: dict | None) -> dict:
+        """
+        ValueError с причиной для записи, которую нельзя импортировать
+        """
+        if not isinstance(record, dict):
+            raise ValueError("not a JSON object")
+        try:
+            user_id = int(record["user_id"])
+        except (TypeError, KeyError, ValueError):
+            raise ValueError("user_id is missing or not an integer")
+        row = {"number": number, "user_id": user_id}
+        for field in ("password", "password_hash"):
+            value = record.get(field) or None
+            if value is not None and not isinstance(value, str):
+                raise ValueError(f"{field} must be a string")
+            row[field] = value
+        return row
+
+    def _invalid(self, number: int, reason: str, totals: dict) -> None:
+        totals["invalid"] += 1
+        if totals["invalid"] <= MAX_REPORTED_ERRORS:
+            self.stderr.write(f"record {number}: {reason}")
+
+    def _batches(self, records, batch_size: int):
+        """
+        Строки пачки, (номер, причина) нечитаемых записей, номер последней записи пачки
+        """
+        while True:
+            chunk = list(islice(records, batch_size))
+            if not chunk:
+                return
+            rows, unreadable = [], []
+            for number, record in chunk:
+                try:
+                    rows.append(self._parse(number, record))
+                except ValueError as exc:
+                    unreadable.append((number, str(exc)))
+            yield rows, unreadable, chunk[-1][0]
+
+    # ---- запись ----
+    def _insert(
+            self,
+            rows: list[dict],
+            unreadable: list[tuple[int, str]],
+            hashed: list[tuple[int, bytes | None]],
+            totals: dict,
+    ) -> None:
+        # Ошибки считаются здесь, а не при разборе: в checkpoint попадают только закоммиченные пачки
+        for number, reason in unreadable:
+            self._invalid(number, reason, totals)
+        users = {}
+        for row, (user_id, password) in zip(rows, hashed):
+            if password is None:
+                self._invalid(row["number"], "no password or invalid password_hash", totals)
+            elif user_id in users:
+                self._invalid(row["number"], f"duplicate user_id {user_id} in batch", totals)
+            else:
+                users[user_id] = password
+
+        with transaction.atomic():
+            existing = set(AuthUser.objects.filter(user_id__in=users).values_list("user_id", flat=True))
+            AuthUser.objects.bulk_create(
+                [AuthUser(user_id=user_id, password=password)
+                 for user_id, password in users.items() if user_id not in existing],
+                ignore_conflicts=True,  # параллельная регистрация между SELECT и INSERT
+            )
+        totals["skipped"] += len(existing)
+        totals["imported"] += len(users) - len(existing)
+
+    def _progress(self, totals: dict, started: float, position: int, final: bool = False) -> None:
+        elapsed = time.monotonic() - started
+        rate = totals["processed"] / elapsed if elapsed else 0.0
+        line = (
+            f"{position} records: {totals['imported']} imported, {totals['skipped']} existing, "
+            f"{totals['invalid']} invalid, {rate:.0f} records/s, {elapsed:.1f}s"
+        )
+        self.stdout.write(self.style.SUCCESS(line) if final else line)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or ("csv" if path.lower().endswith(".csv") else "ndjson")
+        if path == "-" and options["resume"] and options["checkpoint"] is None:
+            raise CommandError("--resume from stdin needs --checkpoint")
+        if path != "-" and not Path(path).exists():
+            raise CommandError(f"{path} not found")
+        if options["batch_size"] < 1 or options["workers"] < 1:
+            raise CommandError("--batch-size and --workers must be positive")
+
+        checkpoint = Path(options["checkpoint"] or f"{path if path != '-' else 'stdin'}.checkpoint")
+        state = self._read_checkpoint(checkpoint) if options["resume"] else {}
+        start_after = state.get("position", 0)
+        totals = {
+            "imported": state.get("imported", 0),
+            "skipped": state.get("skipped", 0),
+            "invalid": state.get("invalid", 0),
+            "processed": 0,  # в этом запуске, для скорости
+        }
+        if start_after:
+            self.stdout.write(f"resuming after record {start_after}")
+
+        records = read_records(path, fmt)
+        for _ in islice(records, start_after):
+            pass
+
+        started = time.monotonic()
+        last_report = started
+        in_flight = deque()
+        batches = self._batches(records, options["batch_size"])
+
+        with ProcessPoolExecutor(max_workers=options["workers"]) as pool:
+            def submit() -> bool:
+                batch = next(batches, None)
+                if batch is None:
+                    return False
+                rows, unreadable, position = batch
+                plain = [{k: row[k] for k in ("user_id", "password", "password_hash")} for row in rows]
+                in_flight.append((rows, unreadable, position, pool.submit(hash_batch, plain)))
+                return True
+
+            # Хешируем наперед не больше 2 пачек на процесс: память не растет с размером файла
+            while len(in_flight) < options["workers"] * 2 and submit():
+                pass
+            while in_flight:
+                rows, unreadable, position, future = in_flight.popleft()
+                self._insert(rows, unreadable, future.result(), totals)
+                totals["processed"] = position - start_after
+                self._write_checkpoint(checkpoint, {
+                    "position": position,
+                    "imported": totals["imported"],
+                    "skipped": totals["skipped"],
+                    "invalid": totals["invalid"],
+                })
+                if submit() and time.monotonic() - last_report >= 1:
+                    self._progress(totals, started, position)
+                    last_report = time.monotonic()
+            position = start_after + totals["processed"]
+
+        self._progress(totals, started, position, final=True)
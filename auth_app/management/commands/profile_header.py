@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from auth_app.config import pydantic_settings
+from auth_app.services.profiling import HEADER, sign_header
+
+
+class Command(BaseCommand):
+    help = "Подписанный заголовок для профилирования одного запроса"
+
+    def handle(self, *args, **options):
+        config = pydantic_settings.profiling
+        if not config.header_secret:
+            raise CommandError("AUTH_SERVICE__PROFILING__HEADER_SECRET is not set")
+        self.stdout.write(f"{HEADER}: {sign_header(config.header_secret)}")
+        self.stderr.write(f"valid for {config.header_max_age}s")
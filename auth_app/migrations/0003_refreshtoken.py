@@ -0,0 +1,67 @@
+import uuid
+from datetime import datetime, timezone
+
+import django.db.models.deletion
+import jwt
+from django.db import migrations, models
+from django.utils.crypto import salted_hmac
+
+
+def _expires_at(token: str) -> datetime | None:
+    # Токены - наши JWT: срок берем из exp. Подпись здесь не важна,
+    # токен все равно проверяется при использовании
+    try:
+        exp = jwt.decode(token, options={"verify_signature": False})["exp"]
+        return datetime.fromtimestamp(int(exp), tz=timezone.utc)
+    except (jwt.InvalidTokenError, KeyError, TypeError, ValueError, OverflowError):
+        return None
+
+
+def copy_refresh_tokens(apps, schema_editor):
+    # Единственный токен пользователя становится первой цепочкой ротации.
+    # Истекшие и нечитаемые токены не переносятся
+    AuthUser = apps.get_model("auth_app", "AuthUser")
+    RefreshToken = apps.get_model("auth_app", "RefreshToken")
+    now = datetime.now(timezone.utc)
+    rows = []
+    for user_id, token in (
+        AuthUser.objects.exclude(refresh_token__isnull=True)
+        .exclude(refresh_token="").values_list("user_id", "refresh_token").iterator()
+    ):
+        expires_at = _expires_at(token)
+        if expires_at is None or expires_at <= now:
+            continue
+        rows.append(RefreshToken(
+            user_id=user_id,
+            token_digest=salted_hmac("auth_app.refresh_token", token, algorithm="sha256").hexdigest(),
+            family_id=uuid.uuid4(),
+            expires_at=expires_at,
+        ))
+    RefreshToken.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0002_authuser_last_login'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RefreshToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token_digest', models.CharField(max_length=64, unique=True)),
+                ('family_id', models.UUIDField(db_index=True, default=uuid.uuid4)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField()),
+                ('revoked_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='refresh_tokens', to='auth_app.authuser')),
+            ],
+        ),
+        migrations.RunPython(copy_refresh_tokens, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='authuser',
+            name='refresh_token',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 17:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0003_refreshtoken'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='authuser',
+            name='last_login',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,5 +1,6 @@
 __all__ = (
-    "AuthUser"
+    "AuthUser",
+    "RefreshToken",
 )
 
-from .models import AuthUser
+from .models import AuthUser, RefreshToken
@@ -1,12 +1,14 @@
+import uuid
+
 from django.db import models
 
 
 class AuthUser(models.Model):
     user_id = models.AutoField(primary_key=True)
     password = models.BinaryField()
-    refresh_token = models.TextField(null=True, blank=True)
     updated_at = models.DateTimeField(auto_now=True)
-    last_login = models.DateTimeField(auto_now=True)
+    # Пишется пачками из services/login_bookkeeping.py, не при каждом входе
+    last_login = models.DateTimeField(null=True, blank=True)
 
     objects = models.Manager()
 
@@ -15,3 +17,29 @@ class AuthUser(models.Model):
 
     def __repr__(self) -> str:
         return str(self)
+
+
+class RefreshToken(models.Model):
+    """
+    Выданный refresh token. Сам токен не храним - только HMAC digest.
+    Все токены одной цепочки ротации (одного входа на одном устройстве)
+    имеют общий family_id
+    """
+    user = models.ForeignKey(
+        AuthUser,
+        on_delete=models.CASCADE,
+        related_name="refresh_tokens",
+    )
+    token_digest = models.CharField(max_length=64, unique=True)
+    family_id = models.UUIDField(default=uuid.uuid4, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+    revoked_at = models.DateTimeField(null=True, blank=True)
+
+    objects = models.Manager()
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(id={self.id}, user_id={self.user_id})"
+
+    def __repr__(self) -> str:
+        return str(self)
@@ -1,10 +1,287 @@
+"""
+Фабрика клиентов Redis.
+
+Все подключения (наш код и django-redis кеш) строятся из
+pydantic_settings.redis: общий блокирующий пул с лимитом соединений,
+таймауты, health check, повтор с экспоненциальной задержкой.
+Поддерживаются standalone, Sentinel и Cluster.
+
+Ключи, которые участвуют в одной multi-key операции, должны иметь
+общий hash tag (см. hash_tag), иначе на Cluster они попадут в разные слоты.
+"""
+import threading
+
 import redis
-from django.conf import settings
+import redis.asyncio
+import redis.asyncio.cluster
+import redis.asyncio.retry
+import redis.asyncio.sentinel
+import redis.cluster
+import redis.retry
+import redis.sentinel
+from redis.backoff import ExponentialBackoff
+from django_redis.pool import ConnectionFactory
+
+from auth_app.config import pydantic_settings
+from auth_app.services.metrics import time_dependency, REDIS
+from utils.loop_local import LoopLocal
+
+RETRY_ON_ERROR = [redis.ConnectionError, redis.TimeoutError]
+
+
+def hash_tag(value) -> str:
+    """
+    {value}: на Cluster все ключи с одинаковым тегом лежат в одном слоте
+    """
+    return f"{{{value}}}"
+
+
+def is_cluster() -> bool:
+    return pydantic_settings.redis.mode == "cluster"
+
+
+def pipeline(client, transaction: bool = True):
+    """
+    MULTI/EXEC там, где он возможен. На Cluster транзакция через
+    разные слоты запрещена, поэтому там обычный pipeline
+    """
+    if is_cluster():
+        return client.pipeline()
+    return client.pipeline(transaction=transaction)
+
+
+# ---- метрики: время каждой команды и каждого pipeline ----
+def _operation(args) -> str:
+    return str(args[0]).upper() if args else "?"
+
+
+class _TimedCommands:
+    def execute_command(self, *args, **options):
+        with time_dependency(REDIS, _operation(args)):
+            return super().execute_command(*args, **options)
+
+    def pipeline(self, *args, **kwargs):
+        pipe = super().pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        def timed_execute(*a, **kw):
+            with time_dependency(REDIS, "PIPELINE"):
+                return execute(*a, **kw)
+
+        pipe.execute = timed_execute
+        return pipe
+
+
+class _AsyncTimedCommands:
+    async def execute_command(self, *args, **options):
+        with time_dependency(REDIS, _operation(args)):
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, *args, **kwargs):
+        pipe = super().pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def timed_execute(*a, **kw):
+            with time_dependency(REDIS, "PIPELINE"):
+                return await execute(*a, **kw)
+
+        pipe.execute = timed_execute
+        return pipe
+
+
+class TimedRedis(_TimedCommands, redis.Redis):
+    pass
+
+
+class TimedRedisCluster(_TimedCommands, redis.cluster.RedisCluster):
+    pass
+
+
+class AsyncTimedRedis(_AsyncTimedCommands, redis.asyncio.Redis):
+    pass
+
+
+class AsyncTimedRedisCluster(_AsyncTimedCommands, redis.asyncio.cluster.RedisCluster):
+    pass
+
+
+def _parse_nodes(nodes: list[str]) -> list[tuple[str, int]]:
+    result = []
+    for node in nodes:
+        host, _, port = node.rpartition(":")
+        result.append((host, int(port)))
+    return result
+
+
+def _connection_kwargs(decode_responses: bool) -> dict:
+    config = pydantic_settings.redis
+    return {
+        "username": config.username,
+        "password": config.password,
+        "socket_timeout": config.socket_timeout,
+        "socket_connect_timeout": config.socket_connect_timeout,
+        "health_check_interval": config.health_check_interval,
+        "retry_on_error": RETRY_ON_ERROR,
+        "decode_responses": decode_responses,
+    }
+
+
+def _backoff() -> ExponentialBackoff:
+    config = pydantic_settings.redis
+    return ExponentialBackoff(cap=config.retry_backoff_cap, base=config.retry_backoff_base)
+
+
+# ---- sync ----
+def create_redis_client(decode_responses: bool | None = None):
+    config = pydantic_settings.redis
+    if decode_responses is None:
+        decode_responses = config.decode_responses
+    kwargs = _connection_kwargs(decode_responses)
+    kwargs["retry"] = redis.retry.Retry(_backoff(), config.retry_attempts)
+
+    if config.mode == "cluster":
+        nodes = _parse_nodes(config.cluster_nodes) or [(config.host, config.port)]
+        return TimedRedisCluster(
+            startup_nodes=[redis.cluster.ClusterNode(host, port) for host, port in nodes],
+            max_connections=config.max_connections,
+            ssl=config.ssl,
+            **kwargs,
+        )
+
+    if config.mode == "sentinel":
+        sentinel = redis.sentinel.Sentinel(
+            _parse_nodes(config.sentinels),
+            sentinel_kwargs={
+                "password": config.sentinel_password,
+                "socket_timeout": config.socket_timeout,
+            },
+            **kwargs,
+        )
+        connection_class = (
+            redis.sentinel.SentinelManagedSSLConnection if config.ssl
+            else redis.sentinel.SentinelManagedConnection
+        )
+        return sentinel.master_for(
+            config.sentinel_master,
+            redis_class=TimedRedis,
+            db=config.db,
+            max_connections=config.max_connections,
+            connection_class=connection_class,
+        )
+
+    connection_class = redis.SSLConnection if config.ssl else redis.Connection
+    pool = redis.BlockingConnectionPool(
+        host=config.host,
+        port=config.port,
+        db=config.db,
+        max_connections=config.max_connections,
+        timeout=config.pool_timeout,
+        connection_class=connection_class,
+        **kwargs,
+    )
+    return TimedRedis(connection_pool=pool)
+
+
+_clients: dict[bool, redis.Redis] = {}
+_clients_lock = threading.Lock()
+
+
+def get_redis_client(decode_responses: bool | None = None):
+    """
+    Общий на процесс клиент (и пул) для данного decode_responses
+    """
+    if decode_responses is None:
+        decode_responses = pydantic_settings.redis.decode_responses
+    client = _clients.get(decode_responses)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(decode_responses)
+            if client is None:
+                client = _clients[decode_responses] = create_redis_client(decode_responses)
+    return client
+
+
+# ---- async ----
+def create_async_redis_client(decode_responses: bool | None = None):
+    config = pydantic_settings.redis
+    if decode_responses is None:
+        decode_responses = config.decode_responses
+    kwargs = _connection_kwargs(decode_responses)
+    kwargs["retry"] = redis.asyncio.retry.Retry(_backoff(), config.retry_attempts)
+
+    if config.mode == "cluster":
+        nodes = _parse_nodes(config.cluster_nodes) or [(config.host, config.port)]
+        return AsyncTimedRedisCluster(
+            startup_nodes=[redis.asyncio.cluster.ClusterNode(host, port) for host, port in nodes],
+            max_connections=config.max_connections,
+            ssl=config.ssl,
+            **kwargs,
+        )
+
+    if config.mode == "sentinel":
+        sentinel = redis.asyncio.sentinel.Sentinel(
+            _parse_nodes(config.sentinels),
+            sentinel_kwargs={
+                "password": config.sentinel_password,
+                "socket_timeout": config.socket_timeout,
+            },
+            **kwargs,
+        )
+        connection_class = (
+            redis.asyncio.sentinel.SentinelManagedSSLConnection if config.ssl
+            else redis.asyncio.sentinel.SentinelManagedConnection
+        )
+        return sentinel.master_for(
+            config.sentinel_master,
+            redis_class=AsyncTimedRedis,
+            db=config.db,
+            max_connections=config.max_connections,
+            connection_class=connection_class,
+        )
+
+    connection_class = redis.asyncio.SSLConnection if config.ssl else redis.asyncio.Connection
+    pool = redis.asyncio.BlockingConnectionPool(
+        host=config.host,
+        port=config.port,
+        db=config.db,
+        max_connections=config.max_connections,
+        timeout=config.pool_timeout,
+        connection_class=connection_class,
+        **kwargs,
+    )
+    return AsyncTimedRedis(connection_pool=pool)
+
+
+_async_redis_clients: LoopLocal[redis.asyncio.Redis] = LoopLocal(create_async_redis_client)
+
+
+def get_async_redis_client() -> redis.asyncio.Redis:
+    """
+    Async клиент для текущего event loop
+    """
+    return _async_redis_clients.get()
+
+
+# ---- django-redis ----
+class DjangoRedisConnectionFactory(ConnectionFactory):
+    """
+    CACHES["default"] ходит через ту же фабрику и настройки.
+    Кешу нужны bytes (pickle), поэтому пул у него свой, decode_responses=False
+    """
+
+    def connect(self, url: str):
+        return get_redis_client(decode_responses=False)
+
+
+class _LazyRedisClient:
+    """
+    Клиент создается при первом обращении: RedisCluster
+    ходит в сеть уже в конструкторе
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_redis_client(), name)
+
 
 # Подключение к Redis
-redis_client = redis.Redis(
-    host=settings.REDIS_HOST,
-    port=settings.REDIS_PORT,
-    db=settings.REDIS_DB,
-    decode_responses=settings.REDIS_DECODE_RESPONSES,
-)
\ No newline at end of file
+redis_client = _LazyRedisClient()
@@ -1,10 +1,15 @@
 import psycopg2
+from psycopg2 import sql
 from urllib.parse import urlparse
 
 from auth_app.config import pydantic_settings as settings
 
 
-def create_db_if_not_exists():
+def create_db_if_not_exists() -> bool:
+    """
+    Создает базу из db.url, если ее нет. True - база создана.
+    Вызывается командой create_database, не при импорте
+    """
     parsed = urlparse(str(settings.db.url))
     target_db = parsed.path.lstrip("/")
     user = parsed.username
@@ -14,19 +19,12 @@ def create_db_if_not_exists():
 
     conn = psycopg2.connect(dbname="postgres", user=user, password=password, host=host, port=port)
     conn.autocommit = True
-    cur = conn.cursor()
-
-    cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (target_db,))
-    exists = cur.fetchone()
-
-    if not exists:
-        print(f"База данных '{target_db}' не найдена. Создаю...")
-        cur.execute(f"CREATE DATABASE {target_db}")
-    else:
-        print(f"База данных '{target_db}' уже существует")
-
-    cur.close()
-    conn.close()
-
-
-create_db_if_not_exists()
\ No newline at end of file
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (target_db,))
+            if cur.fetchone():
+                return False
+            cur.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(target_db)))
+            return True
+    finally:
+        conn.close()
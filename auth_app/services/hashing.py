@@ -0,0 +1,120 @@
+"""
+Отдельный пул для хеширования паролей.
+
+bcrypt и argon2id (services/password_hashers.py) стоят десятки
+миллисекунд CPU. Чтобы всплеск логинов не съедал все потоки воркера,
+хеширование идет через пул
+фиксированного размера с ограниченной очередью. Если очередь полна -
+сразу 503 с Retry-After, а не ожидание.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from rest_framework import exceptions, status
+
+from auth_app.config import pydantic_settings
+
+
+class HashingOverloaded(exceptions.APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Authentication is temporarily overloaded, try again later"
+    default_code = "hashing_overloaded"
+
+    def __init__(self, wait: int, detail=None, code=None):
+        # DRF сам выставит заголовок Retry-After по wait
+        self.wait = wait
+        super().__init__(detail, code)
+
+
+class HashingPool:
+    def __init__(self, workers: int, max_queue: int, retry_after: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="hashing",
+        )
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def submit(self, fn: Callable, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashingOverloaded(self.retry_after)
+
+        enqueued_at = time.perf_counter()
+        with self._lock:
+            self._in_flight += 1
+
+        def run():
+            waited = time.perf_counter() - enqueued_at
+            with self._lock:
+                self._running += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._in_flight -= 1
+                    self._completed += 1
+                self._slots.release()
+
+        try:
+            return self._executor.submit(run)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+            raise
+
+    def run(self, fn: Callable, *args):
+        return self.submit(fn, *args).result()
+
+    async def arun(self, fn: Callable, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> dict:
+        with self._lock:
+            started = self._completed + self._running
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queue_depth": self._in_flight - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "wait_avg_ms": round(self._wait_total / started * 1000, 3) if started else 0.0,
+                "wait_max_ms": round(self._wait_max * 1000, 3),
+            }
+
+
+_pool: HashingPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_hashing_pool() -> HashingPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                config = pydantic_settings.hashing
+                _pool = HashingPool(
+                    workers=config.workers,
+                    max_queue=config.max_queue,
+                    retry_after=config.retry_after,
+                )
+    return _pool
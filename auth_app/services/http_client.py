@@ -0,0 +1,92 @@
+"""
+Общий httpx клиент для запросов к user_service.
+
+Один клиент на процесс (и один async клиент на event loop):
+соединения переиспользуются (keep-alive), поэтому логин
+не платит за новый TCP/TLS handshake.
+"""
+import atexit
+import logging
+import threading
+from importlib.util import find_spec
+
+import httpx
+
+from auth_app.config import pydantic_settings
+from utils.loop_local import LoopLocal
+
+logger = logging.getLogger(__name__)
+
+LOOKUP = "lookup"
+CREATE = "create"
+
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+
+
+def _http2_enabled() -> bool:
+    config = pydantic_settings.user_service
+    if config.http2 and find_spec("h2") is None:
+        logger.warning("HTTP/2 для user_service отключен: не установлен httpx[http2] (экстра http2)")
+        return False
+    return config.http2
+
+
+def get_limits() -> httpx.Limits:
+    config = pydantic_settings.user_service
+    return httpx.Limits(
+        max_connections=config.max_connections,
+        max_keepalive_connections=config.max_keepalive_connections,
+        keepalive_expiry=config.keepalive_expiry,
+    )
+
+
+def get_timeout(operation: str = LOOKUP) -> httpx.Timeout:
+    config = pydantic_settings.user_service
+    read = config.create_timeout if operation == CREATE else config.read_timeout
+    return httpx.Timeout(
+        read,
+        connect=config.connect_timeout,
+        pool=config.pool_timeout,
+    )
+
+
+def get_user_service_client() -> httpx.Client:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(
+                    base_url=pydantic_settings.user_service_url,
+                    limits=get_limits(),
+                    timeout=get_timeout(),
+                    http2=_http2_enabled(),
+                )
+    return _client
+
+
+def _create_async_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=pydantic_settings.user_service_url,
+        limits=get_limits(),
+        timeout=get_timeout(),
+        http2=_http2_enabled(),
+    )
+
+
+_async_clients: LoopLocal[httpx.AsyncClient] = LoopLocal(_create_async_client)
+
+
+def get_async_user_service_client() -> httpx.AsyncClient:
+    return _async_clients.get()
+
+
+def close_user_service_client() -> None:
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+atexit.register(close_user_service_client)
@@ -0,0 +1,206 @@
+"""
+Пакетная проверка токенов в духе RFC 7662.
+
+JWT (access и refresh) проверяются локально по связке ключей,
+отзыв access токенов - по фильтру services/revocation.py,
+x-auth-token и cookie-сессии - одним pipeline в Redis на всю пачку.
+Ответ кешируется по digest токена до его истечения; для токенов,
+которые можно отозвать раньше (Redis, refresh), не дольше revocable_cache_ttl.
+
+token_type_hint, как и в RFC, только подсказка: если по ней токен
+не найден, проверяются остальные типы.
+"""
+import hashlib
+import time
+
+import jwt
+from django.utils import timezone
+
+from auth_app.api.core.helpers import (
+    TOKEN_TYPE_FIELD,
+    ACCESS_TOKEN_TYPE,
+    REFRESH_TOKEN_TYPE,
+)
+from auth_app.config import pydantic_settings
+from auth_app.crud.identity_records import parse_record
+from auth_app.crud.session_crud import SESSION_PREFIX
+from auth_app.crud.tokens_crud import STATIC_TOKEN_PREFIX
+from auth_app.crud.refresh_token_crud import refresh_token_digest
+from auth_app.db_router import replica_alias
+from auth_app.models import RefreshToken
+from auth_app.redis_client import get_async_redis_client, pipeline
+from auth_app.services.revocation import revocation_list
+from auth_app.services.security import decode_jwt
+from utils.ttl_cache import TTLCache
+
+ACCESS_TOKEN = "access_token"
+REFRESH_TOKEN = "refresh_token"
+X_AUTH_TOKEN = "x_auth_token"
+COOKIE_SESSION = "cookie_session"
+TOKEN_TYPE_HINTS = (ACCESS_TOKEN, REFRESH_TOKEN, X_AUTH_TOKEN, COOKIE_SESSION)
+
+
+_JWT_TYPES = {ACCESS_TOKEN_TYPE: ACCESS_TOKEN, REFRESH_TOKEN_TYPE: REFRESH_TOKEN}
+_OPAQUE_PREFIXES = ((X_AUTH_TOKEN, STATIC_TOKEN_PREFIX), (COOKIE_SESSION, SESSION_PREFIX))
+
+
+def _inactive() -> dict:
+    return {"active": False}
+
+
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+def _looks_like_jwt(token: str) -> bool:
+    return token.count(".") == 2
+
+
+class TokenIntrospector:
+    def __init__(self, maxsize: int, negative_ttl: float, revocable_cache_ttl: float):
+        self.cache = TTLCache(maxsize=maxsize, ttl=negative_ttl)
+        self.revocable_cache_ttl = revocable_cache_ttl
+
+    def _cache_result(self, token: str, result: dict, revocable: bool = False) -> None:
+        ttl = None  # неактивные - на negative_ttl
+        if result["active"]:
+            ttl = result["exp"] - time.time()
+            if revocable:
+                ttl = min(ttl, self.revocable_cache_ttl)
+            if ttl <= 0:
+                return
+        self.cache.set(token_digest(token), result, ttl=ttl)
+
+    @staticmethod
+    def _jwt_result(token: str) -> dict:
+        try:
+            payload = decode_jwt(token)
+        except jwt.InvalidTokenError:
+            return _inactive()
+
+        token_type = _JWT_TYPES.get(payload.get(TOKEN_TYPE_FIELD))
+        if token_type is None:
+            return _inactive()
+
+        result = {
+            "active": True,
+            "token_type": token_type,
+            "sub": str(payload.get("sub")),
+            "user_id": payload.get("user_id", payload.get("sub")),
+            "email": payload.get("email"),
+            "exp": payload["exp"],
+            "iat": payload.get("iat"),
+        }
+        if "iss" in payload:
+            result["iss"] = payload["iss"]
+        if "jti" in payload:
+            result["jti"] = payload["jti"]
+        return result
+
+    @staticmethod
+    def _opaque_result(token_type: str, raw: dict | None, ttl_ms: int) -> dict | None:
+        record = parse_record(raw)
+        if record is None or ttl_ms is None or ttl_ms < 0:
+            return None
+        return {
+            "active": True,
+            "token_type": token_type,
+            "sub": str(record["user_id"]),
+            "user_id": record["user_id"],
+            "username": record["username"],
+            "email": record["email"],
+            "exp": int(time.time() + ttl_ms / 1000),
+            "iat": record["iat"],
+        }
+
+    async def aintrospect(self, items: list[tuple[str, str | None]]) -> list[dict]:
+        results: list[dict | None] = [None] * len(items)
+        refresh_checks: list[int] = []
+        opaque: list[int] = []
+
+        for i, (token, _) in enumerate(items):
+            cached = self.cache.get(token_digest(token))
+            if cached is not None:
+                results[i] = cached
+            elif _looks_like_jwt(token):
+                results[i] = self._jwt_result(token)
+                if results[i]["active"] and results[i]["token_type"] == REFRESH_TOKEN:
+                    refresh_checks.append(i)
+                else:
+                    self._cache_result(token, results[i])
+            else:
+                opaque.append(i)
+
+        await self._acheck_revoked_access_tokens(items, results)
+        if refresh_checks:
+            await self._acheck_refresh_tokens(items, results, refresh_checks)
+        if opaque:
+            await self._alookup_opaque(items, results, opaque)
+        return results
+
+    @staticmethod
+    async def _acheck_revoked_access_tokens(items, results) -> None:
+        # Проверяется и для закешированных ответов: промах фильтра ничего не стоит
+        checks = {
+            i: (result["jti"], result["exp"])
+            for i, result in enumerate(results)
+            if result and result["active"] and result["token_type"] == ACCESS_TOKEN and result.get("jti")
+        }
+        if not checks:
+            return
+        revoked = await revocation_list.afilter_revoked(list(checks.values()))
+        for i, (jti, _) in checks.items():
+            if jti in revoked:
+                results[i] = _inactive()
+
+    async def _acheck_refresh_tokens(self, items, results, indexes: list[int]) -> None:
+        # Один запрос по индексу digest на все refresh токены пачки
+        digests = {i: refresh_token_digest(items[i][0]) for i in indexes}
+        stored = set()
+        # Отставание реплики сравнимо с revocable_cache_ttl, ответы и так кешируются
+        queryset = RefreshToken.objects.using(replica_alias()).filter(
+            token_digest__in=list(digests.values()),
+            revoked_at__isnull=True,
+            expires_at__gt=timezone.now(),
+        )
+        async for user_id, digest in queryset.values_list("user_id", "token_digest"):
+            stored.add((str(user_id), digest))
+
+        for i in indexes:
+            token = items[i][0]
+            if (results[i]["sub"], digests[i]) not in stored:
+                results[i] = _inactive()
+            self._cache_result(token, results[i], revocable=True)
+
+    async def _alookup_opaque(self, items, results, indexes: list[int]) -> None:
+        pipe = pipeline(get_async_redis_client(), transaction=False)
+        lookups = []
+        for i in indexes:
+            token, hint = items[i]
+            # Сначала тип из подсказки, затем остальные
+            for token_type, prefix in sorted(_OPAQUE_PREFIXES, key=lambda kv: kv[0] != hint):
+                pipe.hgetall(prefix + token)
+                pipe.pttl(prefix + token)
+                lookups.append((i, token_type))
+        # Ключ старого формата (строка) даст WRONGTYPE только в своем ответе
+        replies = await pipe.execute(raise_on_error=False)
+
+        for n, (i, token_type) in enumerate(lookups):
+            raw = replies[n * 2]
+            if isinstance(raw, Exception):
+                continue
+            result = self._opaque_result(token_type, raw, replies[n * 2 + 1])
+            if result is not None and results[i] is None:
+                results[i] = result
+        for i in indexes:
+            if results[i] is None:
+                results[i] = _inactive()
+            self._cache_result(items[i][0], results[i], revocable=True)
+
+
+config = pydantic_settings.introspection
+token_introspector = TokenIntrospector(
+    maxsize=config.cache_maxsize,
+    negative_ttl=config.negative_cache_ttl,
+    revocable_cache_ttl=config.revocable_cache_ttl,
+)
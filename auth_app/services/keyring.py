@@ -0,0 +1,320 @@
+"""
+Связка ключей для подписи JWT.
+
+Ключи из CERTS_DIR парсятся один раз, а не на каждый encode/decode.
+Пара ключей - файлы <name>-private.pem и <name>-public.pem
+(например jwt-private.pem / jwt-public.pem). kid - RFC 7638 thumbprint
+публичного ключа, он же попадает в заголовок выпущенных токенов.
+
+Для ротации кладем новую пару в CERTS_DIR: ключи перечитываются
+по таймеру (keys_reload_interval) или по сигналу SIGHUP без рестарта.
+Токены проверяются любым ключом, публичная часть которого лежит
+в каталоге, так что старый ключ убираем после жизни refresh токенов.
+
+Алгоритм ключа определяется по его типу: RSA - RS256/PS256 (из настроек),
+EC P-256 - ES256, Ed25519 - EdDSA. Подписываем ключом алгоритма из
+настроек (algorithm), проверяем всеми из accepted_algorithms - так
+переходим с RSA на EdDSA/ES256 без разлогина:
+  1. кладем новую пару (generate_jwt_key), ее видят JWKS и проверка;
+  2. после jwks_max_age переключаем algorithm;
+  3. после жизни refresh токенов убираем старый ключ и алгоритм.
+"""
+import base64
+import hashlib
+import json
+import logging
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from jwt.algorithms import get_default_algorithms
+
+from auth_app.config import pydantic_settings
+
+logger = logging.getLogger(__name__)
+
+PRIVATE_SUFFIX = "-private.pem"
+PUBLIC_SUFFIX = "-public.pem"
+
+RSA_ALGORITHMS = ("RS256", "RS384", "RS512", "PS256", "PS384", "PS512")
+# кривая -> алгоритм, RFC 7518 3.4
+EC_ALGORITHMS = {"secp256r1": "ES256", "secp384r1": "ES384", "secp521r1": "ES512"}
+EDDSA = "EdDSA"
+
+
+@dataclass(frozen=True)
+class JWTKey:
+    kid: str
+    name: str
+    algorithm: str
+    public_key: object
+    private_key: object | None = None
+    mtime: float = 0.0
+
+
+@dataclass(frozen=True)
+class _KeySet:
+    keys: dict[str, JWTKey]
+    signing: JWTKey | None
+    fingerprint: tuple
+    jwks: tuple[bytes, str] | None = None
+
+
+def jwk_thumbprint(public_key, algorithm: str) -> str:
+    jwk = get_default_algorithms()[algorithm].to_jwk(public_key, as_dict=True)
+    # RFC 7638: только обязательные поля, ключи по алфавиту, без пробелов
+    required = {"RSA": ("e", "kty", "n"), "EC": ("crv", "kty", "x", "y"), "OKP": ("crv", "kty", "x")}
+    members = {name: jwk[name] for name in required[jwk["kty"]]}
+    digest = hashlib.sha256(
+        json.dumps(members, separators=(",", ":"), sort_keys=True).encode()
+    ).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def key_algorithm(public_key, rsa_algorithm: str = "RS256") -> str:
+    """
+    JWS алгоритм по типу ключа; TypeError для неподдерживаемых
+    """
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return rsa_algorithm if rsa_algorithm in RSA_ALGORITHMS else "RS256"
+    if isinstance(public_key, ec.EllipticCurvePublicKey):
+        try:
+            return EC_ALGORITHMS[public_key.curve.name]
+        except KeyError:
+            raise TypeError(f"Unsupported curve {public_key.curve.name}") from None
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        return EDDSA
+    raise TypeError(f"Unsupported key type {type(public_key).__name__}")
+
+
+class KeyRing:
+    def __init__(
+            self,
+            certs_dir: Path,
+            algorithm: str,
+            signing_kid: str | None = None,
+            reload_interval: float = 30,
+            accepted_algorithms: list[str] | None = None,
+    ):
+        self.certs_dir = Path(certs_dir)
+        self.algorithm = algorithm
+        # None - любой алгоритм из каталога; алгоритм подписи принимается всегда
+        self.accepted_algorithms = (
+            frozenset(accepted_algorithms) | {algorithm} if accepted_algorithms else None
+        )
+        self.signing_kid = signing_kid
+        self.reload_interval = reload_interval
+
+        self._lock = threading.Lock()
+        self._reload_requested = False
+        self._next_check = 0.0
+        self._next_miss_check = 0.0
+        self._keyset = _KeySet(keys={}, signing=None, fingerprint=())
+
+    # ---- загрузка ----
+    def _fingerprint(self) -> tuple:
+        entries = []
+        for path in sorted(self.certs_dir.glob("*.pem")):
+            stat = path.stat()
+            entries.append((path.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(entries)
+
+    def _load_key(self, public_path: Path) -> JWTKey:
+        name = public_path.name[:-len(PUBLIC_SUFFIX)]
+        public_key = serialization.load_pem_public_key(public_path.read_bytes())
+
+        private_key = None
+        mtime = public_path.stat().st_mtime
+        private_path = self.certs_dir / f"{name}{PRIVATE_SUFFIX}"
+        if private_path.exists():
+            private_key = serialization.load_pem_private_key(
+                private_path.read_bytes(), password=None
+            )
+            mtime = private_path.stat().st_mtime
+
+        algorithm = key_algorithm(public_key, self.algorithm)
+        return JWTKey(
+            kid=jwk_thumbprint(public_key, algorithm),
+            name=name,
+            algorithm=algorithm,
+            public_key=public_key,
+            private_key=private_key,
+            mtime=mtime,
+        )
+
+    def _select_signing(self, keys: dict[str, JWTKey]) -> JWTKey | None:
+        candidates = [key for key in keys.values() if key.private_key is not None]
+        if self.signing_kid:
+            candidates = [
+                key for key in candidates
+                if self.signing_kid in (key.kid, key.name)
+            ]
+        else:
+            candidates = [key for key in candidates if key.algorithm == self.algorithm]
+        if not candidates:
+            return None
+        # По умолчанию подписываем самым свежим ключом
+        return max(candidates, key=lambda key: key.mtime)
+
+    def load(self) -> None:
+        with self._lock:
+            fingerprint = self._fingerprint()
+            keys = {}
+            for public_path in sorted(self.certs_dir.glob(f"*{PUBLIC_SUFFIX}")):
+                try:
+                    key = self._load_key(public_path)
+                except (ValueError, TypeError, OSError) as exc:
+                    logger.error(f"Не удалось загрузить ключ {public_path.name}: {exc}")
+                    continue
+                keys[key.kid] = key
+
+            signing = self._select_signing(keys)
+            if signing is None:
+                logger.error(f"В {self.certs_dir} нет ключа {self.algorithm} для подписи JWT")
+
+            # Подменяем целиком: читатели видят либо старый, либо новый набор
+            self._keyset = _KeySet(keys=keys, signing=signing, fingerprint=fingerprint)
+            self._reload_requested = False
+            self._next_check = time.monotonic() + self.reload_interval
+            logger.info(
+                f"Загружено JWT ключей: {len(keys)}, "
+                f"подпись: {signing.kid if signing else None}"
+            )
+
+    def request_reload(self) -> None:
+        # Вызывается из обработчика сигнала: только ставим флаг
+        self._reload_requested = True
+
+    def maybe_reload(self) -> None:
+        if not self._reload_requested and time.monotonic() < self._next_check:
+            return
+        if self._reload_requested or self._fingerprint() != self._keyset.fingerprint:
+            self.load()
+        else:
+            self._next_check = time.monotonic() + self.reload_interval
+
+    # ---- доступ ----
+    def signing_key(self) -> JWTKey:
+        self.maybe_reload()
+        signing = self._keyset.signing
+        if signing is None:
+            raise RuntimeError("No JWT signing key configured")
+        return signing
+
+    def get(self, kid: str) -> JWTKey | None:
+        self.maybe_reload()
+        key = self._keyset.keys.get(kid)
+        if key is None and time.monotonic() >= self._next_miss_check:
+            # Возможно, ключ только что положили в каталог.
+            # Не чаще раза в секунду, чтобы чужой kid не грузил диск
+            self._next_miss_check = time.monotonic() + 1.0
+            if self._fingerprint() != self._keyset.fingerprint:
+                self.load()
+            key = self._keyset.keys.get(kid)
+        return key
+
+    def accepts(self, key: JWTKey) -> bool:
+        return self.accepted_algorithms is None or key.algorithm in self.accepted_algorithms
+
+    def verification_keys(self) -> list[JWTKey]:
+        self.maybe_reload()
+        return [key for key in self._keyset.keys.values() if self.accepts(key)]
+
+    def jwks(self) -> tuple[bytes, str]:
+        """
+        JWK Set публичных ключей и его ETag. Считается один раз на набор ключей
+        """
+        self.maybe_reload()
+        keyset = self._keyset
+        if keyset.jwks is None:
+            keys = []
+            # Ключи не принимаемых алгоритмов не публикуем: внешние проверки тоже их отвергнут
+            published = [key for key in keyset.keys.values() if self.accepts(key)]
+            for key in sorted(published, key=lambda k: k.kid):
+                jwk = get_default_algorithms()[key.algorithm].to_jwk(key.public_key, as_dict=True)
+                jwk.pop("key_ops", None)  # вместо него use, оба сразу RFC 7517 не советует
+                jwk.update(kid=key.kid, alg=key.algorithm, use="sig")
+                keys.append(jwk)
+            body = json.dumps({"keys": keys}, separators=(",", ":"), sort_keys=True).encode()
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            # Гонка тут безвредна: результат одинаковый
+            object.__setattr__(keyset, "jwks", (body, etag))
+        return keyset.jwks
+
+    # ---- JWT ----
+    def encode(self, payload: dict) -> str:
+        key = self.signing_key()
+        return jwt.encode(
+            payload,
+            key.private_key,
+            algorithm=key.algorithm,
+            headers={"kid": key.kid},
+        )
+
+    def decode(self, token: str | bytes, **options) -> dict:
+        header = jwt.get_unverified_header(token)
+        kid = header.get("kid")
+        if kid is not None:
+            key = self.get(kid)
+            if key is None:
+                raise jwt.InvalidTokenError("Unknown signing key")
+            if not self.accepts(key):
+                raise jwt.InvalidAlgorithmError(f"{key.algorithm} is not accepted")
+            # algorithms - только алгоритм ключа: alg из заголовка не выбирает проверку
+            return jwt.decode(token, key.public_key, algorithms=[key.algorithm], **options)
+
+        # Токены, выпущенные до появления kid
+        error: jwt.InvalidTokenError = jwt.InvalidSignatureError("No verification keys")
+        for key in self.verification_keys():
+            if key.algorithm != header.get("alg"):
+                continue
+            try:
+                return jwt.decode(token, key.public_key, algorithms=[key.algorithm], **options)
+            except jwt.InvalidSignatureError as exc:
+                error = exc
+        raise error
+
+
+_key_ring: KeyRing | None = None
+_key_ring_lock = threading.Lock()
+
+
+def get_key_ring() -> KeyRing:
+    global _key_ring
+    if _key_ring is None:
+        with _key_ring_lock:
+            if _key_ring is None:
+                config = pydantic_settings.auth_jwt
+                key_ring = KeyRing(
+                    certs_dir=config.certs_dir,
+                    algorithm=config.algorithm,
+                    signing_kid=config.signing_kid,
+                    reload_interval=config.keys_reload_interval,
+                    accepted_algorithms=config.accepted_algorithms,
+                )
+                key_ring.load()
+                _key_ring = key_ring
+    return _key_ring
+
+
+def install_reload_signal(signum: int = getattr(signal, "SIGHUP", 0)) -> None:
+    """
+    kill -HUP <pid> перечитывает ключи в этом процессе
+    """
+    if not signum or threading.current_thread() is not threading.main_thread():
+        return
+
+    previous = signal.getsignal(signum)
+
+    def handler(sig, frame):
+        if _key_ring is not None:
+            _key_ring.request_reload()
+        if callable(previous):
+            previous(sig, frame)
+
+    signal.signal(signum, handler)
@@ -0,0 +1,166 @@
+"""
+Write-behind для last_login.
+
+Вход не пишет в БД: время входа уходит в Redis sorted set
+(user_id -> timestamp, ZADD GT оставляет более позднее), а фоновый поток
+раз в flush_interval или по достижении flush_size переносит его в
+AuthUser пачками bulk_update по batch_size пользователей.
+
+Падение воркера ничего не теряет: данные лежат в Redis, пока не
+записаны в БД. Сброс забирает накопленное RENAME в ключ :flushing,
+пишет пачку в БД и только потом удаляет ее из :flushing; оставшийся
+после падения :flushing дописывает следующий сброс (повтор UPDATE с
+теми же значениями безопасен). Сбрасывает один воркер за раз (lock).
+
+Ошибки Redis при входе не ломают вход: теряется только время входа.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+import redis
+from django.db import close_old_connections
+
+from auth_app.config import pydantic_settings
+from auth_app.models import AuthUser
+from auth_app.redis_client import get_redis_client, get_async_redis_client, pipeline, hash_tag
+
+logger = logging.getLogger(__name__)
+
+# Общий hash tag: RENAME на Cluster только в пределах слота
+_TAG = hash_tag("login_bookkeeping")
+PENDING_KEY = f"{_TAG}:last_login"
+FLUSHING_KEY = f"{_TAG}:last_login:flushing"
+LOCK_KEY = f"{_TAG}:flush_lock"
+
+
+class LoginBookkeeping:
+    def __init__(self, flush_interval: float, flush_size: int, batch_size: int, lock_ttl: int):
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.batch_size = batch_size
+        self.lock_ttl = lock_ttl
+
+        self._lock = threading.Lock()
+        self._flusher: threading.Thread | None = None
+        self._wake = threading.Event()
+        self._flushed = 0
+        self._last_flush: float | None = None
+
+    # ---- вход ----
+    def _queue_record(self, pipe, user_id: int, at: float) -> None:
+        pipe.zadd(PENDING_KEY, {user_id: at}, gt=True)
+        pipe.zcard(PENDING_KEY)
+
+    def _after_record(self, pending: int) -> None:
+        self.start()
+        if pending >= self.flush_size:
+            self._wake.set()
+
+    def record_login(self, user_id: int) -> None:
+        pipe = pipeline(get_redis_client(decode_responses=True), transaction=False)
+        self._queue_record(pipe, user_id, time.time())
+        try:
+            _, pending = pipe.execute()
+        except redis.RedisError as exc:
+            logger.warning("last_login for user %s not recorded: %s", user_id, exc)
+            return
+        self._after_record(pending)
+
+    async def arecord_login(self, user_id: int) -> None:
+        pipe = pipeline(get_async_redis_client(), transaction=False)
+        self._queue_record(pipe, user_id, time.time())
+        try:
+            _, pending = await pipe.execute()
+        except redis.RedisError as exc:
+            logger.warning("last_login for user %s not recorded: %s", user_id, exc)
+            return
+        self._after_record(pending)
+
+    # ---- сброс в БД ----
+    def start(self) -> None:
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._run, name="login-bookkeeping", daemon=True,
+                )
+                self._flusher.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            # Поток вне запросов: request_started/finished не закрывают его соединение,
+            # так что битое или старое соединение закрываем сами (и отдаем в пул)
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("last_login flush failed, will retry")
+            finally:
+                close_old_connections()
+
+    @staticmethod
+    def _apply(entries: list[tuple[str, float]]) -> None:
+        # bulk_update: один UPDATE ... CASE на пачку, updated_at не трогается
+        AuthUser.objects.bulk_update(
+            [
+                AuthUser(user_id=int(user_id), last_login=datetime.fromtimestamp(at, tz=timezone.utc))
+                for user_id, at in entries
+            ],
+            ["last_login"],
+        )
+
+    def flush(self) -> int:
+        """
+        Перенести накопленное в БД; число пользователей. 0 - пусто или сбрасывает другой воркер
+        """
+        client = get_redis_client(decode_responses=True)
+        lock = client.lock(LOCK_KEY, timeout=self.lock_ttl)
+        if not lock.acquire(blocking=False):
+            return 0
+        try:
+            if not client.exists(FLUSHING_KEY):
+                try:
+                    client.rename(PENDING_KEY, FLUSHING_KEY)
+                except redis.ResponseError:  # no such key: накопленного нет
+                    return 0
+            flushed = 0
+            while True:
+                entries = client.zrange(FLUSHING_KEY, 0, self.batch_size - 1, withscores=True)
+                if not entries:
+                    break
+                self._apply(entries)
+                # Удаляем только записанное: при падении здесь пачка повторится
+                client.zrem(FLUSHING_KEY, *(user_id for user_id, _ in entries))
+                flushed += len(entries)
+            self._flushed += flushed
+            self._last_flush = time.time()
+            return flushed
+        finally:
+            try:
+                lock.release()
+            except redis.exceptions.LockError:
+                pass  # истек, пока писали; следующий сброс продолжит
+
+    def stats(self) -> dict:
+        client = get_redis_client(decode_responses=True)
+        return {
+            "pending": client.zcard(PENDING_KEY),
+            "flushing": client.zcard(FLUSHING_KEY),
+            "flushed_by_this_worker": self._flushed,
+            "last_flush": self._last_flush,
+            "flusher_running": self._flusher is not None and self._flusher.is_alive(),
+        }
+
+
+config = pydantic_settings.login_bookkeeping
+login_bookkeeping = LoginBookkeeping(
+    flush_interval=config.flush_interval,
+    flush_size=config.flush_size,
+    batch_size=config.batch_size,
+    lock_ttl=config.lock_ttl,
+)
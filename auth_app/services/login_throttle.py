@@ -0,0 +1,227 @@
+"""
+Ограничение попыток входа на стороне Redis.
+
+Скользящее окно (sorted set с временем попытки) по трем ключам:
+username, IP клиента и паре username+IP. Проверка и запись попытки -
+один Lua скрипт, то есть один round trip и никаких гонок между
+параллельными попытками (на Cluster - по скрипту на слот). Успешный вход возвращает свою попытку обратно,
+так что в окне остаются только неудачные. Попытка, которую не удалось
+проверить из-за user_service, тоже возвращается (release): сбой
+зависимости не должен блокировать пользователей.
+
+Окон username+IP у пользователя по одному на IP: скрипт ведет их
+множество под тем же тегом username, и reset удаляет по нему без SCAN.
+"""
+import time
+import uuid
+from dataclasses import dataclass
+
+from django.conf import settings
+from rest_framework import exceptions
+from rest_framework.throttling import BaseThrottle
+
+from auth_app.services.metrics import LOGIN_THROTTLE
+from auth_app.redis_client import (
+    redis_client, get_async_redis_client,
+    hash_tag, is_cluster,
+)
+
+KEY_PREFIX = "login_throttle:"
+
+# KEYS - ключи окон и, если ARGV[3] > 0, последним - множество окон username+IP.
+# ARGV: now_ms, member, номер окна для множества (0 - нет), затем limit и window_ms для каждого окна.
+# Возвращает 0, если попытка записана, иначе сколько мс ждать.
+HIT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local member = ARGV[2]
+local indexed = tonumber(ARGV[3])
+local windows = #KEYS
+if indexed > 0 then
+    windows = windows - 1
+end
+local retry = 0
+for i = 1, windows do
+    local key = KEYS[i]
+    local limit = tonumber(ARGV[2 + i * 2])
+    local window = tonumber(ARGV[3 + i * 2])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= limit then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        local wait = tonumber(oldest[2]) + window - now
+        if wait > retry then
+            retry = wait
+        end
+    end
+end
+if retry > 0 then
+    return retry
+end
+for i = 1, windows do
+    redis.call('ZADD', KEYS[i], now, member)
+    redis.call('PEXPIRE', KEYS[i], tonumber(ARGV[3 + i * 2]))
+end
+if indexed > 0 then
+    local index = KEYS[windows + 1]
+    redis.call('SADD', index, KEYS[indexed])
+    redis.call('PEXPIRE', index, tonumber(ARGV[3 + indexed * 2]))
+end
+return 0
+"""
+
+
+class LoginThrottled(exceptions.Throttled):
+    default_detail = "Too many failed attempts, try again later."
+
+
+@dataclass(frozen=True)
+class LoginAttempt:
+    keys: tuple[str, ...]
+    member: str
+    args: tuple = ()
+    indexed: str | None = None  # окно username+IP
+    index: str | None = None  # множество таких окон пользователя
+
+    def batches(self) -> list[tuple[list[str], list]]:
+        """
+        Вызовы скрипта: один на все ключи, а на Cluster - по одному на слот
+        """
+        now, member, *limits = self.args
+        cluster = is_cluster()
+        batches: dict[str, tuple[list[str], list]] = {}
+        for i, key in enumerate(self.keys):
+            tag = key[key.index("{"):key.index("}") + 1] if cluster else ""
+            keys, args = batches.setdefault(tag, ([], [now, member, 0]))
+            keys.append(key)
+            args.extend(limits[i * 2:i * 2 + 2])
+            if key == self.indexed:
+                args[2] = len(keys)
+        # Множество - последним ключом, в слоте своего окна
+        return [(keys + [self.index] if args[2] else keys, args) for keys, args in batches.values()]
+
+    def windows(self, keys: list[str]) -> list[str]:
+        return [key for key in keys if key != self.index]
+
+
+def get_client_ip(request) -> str:
+    # Учитывает NUM_PROXIES из настроек DRF
+    return BaseThrottle().get_ident(request)
+
+
+# Окна username и username+IP в одном слоте Cluster (тег - username),
+# окно IP - в слоте своего IP
+def username_key(username: str) -> str:
+    return f"{KEY_PREFIX}{hash_tag(username)}:user"
+
+
+def username_ip_key(username: str, ip: str) -> str:
+    return f"{KEY_PREFIX}{hash_tag(username)}:ip:{ip}"
+
+
+def username_ip_index_key(username: str) -> str:
+    return f"{KEY_PREFIX}{hash_tag(username)}:ips"
+
+
+class LoginThrottle:
+    def __init__(self, limits: dict[str, tuple[int, int]]):
+        # scope -> (max attempts, window seconds)
+        self.limits = limits
+        self._script = None
+
+    def _keys(self, username: str, ip: str) -> dict[str, str]:
+        return {
+            "username": username_key(username),
+            "ip": f"{KEY_PREFIX}ip:{hash_tag(ip)}",
+            "username_ip": username_ip_key(username, ip),
+        }
+
+    def _prepare(self, username: str, ip: str) -> LoginAttempt:
+        keys = []
+        args = [int(time.time() * 1000), uuid.uuid4().hex]
+        for scope, key in self._keys(username, ip).items():
+            if scope not in self.limits:
+                continue
+            limit, window = self.limits[scope]
+            keys.append(key)
+            args.extend((limit, window * 1000))
+        indexed = username_ip_key(username, ip) if "username_ip" in self.limits else None
+        return LoginAttempt(
+            keys=tuple(keys), member=args[1], args=tuple(args),
+            indexed=indexed, index=indexed and username_ip_index_key(username),
+        )
+
+    @staticmethod
+    def _check(retry_ms: int) -> None:
+        if int(retry_ms) > 0:
+            LOGIN_THROTTLE.inc("blocked")
+            raise LoginThrottled(wait=-(-int(retry_ms) // 1000))
+
+    # ---- sync ----
+    def hit(self, username: str, ip: str) -> LoginAttempt:
+        attempt = self._prepare(username, ip)
+        if self._script is None:
+            self._script = redis_client.register_script(HIT_SCRIPT)
+        recorded = []
+        for keys, args in attempt.batches():
+            retry_ms = self._script(keys=keys, args=args)
+            if int(retry_ms) > 0:
+                # На Cluster часть окон уже могла записать попытку
+                if recorded:
+                    self._release(LoginAttempt(keys=tuple(recorded), member=attempt.member))
+                self._check(retry_ms)
+            recorded.extend(attempt.windows(keys))
+        LOGIN_THROTTLE.inc("allowed")
+        return attempt
+
+    def success(self, attempt: LoginAttempt) -> None:
+        LOGIN_THROTTLE.inc("succeeded")
+        self._release(attempt)
+
+    def release(self, attempt: LoginAttempt) -> None:
+        """
+        Попытка не состоялась (user_service недоступен) и не считается неудачной
+        """
+        LOGIN_THROTTLE.inc("released")
+        self._release(attempt)
+
+    def _release(self, attempt: LoginAttempt) -> None:
+        pipe = redis_client.pipeline(transaction=False)
+        for key in attempt.keys:
+            pipe.zrem(key, attempt.member)
+        pipe.execute()
+
+    def reset(self, username: str) -> None:
+        # Окна username+IP - из множества, которое ведет HIT_SCRIPT
+        index = username_ip_index_key(username)
+        redis_client.delete(username_key(username), index, *redis_client.smembers(index))
+
+    # ---- async ----
+    async def ahit(self, username: str, ip: str) -> LoginAttempt:
+        attempt = self._prepare(username, ip)
+        script = get_async_redis_client().register_script(HIT_SCRIPT)
+        recorded = []
+        for keys, args in attempt.batches():
+            retry_ms = await script(keys=keys, args=args)
+            if int(retry_ms) > 0:
+                if recorded:
+                    await self._arelease(LoginAttempt(keys=tuple(recorded), member=attempt.member))
+                self._check(retry_ms)
+            recorded.extend(attempt.windows(keys))
+        LOGIN_THROTTLE.inc("allowed")
+        return attempt
+
+    async def asuccess(self, attempt: LoginAttempt) -> None:
+        LOGIN_THROTTLE.inc("succeeded")
+        await self._arelease(attempt)
+
+    async def arelease(self, attempt: LoginAttempt) -> None:
+        LOGIN_THROTTLE.inc("released")
+        await self._arelease(attempt)
+
+    async def _arelease(self, attempt: LoginAttempt) -> None:
+        pipe = get_async_redis_client().pipeline(transaction=False)
+        for key in attempt.keys:
+            pipe.zrem(key, attempt.member)
+        await pipe.execute()
+
+
+login_throttle = LoginThrottle(settings.AUTH_THROTTLE_LIMITS)
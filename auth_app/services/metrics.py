@@ -0,0 +1,107 @@
+"""
+Метрики сервиса, отдаются на /metrics (см. api/v1/metrics.py).
+
+Запись без блокировок (utils/metrics.py), так что метрики включены всегда.
+"""
+from contextvars import ContextVar
+from time import perf_counter
+
+from utils.metrics import Registry, Counter, Histogram
+
+registry = Registry()
+
+# ---- HTTP ----
+REQUEST_SECONDS = Histogram(
+    registry, "auth_http_request_duration_seconds",
+    "Request latency by route template",
+    ("method", "route"),
+)
+REQUESTS = Counter(
+    registry, "auth_http_requests",
+    "Responses by route template and status code",
+    ("method", "route", "status"),
+)
+
+# ---- зависимости ----
+USER_SERVICE = "user_service"
+REDIS = "redis"
+DATABASE = "database"
+
+DEPENDENCY_SECONDS = Histogram(
+    registry, "auth_dependency_duration_seconds",
+    "Dependency call latency by operation",
+    ("dependency", "operation"),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+DEPENDENCY_ERRORS = Counter(
+    registry, "auth_dependency_errors",
+    "Dependency calls that raised",
+    ("dependency", "operation"),
+)
+
+# ---- крипто ----
+CRYPTO_SECONDS = Histogram(
+    registry, "auth_crypto_duration_seconds",
+    "Password hashing and JWT operation latency",
+    ("operation",),
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+# ---- попытки входа ----
+LOGIN_THROTTLE = Counter(
+    registry, "auth_login_throttle",
+    "Login attempts passed or blocked by the failed-attempts throttle",
+    ("result",),
+)
+
+
+# Вызовы зависимостей текущего запроса: {dependency: [count, seconds]}.
+# None - не собираем; включает профилировщик (services/profiling.py)
+dependency_calls: ContextVar[dict | None] = ContextVar("dependency_calls", default=None)
+
+
+class time_dependency:
+    """
+    with time_dependency(REDIS, "GET"): ...
+    Время пишется всегда, исключение дополнительно считается в DEPENDENCY_ERRORS
+    """
+    __slots__ = ("labels", "started")
+
+    def __init__(self, dependency: str, operation: str):
+        self.labels = (dependency, operation)
+
+    def __enter__(self):
+        self.started = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = perf_counter() - self.started
+        DEPENDENCY_SECONDS.observe(elapsed, *self.labels)
+        if exc_type is not None:
+            DEPENDENCY_ERRORS.inc(*self.labels)
+        calls = dependency_calls.get()
+        if calls is not None:
+            entry = calls.setdefault(self.labels[0], [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+        return False
+
+
+# ---- ORM ----
+def _time_query(execute, sql, params, many, context):
+    operation = sql.split(None, 1)[0].upper() if isinstance(sql, str) and sql else "?"
+    with time_dependency(DATABASE, operation):
+        return execute(sql, params, many, context)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+def install_db_instrumentation() -> None:
+    """
+    Время каждого SQL запроса по операции (SELECT, INSERT, ...)
+    """
+    from django.db.backends.signals import connection_created
+    connection_created.connect(_on_connection_created, dispatch_uid="auth_app.metrics")
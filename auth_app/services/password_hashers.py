@@ -0,0 +1,167 @@
+"""
+Алгоритмы хеширования паролей.
+
+Новые хеши - алгоритмом и параметрами из HashingConfig, а проверка
+определяет алгоритм по префиксу сохраненного хеша ($2b$..., $argon2id$...).
+Поэтому смена алгоритма или стоимости не ломает старые пароли: они
+проверяются как раньше и перехешируются при следующем входе
+(needs_rehash + user_crud.arehash_password_if_needed).
+
+argon2id требует argon2-cffi (экстра argon2), он импортируется только при использовании.
+Подбор параметров под железо: manage.py calibrate_password_hash
+"""
+import re
+import threading
+
+import bcrypt
+from django.core.exceptions import ImproperlyConfigured
+
+from auth_app.config import pydantic_settings
+
+BCRYPT = "bcrypt"
+ARGON2ID = "argon2id"
+
+_BCRYPT_ROUNDS = re.compile(rb"^\$2[abxy]?\$(\d{2})\$")
+# Хеш целиком: версия, стоимость, 22 символа соли + 31 символ хеша
+_BCRYPT_HASH = re.compile(rb"\$2[aby]\$(\d\d)\$[./A-Za-z0-9]{53}")
+
+
+class BcryptHasher:
+    algorithm = BCRYPT
+
+    def __init__(self, rounds: int):
+        self.rounds = rounds
+
+    @staticmethod
+    def identifies(hashed: bytes) -> bool:
+        return hashed.startswith(b"$2")
+
+    @staticmethod
+    def is_valid(hashed: bytes) -> bool:
+        match = _BCRYPT_HASH.fullmatch(hashed)
+        return match is not None and 4 <= int(match.group(1)) <= 31
+
+    def hash(self, password: str) -> bytes:
+        return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=self.rounds))
+
+    def verify(self, password: str, hashed: bytes) -> bool:
+        try:
+            return bcrypt.checkpw(password.encode("utf-8"), hashed)
+        except ValueError:  # испорченный хеш: вход не проходит, а не 500
+            return False
+
+    def needs_rehash(self, hashed: bytes) -> bool:
+        match = _BCRYPT_ROUNDS.match(hashed)
+        return match is None or int(match.group(1)) != self.rounds
+
+
+class Argon2idHasher:
+    algorithm = ARGON2ID
+
+    def __init__(self, time_cost: int, memory_cost: int, parallelism: int):
+        try:
+            from argon2 import PasswordHasher, Type
+        except ImportError as exc:
+            raise ImproperlyConfigured("argon2id password hashing requires argon2-cffi (install the argon2 extra)") from exc
+        self.time_cost = time_cost
+        self.memory_cost = memory_cost
+        self.parallelism = parallelism
+        self._hasher = PasswordHasher(
+            time_cost=time_cost,
+            memory_cost=memory_cost,
+            parallelism=parallelism,
+            type=Type.ID,
+        )
+
+    @staticmethod
+    def identifies(hashed: bytes) -> bool:
+        return hashed.startswith(b"$argon2id$")
+
+    @staticmethod
+    def is_valid(hashed: bytes) -> bool:
+        from argon2 import extract_parameters
+        from argon2.exceptions import InvalidHashError
+
+        try:
+            extract_parameters(hashed.decode("ascii"))
+        except (InvalidHashError, UnicodeDecodeError):
+            return False
+        return True
+
+    def hash(self, password: str) -> bytes:
+        return self._hasher.hash(password).encode("ascii")
+
+    def verify(self, password: str, hashed: bytes) -> bool:
+        from argon2.exceptions import VerificationError, InvalidHashError
+
+        try:
+            return self._hasher.verify(hashed.decode("ascii"), password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    def needs_rehash(self, hashed: bytes) -> bool:
+        return self._hasher.check_needs_rehash(hashed.decode("ascii"))
+
+
+class PasswordHashers:
+    """
+    Хешер для новых паролей + все, которыми можно проверить старые
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._hashers: dict[str, BcryptHasher | Argon2idHasher] = {}
+        self.default = self.get(config.algorithm)
+
+    def get(self, algorithm: str):
+        hasher = self._hashers.get(algorithm)
+        if hasher is None:
+            if algorithm == BCRYPT:
+                hasher = BcryptHasher(self.config.bcrypt_rounds)
+            elif algorithm == ARGON2ID:
+                hasher = Argon2idHasher(
+                    self.config.argon2_time_cost,
+                    self.config.argon2_memory_cost,
+                    self.config.argon2_parallelism,
+                )
+            else:
+                raise ImproperlyConfigured(f"Unknown password hash algorithm: {algorithm}")
+            self._hashers[algorithm] = hasher
+        return hasher
+
+    def identify(self, hashed: bytes):
+        for hasher_class in (BcryptHasher, Argon2idHasher):
+            if hasher_class.identifies(hashed):
+                return self.get(hasher_class.algorithm)
+        return None
+
+    def is_valid(self, hashed: bytes) -> bool:
+        """
+        Готовый хеш (импорт): формат проверяется целиком, а не только префикс
+        """
+        hasher = self.identify(hashed)
+        return hasher is not None and hasher.is_valid(hashed)
+
+    def hash(self, password: str) -> bytes:
+        return self.default.hash(password)
+
+    def verify(self, password: str, hashed: bytes) -> bool:
+        hasher = self.identify(hashed)
+        return hasher is not None and hasher.verify(password, hashed)
+
+    def needs_rehash(self, hashed: bytes) -> bool:
+        hasher = self.identify(hashed)
+        return hasher is not self.default or hasher.needs_rehash(hashed)
+
+
+_hashers: PasswordHashers | None = None
+_hashers_lock = threading.Lock()
+
+
+def get_password_hashers() -> PasswordHashers:
+    global _hashers
+    if _hashers is None:
+        with _hashers_lock:
+            if _hashers is None:
+                _hashers = PasswordHashers(pydantic_settings.hashing)
+    return _hashers
@@ -0,0 +1,164 @@
+"""
+Read-through кеш профилей user_service.
+
+Два уровня: LRU в памяти процесса с коротким TTL и общий Redis.
+Профиль хранится и по user_id, и по username, поэтому повторный
+логин не ходит в user_service вовсе.
+"""
+import json
+from typing import Awaitable, Callable
+
+from auth_app.config import pydantic_settings
+from auth_app.redis_client import redis_client, get_async_redis_client
+from utils.ttl_cache import TTLCache
+
+ID_PREFIX = "user_profile:id:"
+USERNAME_PREFIX = "user_profile:username:"
+
+
+def _id_key(user_id: int) -> str:
+    return f"{ID_PREFIX}{user_id}"
+
+
+def _username_key(username: str) -> str:
+    return f"{USERNAME_PREFIX}{username}"
+
+
+class ProfileCache:
+    def __init__(self, local_maxsize: int, local_ttl: float, redis_ttl: int):
+        self.local = TTLCache(maxsize=local_maxsize, ttl=local_ttl)
+        self.redis_ttl = redis_ttl
+        # Счетчики без блокировок: точность метрик тут не критична
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    # ---- sync ----
+    def _get(self, key: str, loader: Callable[[], dict]) -> dict:
+        profile = self.local.get(key)
+        if profile is not None:
+            self.local_hits += 1
+            return profile
+
+        raw = redis_client.get(key)
+        if raw is not None:
+            self.redis_hits += 1
+            profile = json.loads(raw)
+            self._set_local(profile, key)
+            return profile
+
+        self.misses += 1
+        profile = loader()
+        self.set(profile, key)
+        return profile
+
+    def get_by_id(self, user_id: int, loader: Callable[[], dict]) -> dict:
+        return self._get(_id_key(user_id), loader)
+
+    def get_by_username(self, username: str, loader: Callable[[], dict]) -> dict:
+        return self._get(_username_key(username), loader)
+
+    def set(self, profile: dict, *extra_keys: str) -> None:
+        keys = self._set_local(profile, *extra_keys)
+        raw = json.dumps(profile)
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.set(key, raw, ex=self.redis_ttl)
+        pipe.execute()
+
+    def invalidate(self, user_id: int | None = None, username: str | None = None) -> None:
+        keys = self._invalidate_local(user_id, username)
+        if keys:
+            redis_client.delete(*keys)
+
+    # ---- async ----
+    async def _aget(self, key: str, loader: Callable[[], Awaitable[dict]]) -> dict:
+        profile = self.local.get(key)
+        if profile is not None:
+            self.local_hits += 1
+            return profile
+
+        raw = await get_async_redis_client().get(key)
+        if raw is not None:
+            self.redis_hits += 1
+            profile = json.loads(raw)
+            self._set_local(profile, key)
+            return profile
+
+        self.misses += 1
+        profile = await loader()
+        await self.aset(profile, key)
+        return profile
+
+    async def aget_by_id(self, user_id: int, loader: Callable[[], Awaitable[dict]]) -> dict:
+        return await self._aget(_id_key(user_id), loader)
+
+    async def aget_by_username(self, username: str, loader: Callable[[], Awaitable[dict]]) -> dict:
+        return await self._aget(_username_key(username), loader)
+
+    async def aset(self, profile: dict, *extra_keys: str) -> None:
+        keys = self._set_local(profile, *extra_keys)
+        raw = json.dumps(profile)
+        pipe = get_async_redis_client().pipeline(transaction=False)
+        for key in keys:
+            pipe.set(key, raw, ex=self.redis_ttl)
+        await pipe.execute()
+
+    async def ainvalidate(self, user_id: int | None = None, username: str | None = None) -> None:
+        keys = self._invalidate_local(user_id, username)
+        if keys:
+            await get_async_redis_client().delete(*keys)
+
+    # ---- helpers ----
+    def _profile_keys(self, profile: dict) -> list[str]:
+        keys = []
+        if profile.get("user_id"):
+            keys.append(_id_key(profile["user_id"]))
+        if profile.get("username"):
+            keys.append(_username_key(profile["username"]))
+        return keys
+
+    def _set_local(self, profile: dict, *extra_keys: str) -> list[str]:
+        keys = self._profile_keys(profile)
+        keys.extend(key for key in extra_keys if key not in keys)
+        for key in keys:
+            self.local.set(key, profile)
+        return keys
+
+    def _invalidate_local(self, user_id: int | None, username: str | None) -> list[str]:
+        keys = []
+        if user_id is not None:
+            keys.append(_id_key(user_id))
+        if username is not None:
+            keys.append(_username_key(username))
+
+        # Достаем вторую половину пары (id <-> username) из локального уровня
+        for key in list(keys):
+            profile = self.local.pop(key)
+            if profile:
+                keys.extend(k for k in self._profile_keys(profile) if k not in keys)
+        for key in keys:
+            self.local.pop(key)
+
+        self.invalidations += 1
+        return keys
+
+    def stats(self) -> dict:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": round((lookups - self.misses) / lookups, 4) if lookups else 0.0,
+            "local_size": len(self.local),
+        }
+
+
+config = pydantic_settings.profile_cache
+profile_cache = ProfileCache(
+    local_maxsize=config.local_maxsize,
+    local_ttl=config.local_ttl,
+    redis_ttl=config.redis_ttl,
+)
@@ -0,0 +1,146 @@
+"""
+Профилирование живых запросов без передеплоя.
+
+Запрос профилируется, если попал в выборку (profiling.sample_rate) или
+пришел с заголовком X-Debug-Profile, подписанным profiling.header_secret
+(см. manage.py profile_header). Сохраняется cProfile (.prof для snakeviz
+и pstats) и сводка .json: топ функций, число и время вызовов БД, Redis
+и user_service. Хранятся последние ring_size профилей.
+
+Одновременно профилируется один запрос на процесс. Под ASGI cProfile
+видит все корутины event loop за время запроса, не только этот запрос.
+"""
+import cProfile
+import json
+import pstats
+import random
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.core import signing
+
+from auth_app.config import pydantic_settings
+
+HEADER = "X-Debug-Profile"
+SIGNING_SALT = "auth_app.profiling"
+SIGNED_VALUE = "profile"
+
+SAMPLE = "sample"
+SIGNED_HEADER = "header"
+
+
+def _signer(secret: str) -> signing.TimestampSigner:
+    return signing.TimestampSigner(key=secret, salt=SIGNING_SALT)
+
+
+def sign_header(secret: str) -> str:
+    return _signer(secret).sign(SIGNED_VALUE)
+
+
+class ProfileStore:
+    """
+    Кольцевой буфер на диске: <id>.json + <id>.prof, id начинается с времени в мс
+    """
+
+    def __init__(self, directory: Path, ring_size: int):
+        self.directory = Path(directory)
+        self.ring_size = ring_size
+        self._lock = threading.Lock()
+
+    def _summaries(self) -> list[Path]:
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob("*.json"))
+
+    def save(self, record: dict, profile: cProfile.Profile, top: int) -> str:
+        profile_id = f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+        stats = pstats.Stats(profile)
+        stats.sort_stats("cumulative")
+        record["id"] = profile_id
+        record["functions"] = [
+            {
+                "function": f"{filename}:{line}({name})",
+                "ncalls": ncalls,
+                "tottime": round(tottime, 6),
+                "cumtime": round(cumtime, 6),
+            }
+            for (filename, line, name) in stats.fcn_list[:top]
+            for _, ncalls, tottime, cumtime, _ in [stats.stats[(filename, line, name)]]
+        ]
+
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            stats.dump_stats(self.directory / f"{profile_id}.prof")
+            (self.directory / f"{profile_id}.json").write_text(json.dumps(record))
+            for old in self._summaries()[:-self.ring_size]:
+                old.unlink(missing_ok=True)
+                old.with_suffix(".prof").unlink(missing_ok=True)
+        return profile_id
+
+    def list(self, limit: int = 50) -> list[dict]:
+        result = []
+        for path in reversed(self._summaries()[-limit:]):
+            try:
+                record = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue  # удален кольцом между glob и чтением
+            record.pop("functions", None)
+            result.append(record)
+        return result
+
+    def _path(self, profile_id: str, suffix: str) -> Path | None:
+        # id из URL: только имя файла внутри каталога
+        path = self.directory / f"{Path(profile_id).name}{suffix}"
+        return path if path.exists() else None
+
+    def get(self, profile_id: str) -> dict | None:
+        path = self._path(profile_id, ".json")
+        return json.loads(path.read_text()) if path else None
+
+    def raw_path(self, profile_id: str) -> Path | None:
+        return self._path(profile_id, ".prof")
+
+
+class RequestProfiler:
+    def __init__(self, sample_rate: float, header_secret: str | None, header_max_age: int):
+        self.sample_rate = sample_rate
+        self.header_secret = header_secret
+        self.header_max_age = header_max_age
+        self._active = threading.Lock()
+
+    def reason(self, request) -> str | None:
+        value = request.headers.get(HEADER)
+        if value and self.header_secret:
+            try:
+                if _signer(self.header_secret).unsign(value, max_age=self.header_max_age) == SIGNED_VALUE:
+                    return SIGNED_HEADER
+            except signing.BadSignature:
+                pass
+        if self.sample_rate and random.random() < self.sample_rate:
+            return SAMPLE
+        return None
+
+    def start(self) -> cProfile.Profile | None:
+        """
+        Профиль или None, если уже профилируется другой запрос
+        """
+        if not self._active.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # активен другой профилировщик (отладчик, coverage)
+            self._active.release()
+            return None
+        return profile
+
+    def stop(self, profile: cProfile.Profile) -> None:
+        profile.disable()
+        self._active.release()
+
+
+config = pydantic_settings.profiling
+profile_store = ProfileStore(config.directory, config.ring_size)
+request_profiler = RequestProfiler(config.sample_rate, config.header_secret, config.header_max_age)
@@ -0,0 +1,210 @@
+"""
+Отзыв access токенов по jti.
+
+Источник истины - Redis: ключ revoked_jti:<jti> живет до exp токена,
+а sorted set revoked_jtis (jti -> exp) нужен, чтобы воркер при старте
+загрузил все действующие отзывы. Каждый воркер держит в памяти Bloom
+фильтры (по одному на интервал exp, истекший интервал выбрасывается
+целиком) и слушает канал pub/sub с новыми отзывами.
+
+Проверка токена: промах фильтра - точно не отозван, без сети;
+в Redis идут только попадания фильтра. Пока воркер не синхронизирован
+(старт, обрыв подписки), проверяется каждый токен.
+"""
+import logging
+import threading
+import time
+
+import redis
+
+from auth_app.config import pydantic_settings
+from auth_app.redis_client import get_redis_client, get_async_redis_client, pipeline
+from utils.bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "revoked_jti:"
+INDEX_KEY = "revoked_jtis"
+
+
+def _message(jti: str, exp: int) -> str:
+    return f"{jti}:{int(exp)}"
+
+
+class RevocationList:
+    def __init__(
+            self,
+            channel: str,
+            slice_seconds: int,
+            slice_capacity: int,
+            error_rate: float,
+            resync_backoff: float,
+    ):
+        self.channel = channel
+        self.slice_seconds = slice_seconds
+        self.slice_capacity = slice_capacity
+        self.error_rate = error_rate
+        self.resync_backoff = resync_backoff
+
+        self._slices: dict[int, BloomFilter] = {}
+        self._lock = threading.Lock()
+        self._listener: threading.Thread | None = None
+        self._synced = False
+        self._confirmations = 0
+        self._false_positives = 0
+
+    # ---- фильтр ----
+    def _remember(self, jti: str, exp: int) -> None:
+        index = int(exp) // self.slice_seconds
+        bloom = self._slices.get(index)
+        if bloom is None:
+            with self._lock:
+                bloom = self._slices.get(index)
+                if bloom is None:
+                    bloom = self._slices[index] = BloomFilter(self.slice_capacity, self.error_rate)
+        bloom.add(jti)
+
+    def _prune(self) -> None:
+        current = int(time.time()) // self.slice_seconds
+        with self._lock:
+            for index in [index for index in self._slices if index < current]:
+                del self._slices[index]
+
+    def _load(self, client) -> int:
+        now = time.time()
+        client.zremrangebyscore(INDEX_KEY, "-inf", now)
+        entries = client.zrangebyscore(INDEX_KEY, now, "+inf", withscores=True)
+        for jti, exp in entries:
+            self._remember(jti, int(exp))
+        self._prune()
+        return len(entries)
+
+    def _on_message(self, data: str) -> None:
+        jti, _, exp = data.rpartition(":")
+        if jti and exp.isdigit():
+            self._remember(jti, int(exp))
+
+    # ---- подписка ----
+    def start(self) -> None:
+        if self._listener is not None:
+            return
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self._listen, name="token-revocations", daemon=True,
+                )
+                self._listener.start()
+
+    def _listen(self) -> None:
+        while True:
+            client = get_redis_client(decode_responses=True)
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                # Сначала подписка, потом загрузка: отзыв между ними не потеряется
+                pubsub.subscribe(self.channel)
+                loaded = self._load(client)
+                self._synced = True
+                logger.info("Revocation filter synced: %s entries", loaded)
+                pruned_at = time.monotonic()
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None and message["type"] == "message":
+                        self._on_message(message["data"])
+                    if time.monotonic() - pruned_at > self.slice_seconds / 10:
+                        self._prune()
+                        pruned_at = time.monotonic()
+            except redis.RedisError as exc:
+                logger.warning("Revocation subscription lost: %s", exc)
+            finally:
+                self._synced = False
+                try:
+                    pubsub.close()
+                except redis.RedisError:
+                    pass
+            time.sleep(self.resync_backoff)
+
+    def might_be_revoked(self, jti: str, exp: int) -> bool:
+        """
+        False - точно не отозван. True - нужна проверка в Redis
+        """
+        self.start()
+        if not self._synced:
+            return True
+        bloom = self._slices.get(int(exp) // self.slice_seconds)
+        return bloom is not None and jti in bloom
+
+    def _confirmed(self, candidates: list[str], replies: list) -> set[str]:
+        revoked = {jti for jti, exists in zip(candidates, replies) if exists}
+        self._confirmations += len(candidates)
+        self._false_positives += len(candidates) - len(revoked)
+        return revoked
+
+    # ---- sync ----
+    def revoke(self, jti: str, exp: int) -> bool:
+        ttl = int(exp - time.time()) + 1
+        if ttl <= 0:
+            return False  # уже истек
+        client = get_redis_client()
+        # Ключи в разных слотах Cluster - без MULTI
+        pipe = pipeline(client, transaction=False)
+        pipe.set(KEY_PREFIX + jti, 1, ex=ttl)
+        pipe.zadd(INDEX_KEY, {jti: int(exp)})
+        pipe.zremrangebyscore(INDEX_KEY, "-inf", time.time())
+        pipe.publish(self.channel, _message(jti, exp))
+        pipe.execute()
+        self._remember(jti, exp)
+        return True
+
+    def is_revoked(self, jti: str, exp: int) -> bool:
+        if not self.might_be_revoked(jti, exp):
+            return False
+        exists = get_redis_client().exists(KEY_PREFIX + jti)
+        return jti in self._confirmed([jti], [exists])
+
+    # ---- async ----
+    async def arevoke(self, jti: str, exp: int) -> bool:
+        ttl = int(exp - time.time()) + 1
+        if ttl <= 0:
+            return False
+        pipe = pipeline(get_async_redis_client(), transaction=False)
+        pipe.set(KEY_PREFIX + jti, 1, ex=ttl)
+        pipe.zadd(INDEX_KEY, {jti: int(exp)})
+        pipe.zremrangebyscore(INDEX_KEY, "-inf", time.time())
+        pipe.publish(self.channel, _message(jti, exp))
+        await pipe.execute()
+        self._remember(jti, exp)
+        return True
+
+    async def ais_revoked(self, jti: str, exp: int) -> bool:
+        return bool(await self.afilter_revoked([(jti, exp)]))
+
+    async def afilter_revoked(self, tokens: list[tuple[str, int]]) -> set[str]:
+        """
+        Какие из (jti, exp) отозваны: один pipeline на все попадания фильтра
+        """
+        candidates = [jti for jti, exp in tokens if self.might_be_revoked(jti, exp)]
+        if not candidates:
+            return set()
+        pipe = pipeline(get_async_redis_client(), transaction=False)
+        for jti in candidates:
+            pipe.exists(KEY_PREFIX + jti)
+        return self._confirmed(candidates, await pipe.execute())
+
+    def stats(self) -> dict:
+        return {
+            "synced": self._synced,
+            "slices": len(self._slices),
+            "entries": sum(len(bloom) for bloom in list(self._slices.values())),
+            "confirmations": self._confirmations,
+            "false_positives": self._false_positives,
+        }
+
+
+config = pydantic_settings.revocation
+revocation_list = RevocationList(
+    channel=config.channel,
+    slice_seconds=config.slice_seconds,
+    slice_capacity=config.slice_capacity,
+    error_rate=config.error_rate,
+    resync_backoff=config.resync_backoff,
+)
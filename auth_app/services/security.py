@@ -1,14 +1,17 @@
 import jwt
-import bcrypt
 import secrets
 from datetime import datetime, timezone, timedelta
 
 from auth_app.config import pydantic_settings
+from auth_app.services.hashing import get_hashing_pool
+from auth_app.services.keyring import get_key_ring
+from auth_app.services.password_hashers import get_password_hashers
+from auth_app.services.metrics import CRYPTO_SECONDS
 
 
 def encode_jwt(
     payload: dict,
-    private_key: str = pydantic_settings.auth_jwt.private_key_path.read_text(),
+    private_key: str | None = None,
     algorithm: str = pydantic_settings.auth_jwt.algorithm,
     expires_in: int = pydantic_settings.auth_jwt.access_token_expires_in,  # minutes
     expire_timedelta: timedelta | None = None,
@@ -20,35 +23,76 @@ def encode_jwt(
     else:
         expire = now + timedelta(minutes=expires_in)
     to_encode.update(exp=expire, iat=now)
-    encoded = jwt.encode(to_encode, private_key, algorithm=algorithm)
+    with CRYPTO_SECONDS.time("jwt_sign"):
+        if private_key is None:
+            # Уже распарсенный ключ из связки + kid в заголовке
+            return get_key_ring().encode(to_encode)
+        encoded = jwt.encode(to_encode, private_key, algorithm=algorithm)
     return encoded
 
 
 def decode_jwt(
     token: str | bytes,
-    public_key: str = pydantic_settings.auth_jwt.public_key_path.read_text(),
+    public_key: str | None = None,
     algorithm: str = pydantic_settings.auth_jwt.algorithm,
 ):
-    decoded = jwt.decode(token, public_key, algorithms=[algorithm])
+    with CRYPTO_SECONDS.time("jwt_verify"):
+        if public_key is None:
+            return get_key_ring().decode(token)
+        decoded = jwt.decode(token, public_key, algorithms=[algorithm])
     return decoded
 
 
+def _hashpw(password: str) -> bytes:
+    hasher = get_password_hashers().default
+    with CRYPTO_SECONDS.time(f"{hasher.algorithm}_hash"):
+        return hasher.hash(password)
+
+
+def _checkpw(password: str, hashed_password: bytes | memoryview) -> bool:
+    if isinstance(hashed_password, memoryview):
+        hashed_password = hashed_password.tobytes()
+    hasher = get_password_hashers().identify(hashed_password)
+    if hasher is None:
+        return False
+    with CRYPTO_SECONDS.time(f"{hasher.algorithm}_verify"):
+        return hasher.verify(password, hashed_password)
+
+
+def password_needs_rehash(hashed_password: bytes | memoryview) -> bool:
+    """
+    Хеш другим алгоритмом или с устаревшими параметрами (см. HashingConfig)
+    """
+    if isinstance(hashed_password, memoryview):
+        hashed_password = hashed_password.tobytes()
+    return get_password_hashers().needs_rehash(hashed_password)
+
+
+# Хеширование выполняется в отдельном пуле, см. services/hashing.py
 def hash_password(password: str) -> bytes:
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password.encode("utf-8"), salt)
+    return get_hashing_pool().run(_hashpw, password)
+
+
+async def ahash_password(password: str) -> bytes:
+    return await get_hashing_pool().arun(_hashpw, password)
 
 
 def validate_password(password: str, hashed_password: bytes) -> bool:
-    return bcrypt.checkpw(password.encode("utf-8"), hashed_password)
+    return get_hashing_pool().run(_checkpw, password, hashed_password)
 
 
 def verify_password(
         plain_password: str,
         hashed_password: bytes | memoryview
 ) -> bool:
-    if isinstance(hashed_password, memoryview):
-        hashed_password = hashed_password.tobytes()
-    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password)
+    return get_hashing_pool().run(_checkpw, plain_password, hashed_password)
+
+
+async def averify_password(
+        plain_password: str,
+        hashed_password: bytes | memoryview
+) -> bool:
+    return await get_hashing_pool().arun(_checkpw, plain_password, hashed_password)
 
 
 def generate_static_auth_token() -> str:
@@ -0,0 +1,219 @@
+"""
+Постраничный просмотр сессий и x-auth-token в Redis без KEYS.
+
+Каждая страница - один SCAN с COUNT и один pipeline HGETALL+PTTL на
+найденные ключи, Redis не блокируется на обходе всего keyspace.
+Статистика (TTL, сессии на пользователя) накапливается страница за
+страницей и едет вместе с позицией SCAN в подписанном cursor: клиент
+передает его обратно, сервер ничего не хранит.
+
+С user_id keyspace не обходится вовсе: токены берутся из индекса
+пользователя (user_sessions:<id> / user_static_tokens:<id>).
+В cluster SCAN идет по primary узлам по очереди.
+"""
+import time
+
+from django.core import signing
+
+from auth_app.redis_client import redis_client, pipeline
+from auth_app.crud.identity_records import parse_record
+from auth_app.crud.session_crud import SESSION_PREFIX, USER_SESSIONS_PREFIX
+from auth_app.crud.tokens_crud import STATIC_TOKEN_PREFIX, USER_STATIC_TOKENS_PREFIX
+
+CURSOR_SALT = "auth_app.session_inspector"
+
+SESSION = "session"
+STATIC_TOKEN = "static_token"
+# вид -> (префикс записи, префикс индекса пользователя)
+KINDS = {
+    SESSION: (SESSION_PREFIX, USER_SESSIONS_PREFIX),
+    STATIC_TOKEN: (STATIC_TOKEN_PREFIX, USER_STATIC_TOKENS_PREFIX),
+}
+
+TTL_BUCKETS = ((60, "<1m"), (300, "<5m"), (900, "<15m"), (3600, "<1h"), (86400, "<1d"))
+PER_USER_BUCKETS = ((1, "1"), (2, "2"), (5, "3-5"), (10, "6-10"))
+TOP_USERS = 10
+
+
+def _ttl_bucket(ttl_ms: int) -> str:
+    if ttl_ms < 0:
+        return "no_ttl"
+    seconds = ttl_ms / 1000
+    for bound, label in TTL_BUCKETS:
+        if seconds < bound:
+            return label
+    return ">=1d"
+
+
+def _per_user_bucket(count: int) -> str:
+    for bound, label in PER_USER_BUCKETS:
+        if count <= bound:
+            return label
+    return "11+"
+
+
+def _mask(token: str) -> str:
+    # Токен - это учетные данные: отдаем только начало
+    return token[:8] + "..."
+
+
+# ---- cursor ----
+def encode_cursor(state: dict) -> str:
+    return signing.dumps(state, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    signing.BadSignature, если cursor подделан или от другого запроса
+    """
+    return signing.loads(cursor, salt=CURSOR_SALT)
+
+
+class SessionInspector:
+    def __init__(self, client=redis_client):
+        self.client = client
+
+    def _primaries(self) -> list | None:
+        # None - не cluster, обычный SCAN
+        get_primaries = getattr(self.client, "get_primaries", None)
+        if get_primaries is None:
+            return None
+        return sorted(get_primaries(), key=lambda node: node.name)
+
+    def _scan(self, state: dict, match: str, count: int) -> tuple[list[str], bool]:
+        """
+        Один шаг SCAN; state["n"] - номер узла cluster, state["c"] - cursor на нем
+        """
+        nodes = self._primaries()
+        if nodes is None:
+            cursor, keys = self.client.scan(cursor=state["c"], match=match, count=count)
+            state["c"] = cursor
+            return keys, cursor == 0
+
+        node = nodes[state["n"]]
+        cursors, keys = self.client.scan(cursor=state["c"], match=match, count=count, target_nodes=node)
+        state["c"] = cursors[node.name]
+        if state["c"] == 0:
+            state["n"] += 1
+        return keys, state["n"] >= len(nodes)
+
+    def _page(self, state: dict, done: bool, items_key: str, items: list) -> dict:
+        return {
+            items_key: items,
+            "stats": state["s"],
+            "complete": done,
+            "cursor": None if done else encode_cursor(state),
+        }
+
+    # ---- записи ----
+    def _load(self, keys: list[str], prefix: str) -> tuple[list[dict], int]:
+        """
+        Записи по ключам одним pipeline; второе - записи старого формата (WRONGTYPE)
+        """
+        if not keys:
+            return [], 0
+        pipe = pipeline(self.client)
+        for key in keys:
+            pipe.hgetall(key)
+            pipe.pttl(key)
+        values = pipe.execute(raise_on_error=False)
+
+        records, legacy = [], 0
+        for key, raw, ttl in zip(keys, values[::2], values[1::2]):
+            if isinstance(raw, Exception):
+                legacy += 1
+                continue
+            record = parse_record(raw)
+            if record is None:  # истекла между SCAN и HGETALL
+                continue
+            record["token"] = _mask(key[len(prefix):])
+            record["ttl"] = None if isinstance(ttl, Exception) or ttl < 0 else round(ttl / 1000)
+            record["_ttl_ms"] = ttl if isinstance(ttl, int) else -1
+            records.append(record)
+        return records, legacy
+
+    @staticmethod
+    def _count_records(stats: dict, records: list[dict], legacy: int) -> None:
+        stats["records"] += len(records)
+        stats["legacy"] += legacy
+        for record in records:
+            bucket = _ttl_bucket(record.pop("_ttl_ms"))
+            stats["ttl"][bucket] = stats["ttl"].get(bucket, 0) + 1
+
+    def records(self, kind: str = SESSION, cursor: str | None = None, count: int = 100) -> dict:
+        """
+        Страница записей по SCAN: {records, stats, complete, cursor}
+        """
+        prefix, _ = KINDS[kind]
+        state = decode_cursor(cursor) if cursor else {
+            "v": "records", "k": kind, "n": 0, "c": 0,
+            "s": {"scanned": 0, "records": 0, "legacy": 0, "ttl": {}},
+        }
+        if state.get("v") != "records" or state.get("k") != kind:
+            raise signing.BadSignature("Cursor belongs to another listing")
+
+        keys, done = self._scan(state, prefix + "*", count)
+        records, legacy = self._load(keys, prefix)
+        state["s"]["scanned"] += len(keys)
+        self._count_records(state["s"], records, legacy)
+        return self._page(state, done, "records", records)
+
+    def user_records(self, user_id: int, kind: str = SESSION, cursor: str | None = None, count: int = 100) -> dict:
+        """
+        Записи одного пользователя по его индексу, без обхода keyspace
+        """
+        prefix, index_prefix = KINDS[kind]
+        index = f"{index_prefix}{user_id}"
+        state = decode_cursor(cursor) if cursor else {
+            "v": "user", "k": kind, "u": user_id, "o": 0,
+            "s": {"indexed": self.client.zcount(index, time.time(), "+inf"), "records": 0, "legacy": 0, "ttl": {}},
+        }
+        if state.get("v") != "user" or state.get("k") != kind or state.get("u") != user_id:
+            raise signing.BadSignature("Cursor belongs to another listing")
+
+        tokens = self.client.zrangebyscore(index, time.time(), "+inf", start=state["o"], num=count)
+        records, legacy = self._load([prefix + token for token in tokens], prefix)
+        state["o"] += len(tokens)
+        self._count_records(state["s"], records, legacy)
+        return self._page(state, len(tokens) < count, "records", records)
+
+    # ---- пользователи ----
+    def users(self, kind: str = SESSION, cursor: str | None = None, count: int = 100) -> dict:
+        """
+        Сессии на пользователя по индексам: SCAN user_sessions:* + ZCOUNT живых
+        """
+        _, index_prefix = KINDS[kind]
+        state = decode_cursor(cursor) if cursor else {
+            "v": "users", "k": kind, "n": 0, "c": 0,
+            "s": {"users": 0, "records": 0, "per_user": {}, "top": []},
+        }
+        if state.get("v") != "users" or state.get("k") != kind:
+            raise signing.BadSignature("Cursor belongs to another listing")
+
+        keys, done = self._scan(state, index_prefix + "*", count)
+        counts = []
+        if keys:
+            now = time.time()
+            pipe = pipeline(self.client)
+            for key in keys:
+                pipe.zcount(key, now, "+inf")
+            counts = pipe.execute(raise_on_error=False)
+
+        stats = state["s"]
+        page = []
+        for key, live in zip(keys, counts):
+            if isinstance(live, Exception) or not live:
+                continue
+            user_id = int(key[len(index_prefix):])
+            page.append({"user_id": user_id, "records": live})
+            stats["users"] += 1
+            stats["records"] += live
+            bucket = _per_user_bucket(live)
+            stats["per_user"][bucket] = stats["per_user"].get(bucket, 0) + 1
+        # Топ держим ограниченным: состояние не растет с числом пользователей
+        top = stats["top"] + [[item["user_id"], item["records"]] for item in page]
+        stats["top"] = sorted(top, key=lambda item: item[1], reverse=True)[:TOP_USERS]
+        return self._page(state, done, "users", page)
+
+
+session_inspector = SessionInspector()
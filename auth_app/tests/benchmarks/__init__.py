@@ -0,0 +1,5 @@
+import tempfile
+from pathlib import Path
+
+# SQLite по умолчанию: вне репозитория, пересоздается на каждый режим
+SQLITE_PATH = Path(tempfile.gettempdir()) / "auth_service_bench.sqlite3"
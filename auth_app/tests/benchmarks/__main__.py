@@ -0,0 +1,301 @@
+"""
+Нагрузочный прогон auth endpoints.
+
+    python -m auth_app.tests.benchmarks --modes wsgi asgi --requests 200 --concurrency 16 \\
+        --latency-ms 5 --output bench.json --compare previous.json
+
+Для каждого режима поднимаются два процесса: fake user_service и сам
+сервис (server.py), затем endpoints прогоняются по очереди, каждый
+следующий использует токены предыдущих. БД и Redis - см. settings.py.
+Результат: p50/p95/p99, среднее и RPS по endpoint в JSON.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import django
+import httpx
+
+from auth_app.tests.benchmarks import SQLITE_PATH
+
+ROOT_DIR = Path(__file__).resolve().parents[3]
+API = "/api/v1/auth"
+
+
+# ---- процессы ----
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _spawn(module: str, *args: str, env: dict | None = None) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", module, *args],
+        cwd=ROOT_DIR,
+        env={**os.environ, **(env or {})},
+    )
+
+
+def _wait_ready(port: int, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args} exited with {process.returncode}")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1.0)
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise RuntimeError(f"port {port} not ready after {timeout}s")
+
+
+def _stop(*processes: subprocess.Popen) -> None:
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+# ---- замеры ----
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: list[float], statuses: list[int], elapsed: float) -> dict:
+    values = sorted(latencies)
+    ms = lambda seconds: round(seconds * 1000, 3)  # noqa: E731
+    counts: dict[str, int] = {}
+    for code in statuses:
+        counts[str(code)] = counts.get(str(code), 0) + 1
+    return {
+        "requests": len(values),
+        "errors": sum(1 for code in statuses if code >= 400),
+        "statuses": counts,
+        "rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": ms(sum(values) / len(values)) if values else 0.0,
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "max_ms": ms(values[-1]) if values else 0.0,
+    }
+
+
+async def run_phase(client: httpx.AsyncClient, requests: list[dict], concurrency: int):
+    """
+    requests - kwargs для client.request; возвращает (summary, ответы)
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    statuses: list[int] = []
+
+    async def one(kwargs: dict):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.request(**kwargs)
+            except httpx.HTTPError:
+                latencies.append(time.perf_counter() - started)
+                statuses.append(599)
+                return None
+            latencies.append(time.perf_counter() - started)
+            statuses.append(response.status_code)
+            return response
+
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(one(kwargs) for kwargs in requests))
+    elapsed = time.perf_counter() - started
+    return summarize(latencies, statuses, elapsed), responses
+
+
+def _ok_json(responses) -> list:
+    return [r.json() for r in responses if r is not None and r.status_code < 400]
+
+
+def _basic(username: str, password: str) -> str:
+    return "Basic " + base64.b64encode(f"{username}:{password}".encode()).decode()
+
+
+async def run_mode(base_url: str, args, cookie_key: str) -> dict:
+    n, concurrency = args.requests, args.concurrency
+    run_id = datetime.now().strftime("%H%M%S%f")
+    password = "bench-password"
+    users = [f"bench{run_id}_{i}" for i in range(n)]
+    results = {}
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url + API, limits=limits, timeout=60.0) as client:
+        # Прогрев: ключи, скрипты Redis, пулы соединений
+        warmup = f"bench{run_id}_warmup"
+        await client.post("/register/", json={"username": warmup, "password": password, "email": f"{warmup}@bench.local"})
+        await client.post("/jwt/login/", json={"username": warmup, "password": password})
+
+        summary, responses = await run_phase(client, [
+            {"method": "POST", "url": "/register/",
+             "json": {"username": u, "password": password, "email": f"{u}@bench.local"}}
+            for u in users
+        ], concurrency)
+        results["register"] = summary
+        x_auth_tokens = [data["x-auth-token"] for data in _ok_json(responses)]
+
+        summary, responses = await run_phase(client, [
+            {"method": "POST", "url": "/basic-auth-username/",
+             "headers": {"Authorization": _basic(u, password)}}
+            for u in users
+        ], concurrency)
+        results["basic-auth-username"] = summary
+        sessions = [data["session_id"] for data in _ok_json(responses)]
+
+        summary, responses = await run_phase(client, [
+            {"method": "POST", "url": "/jwt/login/", "json": {"username": u, "password": password}}
+            for u in users
+        ], concurrency)
+        results["jwt/login"] = summary
+        refresh_tokens = [data["refresh_token"] for data in _ok_json(responses)]
+
+        # Каждый refresh token одноразовый (ротация)
+        summary, _ = await run_phase(client, [
+            {"method": "POST", "url": "/jwt/refresh/", "json": {"refresh_token": token}}
+            for token in refresh_tokens
+        ], concurrency)
+        results["jwt/refresh"] = summary
+
+        summary, _ = await run_phase(client, [
+            {"method": "GET", "url": "/check-token-auth/",
+             "headers": {"x-auth-token": x_auth_tokens[i % len(x_auth_tokens)]}}
+            for i in range(n if x_auth_tokens else 0)
+        ], concurrency)
+        results["check-token-auth"] = summary
+
+        summary, _ = await run_phase(client, [
+            {"method": "GET", "url": "/cookie-session/",
+             "headers": {"Cookie": f"{cookie_key}={sessions[i % len(sessions)]}"}}
+            for i in range(n if sessions else 0)
+        ], concurrency)
+        results["cookie-session"] = summary
+
+    return results
+
+
+def bench_mode(mode: str, args, cookie_key: str) -> dict:
+    user_service_port, app_port = _free_port(), _free_port()
+    user_service = _spawn(
+        "auth_app.tests.benchmarks.fake_user_service",
+        "--port", str(user_service_port),
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate),
+    )
+    env = {
+        "DJANGO_SETTINGS_MODULE": "auth_app.tests.benchmarks.settings",
+        "AUTH_SERVICE__USER_SERVICE_URL": f"http://127.0.0.1:{user_service_port}",
+        "BENCH_REDIS": args.redis,
+    }
+    if args.database_url:
+        env["BENCH_DATABASE_URL"] = args.database_url
+    else:
+        # Чистая SQLite на каждый режим: прогоны не влияют друг на друга
+        SQLITE_PATH.unlink(missing_ok=True)
+    app = _spawn("auth_app.tests.benchmarks.server", "--mode", mode, "--port", str(app_port), env=env)
+    try:
+        _wait_ready(user_service_port, user_service)
+        _wait_ready(app_port, app)
+        return asyncio.run(run_mode(f"http://127.0.0.1:{app_port}", args, cookie_key))
+    finally:
+        _stop(app, user_service)
+
+
+# ---- отчет ----
+def _git_revision() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True, stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(report: dict, previous: dict | None = None) -> None:
+    header = f"{'mode':<5} {'endpoint':<20} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}"
+    print(header)
+    print("-" * len(header))
+    for mode, endpoints in report["results"].items():
+        for endpoint, stats in endpoints.items():
+            line = (
+                f"{mode:<5} {endpoint:<20} {stats['rps']:>9.1f} {stats['p50_ms']:>9.2f} "
+                f"{stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['errors']:>7}"
+            )
+            old = (previous or {}).get("results", {}).get(mode, {}).get(endpoint)
+            if old and old["p95_ms"] and old["rps"]:
+                line += (
+                    f"   p95 {100 * (stats['p95_ms'] / old['p95_ms'] - 1):+.1f}%"
+                    f"  rps {100 * (stats['rps'] / old['rps'] - 1):+.1f}%"
+                )
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="auth_service endpoint benchmark")
+    parser.add_argument("--modes", nargs="+", choices=["wsgi", "asgi"], default=["wsgi", "asgi"])
+    parser.add_argument("--requests", type=int, default=200, help="запросов на endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="задержка fake user_service")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля 503 от fake user_service")
+    parser.add_argument("--redis", choices=["fake", "real"], default="fake")
+    parser.add_argument("--database-url", default=None, help="по умолчанию SQLite")
+    parser.add_argument("--output", default=None, help="JSON с результатами")
+    parser.add_argument("--compare", default=None, help="JSON прошлого прогона")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "auth_app.tests.benchmarks.settings")
+    from auth_app.config import pydantic_settings
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "error_rate": args.error_rate,
+            "redis": args.redis,
+            "database": "custom" if args.database_url else "sqlite",
+        },
+        "results": {},
+    }
+    for mode in args.modes:
+        report["results"][mode] = bench_mode(mode, args, pydantic_settings.cookie_session_id_key)
+
+    previous = None
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text())
+    print_table(report, previous)
+
+    output = Path(args.output or f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json")
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nsaved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Локальная замена user_service для бенчмарков: ASGI приложение без
+фреймворка, пользователи в памяти, задержка и доля ошибок настраиваются.
+
+    python -m auth_app.tests.benchmarks.fake_user_service --port 8105 --latency-ms 5
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+
+USER_BY_ID = re.compile(r"^/api/v1/users/(\d+)/$")
+USER_BY_USERNAME = re.compile(r"^/api/v1/users/username/([^/]+)/$")
+CREATE_USER = "/api/v1/users/create_user/"
+
+
+class FakeUserService:
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.users: dict[int, dict] = {}
+        self.by_username: dict[str, dict] = {}
+
+    async def __call__(self, scope, receive, send):
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+
+        if self.error_rate and random.random() < self.error_rate:
+            status, payload = 503, {"detail": "injected error"}
+        else:
+            status, payload = self.route(scope["method"], scope["path"], body)
+
+        data = json.dumps(payload).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(data)).encode())],
+        })
+        await send({"type": "http.response.body", "body": data})
+
+    def route(self, method: str, path: str, body: bytes) -> tuple[int, dict]:
+        if method == "POST" and path == CREATE_USER:
+            data = json.loads(body or b"{}")
+            if data.get("username") in self.by_username:
+                return 400, {"detail": "User already exists"}
+            user = {
+                "user_id": len(self.users) + 1,
+                "username": data.get("username"),
+                "email": data.get("email"),
+                "is_active": True,
+            }
+            self.users[user["user_id"]] = user
+            self.by_username[user["username"]] = user
+            return 201, user
+
+        if method == "GET":
+            match = USER_BY_USERNAME.match(path)
+            if match:
+                user = self.by_username.get(match.group(1))
+                return (200, user) if user else (404, {"detail": "Not found"})
+            match = USER_BY_ID.match(path)
+            if match:
+                user = self.users.get(int(match.group(1)))
+                return (200, user) if user else (404, {"detail": "Not found"})
+
+        return 404, {"detail": "Not found"}
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake user_service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8105)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    app = FakeUserService(args.latency_ms, args.jitter_ms, args.error_rate)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False, lifespan="off")
+
+
+if __name__ == "__main__":
+    main()
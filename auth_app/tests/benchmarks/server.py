@@ -0,0 +1,64 @@
+"""
+Сервис под нагрузкой в отдельном процессе.
+
+    python -m auth_app.tests.benchmarks.server --mode asgi --port 8106
+
+wsgi - многопоточный WSGI сервер Django (как runserver, без autoreload),
+asgi - uvicorn. Перед стартом применяются миграции.
+"""
+import argparse
+import os
+
+
+def _use_fakeredis() -> None:
+    import fakeredis
+
+    from auth_app import redis_client
+    from utils.loop_local import LoopLocal
+
+    server = fakeredis.FakeServer()
+    redis_client._clients[True] = fakeredis.FakeRedis(server=server, decode_responses=True)
+    redis_client._clients[False] = fakeredis.FakeRedis(server=server)
+    redis_client._async_redis_clients = LoopLocal(
+        lambda: fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="auth_service under benchmark")
+    parser.add_argument("--mode", choices=["wsgi", "asgi"], required=True)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8106)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "auth_app.tests.benchmarks.settings")
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    django.setup()
+    call_command("migrate", verbosity=0)
+    if settings.BENCH_REDIS == "fake":
+        _use_fakeredis()
+
+    if args.mode == "wsgi":
+        from django.core.servers.basehttp import run
+        from django.core.wsgi import get_wsgi_application
+
+        run(args.host, args.port, get_wsgi_application(), threading=True)
+    else:
+        import uvicorn
+        from django.core.asgi import get_asgi_application
+
+        uvicorn.run(
+            get_asgi_application(),
+            host=args.host,
+            port=args.port,
+            log_level="warning",
+            access_log=False,
+            lifespan="off",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Настройки Django для бенчмарков: БД и Redis из переменных окружения.
+
+BENCH_DATABASE_URL - по умолчанию SQLite во временном каталоге
+BENCH_REDIS=fake   - fakeredis в процессе сервера, иначе Redis из RedisConfig
+"""
+import os
+
+import dj_database_url
+
+from auth_app_project.settings import *  # noqa: F401,F403
+from auth_app.tests.benchmarks import SQLITE_PATH
+
+BENCH_DATABASE_URL = os.environ.get("BENCH_DATABASE_URL", f"sqlite:///{SQLITE_PATH}")
+BENCH_REDIS = os.environ.get("BENCH_REDIS", "fake")
+
+DATABASES = {
+    "default": dj_database_url.parse(BENCH_DATABASE_URL),
+}
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+    # Параллельные записи ждут блокировку, а не падают
+    DATABASES["default"]["OPTIONS"] = {"timeout": 30}
+
+if BENCH_REDIS == "fake":
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+DEBUG = False
+ALLOWED_HOSTS = ["*"]
+
+# Логи каждого запроса искажают замеры
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "root": {"level": "WARNING"},
+    "loggers": {"django.server": {"level": "ERROR"}},
+}
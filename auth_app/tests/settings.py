@@ -0,0 +1,19 @@
+"""
+Настройки Django для тестов без Postgres рядом.
+
+    python manage_auth_app.py test auth_app.tests --settings=auth_app.tests.settings
+
+TEST_DATABASE_URL - по умолчанию SQLite (тестовая база в памяти).
+Redis в тестах подменяется fakeredis, см. auth_app/tests/utils.py
+"""
+import os
+
+import dj_database_url
+
+from auth_app_project.settings import *  # noqa: F401,F403
+
+DATABASES = {
+    "default": dj_database_url.parse(os.environ.get("TEST_DATABASE_URL", "sqlite:///auth_app_test.sqlite3")),
+}
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+ALLOWED_HOSTS = ["*"]
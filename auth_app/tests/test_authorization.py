@@ -0,0 +1,79 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from auth_app.api.core.helpers import create_access_token, create_refresh_token
+from auth_app.api.v1.crud import DeleteAuthUserAPIView
+from auth_app.config import pydantic_settings
+from auth_app.models import AuthUser
+from auth_app.services.revocation import revocation_list
+from auth_app.services.security import decode_jwt
+from auth_app.tests.utils import FakeRedisMixin, KeyRingMixin
+
+DEBUG_ROUTES = (
+    "redis-sessions/",
+    "hashing-stats/",
+    "profile-cache-stats/",
+    "revocation-stats/",
+    "login-bookkeeping-stats/",
+    "profiles/",
+    "profiles/0123456789abcdef/",
+)
+SECRET = "user-service-secret"
+
+
+class BearerAuthorizationTest(FakeRedisMixin, KeyRingMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        AuthUser.objects.bulk_create([AuthUser(user_id=1, password=b"x"), AuthUser(user_id=2, password=b"x")])
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(setattr, pydantic_settings.user_service, "callback_secret",
+                        pydantic_settings.user_service.callback_secret)
+        pydantic_settings.user_service.callback_secret = SECRET
+        self.token = create_access_token(2, "mallory@example.com")
+        self.bearer = {"Authorization": f"Bearer {self.token}"}
+
+    def _delete(self, user_id: int, **headers):
+        request = APIRequestFactory().delete(f"/api/v1/auth/{user_id}/", headers=headers)
+        return DeleteAuthUserAPIView.as_view()(request, user_id=user_id)
+
+    def test_access_token_authenticates(self):
+        self.assertEqual(self.client.get("/", headers=self.bearer).status_code, 200)
+        self.assertEqual(self.client.get("/").status_code, 401)
+
+    def test_refresh_and_revoked_tokens_are_rejected(self):
+        refresh = create_refresh_token(2, "mallory@example.com")
+        self.assertEqual(self.client.get("/", headers={"Authorization": f"Bearer {refresh}"}).status_code, 401)
+
+        payload = decode_jwt(self.token)
+        revocation_list.revoke(payload["jti"], payload["exp"])
+        self.assertEqual(self.client.get("/", headers=self.bearer).status_code, 401)
+
+    def test_debug_routes_are_closed_to_user_tokens(self):
+        for route in DEBUG_ROUTES:
+            with self.subTest(route=route):
+                response = self.client.get(f"/api/v1/auth/{route}", headers=self.bearer)
+                self.assertEqual(response.status_code, 403)
+
+    def test_profile_changed_is_closed_to_user_tokens(self):
+        response = self.client.post(
+            "/api/v1/auth/1/profile-changed/", {"username": "mallory"},
+            content_type="application/json", headers=self.bearer,
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_delete_other_user_is_forbidden(self):
+        self.assertEqual(self._delete(1, **self.bearer).status_code, 403)
+        self.assertTrue(AuthUser.objects.filter(user_id=1).exists())
+
+    def test_delete_allowed_for_user_service(self):
+        self.assertEqual(self._delete(1).status_code, 401)
+        self.assertEqual(self._delete(1, **{"X-Service-Secret": "guess"}).status_code, 401)
+        # Удаление ходит в user_service и Redis, здесь важен только доступ
+        with mock.patch("auth_app.api.v1.crud.user_crud.delete_auth_user") as delete:
+            self.assertEqual(self._delete(1, **{"X-Service-Secret": SECRET}).status_code, 200)
+            delete.assert_called_once_with(1)
+            self.assertEqual(self._delete(2, **self.bearer).status_code, 200)
@@ -0,0 +1,71 @@
+"""
+Бюджет времени импорта settings + URLconf.
+
+    python manage_auth_app.py test auth_app.tests.test_import_time
+
+Импорт меряется в чистом процессе через python -X importtime.
+Бюджет: AUTH_SERVICE_IMPORT_BUDGET_MS (по умолчанию 1000 мс).
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_BUDGET_MS = 1000
+
+# Не должны импортироваться при загрузке: их подключают команды и первые запросы
+LAZY_MODULES = (
+    "auth_app.services.db_helper",  # manage.py create_database
+    "authlib",  # api/v1/oauth.get_oauth
+)
+
+SCRIPT = "import django; django.setup(); import auth_app_project.urls"
+
+
+def measure_imports() -> dict[str, int]:
+    """
+    {модуль: собственное время импорта в мкс}
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SCRIPT],
+        cwd=ROOT_DIR,
+        env={**os.environ, "DJANGO_SETTINGS_MODULE": "auth_app_project.settings"},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if result.returncode:
+        raise AssertionError(f"import failed:\n{result.stderr[-2000:]}")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        if self_us.strip().isdigit():  # пропускаем строку заголовка
+            modules[name.strip()] = int(self_us)
+    return modules
+
+
+class ImportTimeTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.modules = measure_imports()
+
+    def test_total_within_budget(self):
+        budget_ms = int(os.environ.get("AUTH_SERVICE_IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS))
+        total_ms = sum(self.modules.values()) / 1000
+        slowest = sorted(self.modules.items(), key=lambda item: item[1], reverse=True)[:10]
+        self.assertLessEqual(
+            total_ms, budget_ms,
+            f"settings + URLconf import took {total_ms:.0f} ms, budget {budget_ms} ms; slowest: {slowest}",
+        )
+
+    def test_lazy_modules_not_imported(self):
+        for lazy in LAZY_MODULES:
+            imported = [name for name in self.modules if name == lazy or name.startswith(lazy + ".")]
+            self.assertEqual(imported, [], f"{lazy} is imported at startup")
@@ -0,0 +1,102 @@
+import json
+import tempfile
+from importlib.util import find_spec
+from io import StringIO
+from pathlib import Path
+from unittest import skipUnless
+
+import bcrypt
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from auth_app.config import pydantic_settings
+from auth_app.management.commands.import_users import Command, hash_batch
+from auth_app.models import AuthUser
+from auth_app.services import password_hashers
+from auth_app.services.security import validate_password
+
+VALID_HASH = bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=4)).decode()
+
+
+class FastHashingMixin:
+    def setUp(self):
+        super().setUp()
+        rounds = pydantic_settings.hashing.bcrypt_rounds
+        self.addCleanup(setattr, pydantic_settings.hashing, "bcrypt_rounds", rounds)
+        self.addCleanup(setattr, password_hashers, "_hashers", None)
+        pydantic_settings.hashing.bcrypt_rounds = 4
+        password_hashers._hashers = None
+
+
+class HashBatchTest(FastHashingMixin, SimpleTestCase):
+    def test_invalid_rows_become_none(self):
+        rows = [
+            {"user_id": 1, "password": "secret", "password_hash": None},
+            {"user_id": 2, "password": None, "password_hash": VALID_HASH},
+            {"user_id": 3, "password": None, "password_hash": "$2b$12$garbage"},
+            {"user_id": 4, "password": None, "password_hash": "$2b$12$" + "é" * 53},
+            {"user_id": 5, "password": None, "password_hash": "plain-text"},
+            {"user_id": 6, "password": None, "password_hash": None},
+        ]
+        result = dict(hash_batch(rows))
+
+        self.assertTrue(bcrypt.checkpw(b"secret", result[1]))
+        self.assertEqual(result[2], VALID_HASH.encode())
+        self.assertEqual([result[user_id] for user_id in (3, 4, 5, 6)], [None] * 4)
+
+    def test_bcrypt_hash_validation(self):
+        hasher = password_hashers.BcryptHasher
+        self.assertTrue(hasher.is_valid(VALID_HASH.encode()))
+        self.assertFalse(hasher.is_valid(VALID_HASH.encode() + b"\n"))
+        self.assertFalse(hasher.is_valid(VALID_HASH.replace("$04$", "$99$").encode()))
+        self.assertFalse(hasher.is_valid(VALID_HASH.encode()[:-1]))
+
+    @skipUnless(find_spec("argon2"), "argon2-cffi is not installed")
+    def test_argon2_hash_validation(self):
+        from argon2 import PasswordHasher
+
+        hasher = password_hashers.Argon2idHasher
+        self.assertTrue(hasher.is_valid(PasswordHasher(time_cost=1, memory_cost=8, parallelism=1).hash("x").encode()))
+        self.assertFalse(hasher.is_valid(b"$argon2id$v=19$garbage"))
+
+    def test_corrupt_stored_hash_fails_login_instead_of_raising(self):
+        self.assertFalse(validate_password("secret", b"$2b$12$garbage"))
+
+    def test_parse_rejects_non_string_passwords(self):
+        with self.assertRaisesMessage(ValueError, "password must be a string"):
+            Command._parse(1, {"user_id": 1, "password": 12345})
+        with self.assertRaisesMessage(ValueError, "password_hash must be a string"):
+            Command._parse(1, {"user_id": 1, "password_hash": ["$2b$"]})
+        with self.assertRaisesMessage(ValueError, "not a JSON object"):
+            Command._parse(1, [1, "secret"])
+        with self.assertRaisesMessage(ValueError, "user_id"):
+            Command._parse(1, {"user_id": "abc", "password": "secret"})
+
+
+class ImportUsersCommandTest(FastHashingMixin, TestCase):
+    def _import(self, records: list) -> str:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / "users.ndjson"
+        path.write_text("\n".join(
+            record if isinstance(record, str) else json.dumps(record) for record in records
+        ))
+        stdout, stderr = StringIO(), StringIO()
+        call_command("import_users", str(path), workers=1, batch_size=3, stdout=stdout, stderr=stderr)
+        return stderr.getvalue()
+
+    def test_bad_rows_are_counted_not_fatal(self):
+        errors = self._import([
+            {"user_id": 1, "password": "secret"},
+            {"user_id": 2, "password_hash": "$2b$12$garbage"},
+            {"user_id": 3, "password_hash": "$2b$12$" + "ü" * 53},
+            {"user_id": 4, "password": 12345},
+            "{not json",
+            {"user_id": 6, "password_hash": VALID_HASH},
+        ])
+
+        self.assertEqual(set(AuthUser.objects.values_list("user_id", flat=True)), {1, 6})
+        self.assertIn("record 2: no password or invalid password_hash", errors)
+        self.assertIn("record 3: no password or invalid password_hash", errors)
+        self.assertIn("record 4: password must be a string", errors)
+        self.assertIn("record 5: not a JSON object", errors)
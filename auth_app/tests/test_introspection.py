@@ -0,0 +1,25 @@
+from django.test import SimpleTestCase
+
+from auth_app.config import pydantic_settings
+
+URL = "/api/v1/auth/introspect/"
+BODY = {"tokens": [{"token": "a.b.c"}]}
+
+
+class IntrospectionSecretTest(SimpleTestCase):
+    def setUp(self):
+        self.addCleanup(setattr, pydantic_settings.introspection, "client_secret",
+                        pydantic_settings.introspection.client_secret)
+
+    def test_closed_without_configured_secret(self):
+        pydantic_settings.introspection.client_secret = None
+        response = self.client.post(URL, BODY, content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+
+    def test_wrong_secret(self):
+        pydantic_settings.introspection.client_secret = "gateway-secret"
+        response = self.client.post(
+            URL, BODY, content_type="application/json",
+            headers={"X-Introspection-Secret": "guess"},
+        )
+        self.assertEqual(response.status_code, 403)
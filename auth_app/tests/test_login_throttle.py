@@ -0,0 +1,76 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from auth_app.config import pydantic_settings
+from auth_app.services.login_throttle import (
+    LoginThrottle, LoginThrottled,
+    username_ip_index_key, username_ip_key, username_key,
+)
+from auth_app.tests.utils import FakeRedisMixin
+
+LIMITS = {"username_ip": (2, 60), "username": (8, 60), "ip": (40, 60)}
+
+
+class LoginThrottleTest(FakeRedisMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.throttle = LoginThrottle(LIMITS)
+
+    def test_username_ip_window_blocks_and_success_releases(self):
+        self.throttle.hit("ann", "10.0.0.1")
+        self.throttle.success(self.throttle.hit("ann", "10.0.0.1"))
+        self.throttle.hit("ann", "10.0.0.1")
+        with self.assertRaises(LoginThrottled):
+            self.throttle.hit("ann", "10.0.0.1")
+        # Другой IP считается отдельно
+        self.throttle.hit("ann", "10.0.0.2")
+
+    def test_index_lists_username_ip_windows(self):
+        self.throttle.hit("ann", "10.0.0.1")
+        self.throttle.hit("ann", "10.0.0.2")
+
+        index = username_ip_index_key("ann")
+        self.assertEqual(
+            self.redis.smembers(index),
+            {username_ip_key("ann", "10.0.0.1"), username_ip_key("ann", "10.0.0.2")},
+        )
+        self.assertGreater(self.redis.pttl(index), 0)
+
+    def test_reset_deletes_user_windows_without_scan(self):
+        self.throttle.hit("a*", "10.0.0.1")
+        self.throttle.hit("a*", "10.0.0.2")
+        self.throttle.hit("ann", "10.0.0.1")
+
+        with mock.patch.object(type(self.redis), "scan_iter", side_effect=AssertionError("SCAN")):
+            self.throttle.reset("a*")
+
+        self.assertFalse(self.redis.exists(
+            username_key("a*"), username_ip_index_key("a*"),
+            username_ip_key("a*", "10.0.0.1"), username_ip_key("a*", "10.0.0.2"),
+        ))
+        # Окна другого пользователя и IP не тронуты
+        self.assertTrue(self.redis.exists(username_ip_key("ann", "10.0.0.1")))
+        self.throttle.hit("a*", "10.0.0.1")
+        self.throttle.hit("a*", "10.0.0.1")
+
+    async def test_async_hit_is_indexed(self):
+        await self.throttle.ahit("ann", "10.0.0.3")
+        self.assertEqual(self.redis.smembers(username_ip_index_key("ann")), {username_ip_key("ann", "10.0.0.3")})
+
+
+class ClusterBatchesTest(SimpleTestCase):
+    def test_index_goes_with_username_slot(self):
+        self.addCleanup(setattr, pydantic_settings.redis, "mode", pydantic_settings.redis.mode)
+        pydantic_settings.redis.mode = "cluster"
+
+        attempt = LoginThrottle(LIMITS)._prepare("ann", "10.0.0.1")
+        batches = attempt.batches()
+
+        self.assertEqual(len(batches), 2)
+        for keys, args in batches:
+            windows = attempt.windows(keys)
+            self.assertEqual(len(args), 3 + 2 * len(windows))
+            if args[2]:
+                self.assertEqual(keys[-1], username_ip_index_key("ann"))
+                self.assertEqual(keys[args[2] - 1], username_ip_key("ann", "10.0.0.1"))
@@ -0,0 +1,105 @@
+import time
+from unittest import mock
+
+import jwt
+from django.db import DatabaseError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from rest_framework.exceptions import AuthenticationFailed
+
+from auth_app.crud import refresh_token_crud
+from auth_app.models import AuthUser, RefreshToken
+from auth_app.tests.utils import KeyRingMixin
+
+USER_ID = 7
+EMAIL = "user@example.com"
+
+
+class RefreshTokenRotationTest(KeyRingMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        AuthUser.objects.create(user_id=USER_ID, password=b"x")
+
+    def setUp(self):
+        super().setUp()
+        self.token = refresh_token_crud.issue_refresh_token(USER_ID, EMAIL)
+        self.row = RefreshToken.objects.get(token_digest=refresh_token_crud.refresh_token_digest(self.token))
+
+    def _live(self) -> int:
+        return RefreshToken.objects.filter(family_id=self.row.family_id, revoked_at__isnull=True).count()
+
+    def test_rotation_issues_next_token_in_family(self):
+        new_token = refresh_token_crud.rotate_refresh_token(self.token, USER_ID, EMAIL)
+
+        self.row.refresh_from_db()
+        self.assertIsNotNone(self.row.revoked_at)
+        new_row = RefreshToken.objects.get(token_digest=refresh_token_crud.refresh_token_digest(new_token))
+        self.assertEqual(new_row.family_id, self.row.family_id)
+        self.assertIsNone(new_row.revoked_at)
+
+    def test_reuse_revokes_family(self):
+        new_token = refresh_token_crud.rotate_refresh_token(self.token, USER_ID, EMAIL)
+
+        with self.assertRaisesMessage(AuthenticationFailed, "reuse detected"):
+            refresh_token_crud.rotate_refresh_token(self.token, USER_ID, EMAIL)
+        self.assertEqual(self._live(), 0)
+        # Легитимный владелец нового токена тоже разлогинен
+        with self.assertRaises(AuthenticationFailed):
+            refresh_token_crud.rotate_refresh_token(new_token, USER_ID, EMAIL)
+
+    def test_other_users_token_is_rejected(self):
+        with self.assertRaisesMessage(AuthenticationFailed, "revoked or invalid"):
+            refresh_token_crud.rotate_refresh_token(self.token, USER_ID + 1, EMAIL)
+        self.assertEqual(self._live(), 1)
+
+    def test_failed_insert_keeps_presented_token(self):
+        with mock.patch.object(RefreshToken, "save", side_effect=DatabaseError("insert failed")):
+            with self.assertRaises(DatabaseError):
+                refresh_token_crud.rotate_refresh_token(self.token, USER_ID, EMAIL)
+
+        self.row.refresh_from_db()
+        self.assertIsNone(self.row.revoked_at)
+        # Повтор клиента - обычная ротация, а не кража
+        refresh_token_crud.rotate_refresh_token(self.token, USER_ID, EMAIL)
+        self.assertEqual(self._live(), 1)
+
+    async def test_async_rotation(self):
+        new_token = await refresh_token_crud.arotate_refresh_token(self.token, USER_ID, EMAIL)
+        self.assertNotEqual(new_token, self.token)
+        self.assertEqual(await RefreshToken.objects.filter(revoked_at__isnull=True).acount(), 1)
+
+
+class CopyRefreshTokensMigrationTest(TransactionTestCase):
+    before = [("auth_app", "0002_authuser_last_login")]
+    after = [("auth_app", "0003_refreshtoken")]
+
+    def _migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self._migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+        super().tearDown()
+
+    def test_keeps_token_exp_and_skips_expired(self):
+        now = int(time.time())
+        live = jwt.encode({"sub": "1", "exp": now + 3600}, "any-key", algorithm="HS256")
+        tokens = {
+            1: live,
+            2: jwt.encode({"sub": "2", "exp": now - 60}, "any-key", algorithm="HS256"),
+            3: jwt.encode({"sub": "3"}, "any-key", algorithm="HS256"),
+            4: "not-a-jwt",
+        }
+        AuthUser = self._migrate(self.before).get_model("auth_app", "AuthUser")
+        AuthUser.objects.bulk_create(
+            [AuthUser(user_id=user_id, password=b"x", refresh_token=token) for user_id, token in tokens.items()]
+        )
+
+        RefreshToken = self._migrate(self.after).get_model("auth_app", "RefreshToken")
+
+        row = RefreshToken.objects.get()
+        self.assertEqual(row.user_id, 1)
+        self.assertEqual(row.token_digest, refresh_token_crud.refresh_token_digest(live))
+        self.assertEqual(int(row.expires_at.timestamp()), now + 3600)
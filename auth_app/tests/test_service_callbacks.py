@@ -0,0 +1,42 @@
+from django.test import SimpleTestCase
+
+from auth_app.config import pydantic_settings
+from auth_app.crud import tokens_crud
+from auth_app.crud.tokens_crud import STATIC_TOKEN_PREFIX
+from auth_app.tests.utils import FakeRedisMixin
+
+SECRET = "user-service-secret"
+URL = "/api/v1/auth/1/profile-changed/"
+BODY = {"username": "mallory", "email": "mallory@example.com"}
+
+
+class ProfileChangedPermissionTest(FakeRedisMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(setattr, pydantic_settings.user_service, "callback_secret",
+                        pydantic_settings.user_service.callback_secret)
+        pydantic_settings.user_service.callback_secret = SECRET
+        tokens_crud.store_static_token("token-1", 1, "alice", "alice@example.com")
+
+    def _post(self, **headers):
+        return self.client.post(URL, BODY, content_type="application/json", headers=headers)
+
+    def _username(self) -> str:
+        return self.redis.hget(STATIC_TOKEN_PREFIX + "token-1", "username")
+
+    def test_without_secret(self):
+        self.assertEqual(self._post().status_code, 403)
+        self.assertEqual(self._username(), "alice")
+
+    def test_wrong_secret(self):
+        self.assertEqual(self._post(**{"X-Service-Secret": "guess"}).status_code, 403)
+        self.assertEqual(self._username(), "alice")
+
+    def test_closed_when_secret_not_configured(self):
+        pydantic_settings.user_service.callback_secret = None
+        self.assertEqual(self._post(**{"X-Service-Secret": ""}).status_code, 403)
+
+    def test_user_service_secret(self):
+        response = self._post(**{"X-Service-Secret": SECRET})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._username(), "mallory")
@@ -0,0 +1,30 @@
+import json
+
+from django.test import TestCase
+
+from auth_app.crud import user_crud
+from auth_app.models import AuthUser
+
+
+class UsersStreamTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        AuthUser.objects.bulk_create(
+            [AuthUser(user_id=user_id, password=b"x") for user_id in range(1, 6)]
+        )
+
+    async def test_stream_is_async_and_complete(self):
+        response = await self.async_client.get("/api/v1/auth/get_users/", {"stream": "1"})
+        self.assertEqual(response.status_code, 200)
+        # Синхронный итератор под ASGI Django собрал бы в список целиком
+        self.assertTrue(response.is_async)
+
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual([row["user_id"] for row in rows], [1, 2, 3, 4, 5])
+        self.assertEqual(set(rows[0]), set(user_crud.USER_LIST_FIELDS))
+
+    async def test_pages_are_bounded(self):
+        pages = [page async for page in user_crud.aiter_users(["user_id"], chunk_size=2)]
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual([row["user_id"] for page in pages for row in page], [1, 2, 3, 4, 5])
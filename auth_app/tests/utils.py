@@ -0,0 +1,57 @@
+"""
+Общее для тестов: fakeredis вместо Redis и временная связка ключей JWT.
+"""
+import tempfile
+from io import StringIO
+
+import fakeredis
+from django.core.management import call_command
+
+from auth_app import redis_client
+from auth_app.services import keyring
+from utils.loop_local import LoopLocal
+
+
+class FakeRedisMixin:
+    """
+    Свой fakeredis на каждый тест; self.redis - sync клиент с decode_responses
+    """
+
+    def setUp(self):
+        super().setUp()
+        saved = (dict(redis_client._clients), redis_client._async_redis_clients)
+        server = fakeredis.FakeServer()
+        redis_client._clients.clear()
+        redis_client._clients[True] = fakeredis.FakeRedis(server=server, decode_responses=True)
+        redis_client._clients[False] = fakeredis.FakeRedis(server=server)
+        redis_client._async_redis_clients = LoopLocal(
+            lambda: fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        )
+        self.redis = redis_client._clients[True]
+        self.addCleanup(self._restore_redis, saved)
+
+    @staticmethod
+    def _restore_redis(saved) -> None:
+        clients, async_clients = saved
+        redis_client._clients.clear()
+        redis_client._clients.update(clients)
+        redis_client._async_redis_clients = async_clients
+
+
+class KeyRingMixin:
+    """
+    Связка с одним EdDSA ключом во временном каталоге вместо CERTS_DIR
+    """
+
+    def setUp(self):
+        super().setUp()
+        certs_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(certs_dir.cleanup)
+        call_command(
+            "generate_jwt_key", algorithm="EdDSA", name="test",
+            certs_dir=certs_dir.name, stdout=StringIO(),
+        )
+        key_ring = keyring.KeyRing(certs_dir.name, "EdDSA")
+        key_ring.load()
+        self.addCleanup(setattr, keyring, "_key_ring", keyring._key_ring)
+        keyring._key_ring = key_ring
@@ -5,4 +5,13 @@ from django.core.asgi import get_asgi_application
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'auth_app_project.settings')
+# Под ASGI у каждого запроса свой контекст соединений: постоянные соединения
+# копились бы. По умолчанию - пул psycopg 3 на процесс, а без пула
+# (AUTH_SERVICE__DB__POOL=false) - соединение на запрос
+os.environ.setdefault('AUTH_SERVICE__DB__POOL', 'true')
+os.environ.setdefault('AUTH_SERVICE__DB__CONN_MAX_AGE', '0')
 application = get_asgi_application()
+
+from auth_app.services.keyring import install_reload_signal  # noqa: E402
+
+install_reload_signal()
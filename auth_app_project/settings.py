@@ -1,5 +1,7 @@
 from pathlib import Path
+from importlib.util import find_spec
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 
 
 # Импортируем pydantic-настройки из auth_app/config.py
@@ -14,23 +16,62 @@ SECRET_KEY = pydantic_settings.secret_key
 DEBUG = pydantic_settings.debug
 ALLOWED_HOSTS = ["127.0.0.1"]
 
-# Настройка базы данных
+# Настройка базы данных (см. DataBaseConfig)
+def _database(url) -> dict:
+    config = pydantic_settings.db
+    if not config.pool:
+        # Постоянное соединение на поток, проверка перед повторным использованием
+        database = dj_database_url.parse(
+            str(url),
+            conn_max_age=config.conn_max_age,
+            conn_health_checks=config.pool_pre_ping,
+        )
+        database["ENGINE"] = "django.db.backends.postgresql"
+        return database
+
+    # Django дает пул только с psycopg 3; при одном psycopg2 OPTIONS["pool"] - ошибка
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+    if not is_psycopg3 or find_spec("psycopg_pool") is None:
+        raise ImproperlyConfigured("AUTH_SERVICE__DB__POOL requires psycopg[pool] (psycopg 3)")
+    # Пул на процесс; CONN_MAX_AGE с пулом должен быть 0
+    database = dj_database_url.parse(str(url))
+    database["ENGINE"] = "django.db.backends.postgresql"
+    pool = {
+        "min_size": config.pool_size,
+        "max_size": config.pool_size + config.max_overflow,
+        "timeout": config.pool_timeout,
+    }
+    if config.pool_pre_ping:
+        from psycopg_pool import ConnectionPool
+        pool["check"] = ConnectionPool.check_connection
+    database.setdefault("OPTIONS", {})["pool"] = pool
+    return database
+
+
 DATABASES = {
-    'default': dj_database_url.parse(str(pydantic_settings.db.url))
+    'default': _database(pydantic_settings.db.url),
 }
+# Реплики: replica_0, replica_1, ... В тестах - зеркала default
+for _index, _url in enumerate(pydantic_settings.db.replica_urls):
+    DATABASES[f"replica_{_index}"] = {**_database(_url), "TEST": {"MIRROR": "default"}}
 
-# DATABASES["default"]["ENGINE"] = "django.db.backends.postgresql_async"
-DATABASES["default"]["ENGINE"] = "django.db.backends.postgresql"
+DATABASE_ROUTERS = ["auth_app.db_router.ReplicaRouter"]
 
-# Настройка Redis
-REDIS_HOST = "localhost"
-REDIS_PORT = 6379
-REDIS_DB = 1
-REDIS_DECODE_RESPONSES = True
+# Настройка Redis (см. RedisConfig и auth_app/redis_client.py)
+REDIS_HOST = pydantic_settings.redis.host
+REDIS_PORT = pydantic_settings.redis.port
+REDIS_DB = pydantic_settings.redis.db
+REDIS_DECODE_RESPONSES = pydantic_settings.redis.decode_responses
 
 # Бизнес-параметры аутентификации
 AUTH_MAX_ATTEMPTS = 5
 AUTH_BLOCK_TIME_SECONDS = 300  # 5 минут
+# Скользящие окна неудачных попыток: (попыток, окно в секундах)
+AUTH_THROTTLE_LIMITS = {
+    "username_ip": (AUTH_MAX_ATTEMPTS, AUTH_BLOCK_TIME_SECONDS),
+    "username": (AUTH_MAX_ATTEMPTS * 4, AUTH_BLOCK_TIME_SECONDS),
+    "ip": (AUTH_MAX_ATTEMPTS * 20, AUTH_BLOCK_TIME_SECONDS),
+}
 
 # Кеш redis'a
 CACHES = {
@@ -39,7 +80,8 @@ CACHES = {
         'LOCATION': f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}",
         'OPTIONS': {
             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
-            # 'PASSWORD': REDIS_PASSWORD, если нужен пароль
+            # Тот же пул, таймауты, sentinel/cluster, что и у redis_client
+            'CONNECTION_FACTORY': 'auth_app.redis_client.DjangoRedisConnectionFactory',
         }
     }
 }
@@ -58,7 +100,6 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'drf_spectacular',
     'rest_framework',
-    'authlib.integrations.django_client',
     'rest_framework_simplejwt',
     'auth_app',
 ]
@@ -68,6 +109,9 @@ AUTHENTICATION_BACKENDS = [
 ]
 
 MIDDLEWARE = [
+    # Первым: время запроса целиком, включая остальные middleware
+    'auth_app.api.core.middleware.MetricsMiddleware',
+    'auth_app.api.core.middleware.ProfilingMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -107,7 +151,7 @@ STATIC_ROOT = BASE_DIR / 'static'
 # (Опционально) Настройки Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'auth_app.api.core.authentication.JWTBearerAuthentication',
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework.authentication.BasicAuthentication',
     ),
@@ -5,6 +5,9 @@ from auth_app.config import pydantic_settings
 from rest_framework.decorators import api_view
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
+from auth_app.api.v1.jwks import JWKSAPIView, OpenIDConfigurationAPIView
+from auth_app.api.v1.metrics import metrics_view
+
 API_PREFIX = pydantic_settings.api.prefix
 API_V1_PREFIX = pydantic_settings.api.v1.prefix
 
@@ -19,6 +22,13 @@ urlpatterns = [
     path('', root_hello, name='root'),
     path(f"{API_PREFIX}{API_V1_PREFIX}/auth/", include("auth_app.api.v1.urls")),
 
+    # Публичные ключи для проверки токенов другими сервисами
+    path(".well-known/jwks.json", JWKSAPIView.as_view(), name="jwks"),
+    path(".well-known/openid-configuration", OpenIDConfigurationAPIView.as_view(), name="openid-configuration"),
+
+    # Prometheus
+    path("metrics", metrics_view, name="metrics"),
+
     # Маршруты для OpenAPI схемы и Swagger UI / Redoc
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
@@ -3,3 +3,7 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'auth_app_project.settings')
 application = get_wsgi_application()
+
+from auth_app.services.keyring import install_reload_signal  # noqa: E402
+
+install_reload_signal()
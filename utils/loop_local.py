@@ -0,0 +1,27 @@
+import asyncio
+import weakref
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class LoopLocal(Generic[T]):
+    """
+    Один объект на event loop.
+
+    Async клиенты (httpx, redis.asyncio) привязаны к loop, в котором
+    открыли соединения. Под uvicorn loop один на воркер, но async_to_sync
+    и тесты создают свои - им нужен отдельный экземпляр.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._objects: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def get(self) -> T:
+        loop = asyncio.get_running_loop()
+        obj = self._objects.get(loop)
+        if obj is None:
+            obj = self._factory()
+            self._objects[loop] = obj
+        return obj